@@ -20,6 +20,7 @@ if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
 from src.manager_compile import compile_ui_files, compile_plugin_ui_files
+from src.plugin_interface import is_background_state
 
 # --- Импорты логики сохранения (Config) ---
 try:
@@ -73,6 +74,9 @@ class BanMainWindow(QMainWindow):
             self.core.com.client_connected.connect(lambda data: self.on_log("info", f"Client connected: {data.get('ip')}"))
             self.core.com.client_disconnected.connect(self.on_client_disconnected)
 
+            # Фон / возврат приложения -> on_suspend / on_resume плагинов
+            QApplication.instance().applicationStateChanged.connect(self.on_application_state_changed)
+
     def _enrich_slot_data_from_manifest(self, slot_index):
         """Возвращает plugin_data с гарантированными name и version (из манифеста при отсутствии)."""
         data = self.core.state.get_slot(slot_index) if self.core else None
@@ -189,6 +193,18 @@ class BanMainWindow(QMainWindow):
         if stylesheet:
             self.setStyleSheet(stylesheet)
 
+    def on_application_state_changed(self, state):
+        """
+        Приложение ушло в фон / вернулось. Свернутое окно сервера фоном не считается:
+        плагины продолжают выполнять команды клиентов (нажатия, громкость).
+        """
+        if not self.core:
+            return
+        if is_background_state(state):
+            self.core.suspend_plugins()
+        elif state == Qt.ApplicationState.ApplicationActive:
+            self.core.resume_plugins()
+
     def closeEvent(self, event):
         """При закрытии окна останавливаем Core."""
         if self.core:
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import base64
@@ -5,6 +6,8 @@ import hashlib
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from typing import List
 
+from src.asset_store import blob_name
+
 def calculate_file_md5(filepath):
     """Вычисляет MD5 хеш файла."""
     hash_md5 = hashlib.md5()
@@ -16,26 +19,85 @@ def calculate_file_md5(filepath):
     except Exception:
         return None
 
+SEND_TIMEOUT = 2.0  # с: ожидание отправки кадра из потока вне цикла сервера
+
 class ConnectionManager:
     """
     Класс для управления WebSocket соединениями.
     Позволяет хранить список активных клиентов, отправлять им сообщения
     и рассылать широковещательные уведомления.
+    Клиент адресуется по client_id ("ip:port").
     """
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self.clients: Dict[str, WebSocket] = {}
+        self.loop = None    # цикл uvicorn: для отправки из других потоков
+
+    @staticmethod
+    def client_id(websocket: WebSocket) -> str:
+        return f"{websocket.client.host}:{websocket.client.port}"
 
     async def connect(self, websocket: WebSocket):
+        self.loop = asyncio.get_running_loop()
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.clients[self.client_id(websocket)] = websocket
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.clients.pop(self.client_id(websocket), None)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
+    async def send_to(self, client_id: str, message: str) -> bool:
+        websocket = self.clients.get(client_id)
+        if not websocket:
+            return False
+        try:
+            await websocket.send_text(message)
+            return True
+        except Exception:
+            return False
+
+    async def send_bytes_to(self, client_id: str, frame: bytes) -> bool:
+        websocket = self.clients.get(client_id)
+        if not websocket:
+            return False
+        try:
+            await websocket.send_bytes(frame)
+            return True
+        except Exception:
+            return False
+
+    def send_threadsafe(self, client_id: str, message: str, timeout: float = SEND_TIMEOUT) -> bool:
+        """JSON-сообщение одному клиенту из другого потока (GUI) — см. send_bytes_threadsafe."""
+        return self._run_threadsafe(client_id, self.send_to, message, timeout)
+
+    def send_bytes_threadsafe(self, client_id: str, frame: bytes, timeout: float = SEND_TIMEOUT) -> bool:
+        """
+        send_bytes_to из другого потока (GUI, поток уровней Tune): кадр сразу в цикл
+        сервера, без HTTP-запроса к себе. Ждет отправки не дольше timeout.
+        """
+        return self._run_threadsafe(client_id, self.send_bytes_to, frame, timeout)
+
+    def _run_threadsafe(self, client_id: str, send, message, timeout: float) -> bool:
+        loop = self.loop
+        if loop is None or client_id not in self.clients:
+            return False
+        coroutine = send(client_id, message)
+        try:
+            future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        except RuntimeError:
+            coroutine.close()
+            return False    # цикл уже закрыт
+        try:
+            return future.result(timeout)
+        except Exception:
+            future.cancel()
+            return False
+
     async def broadcast(self, message: str):
         for connection in self.active_connections:
             try:
@@ -81,10 +143,11 @@ def set_command_handler(handler):
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
+    client_id = manager.client_id(websocket)
     
     # Уведомляем систему (через лог/handler), что клиент подключен
     if command_handler:
-        command_handler("client_connected", {"ip": websocket.client.host})
+        command_handler("client_connected", {"ip": websocket.client.host, "client_id": client_id})
         
     try:
         while True:
@@ -147,11 +210,14 @@ async def websocket_endpoint(websocket: WebSocket):
                                                 final_remote_path = os.path.join(remote_path, rel_path_from_dir).replace("\\", "/")
                                                 md5 = calculate_file_md5(abs_file_path)
                                                 
-                                                new_files_map.append({
+                                                entry = {
                                                     "remote_path": final_remote_path,
                                                     "local_dir": local_dir_base,
                                                     "md5": md5
-                                                })
+                                                }
+                                                if md5 and file_info.get("assets"):
+                                                    entry["blob"] = blob_name(md5, filename)
+                                                new_files_map.append(entry)
                                     continue # Пропускаем саму запись директории
                                 
                                 # Обычный файл
@@ -281,11 +347,17 @@ async def websocket_endpoint(websocket: WebSocket):
                                                     # Для MD5 используем абсолютный путь
                                                     md5 = calculate_file_md5(abs_file_path)
                                                     
-                                                    new_files_map.append({
+                                                    entry = {
                                                         "remote_path": final_remote_path,
                                                         "local_dir": local_dir_base, # Client appends basename(remote_path) to this
                                                         "md5": md5
-                                                    })
+                                                    }
+                                                    # blob — имя в хранилище ресурсов клиента (src/asset_store.py), только
+                                                    # для папок "assets": true (иконки, звуки): одинаковые файлы разных
+                                                    # плагинов скачиваются один раз. Код плагина идет обычными файлами.
+                                                    if md5 and file_info.get("assets"):
+                                                        entry["blob"] = blob_name(md5, filename)
+                                                    new_files_map.append(entry)
                                     else:
                                         # Обычный файл
                                         remote_path = file_info.get("remote_path")
@@ -398,6 +470,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 # Передаем команду в обработчик (в GUI поток через callback, но тут осторожно с потоками)
                 # Лучше передавать сырые данные, а GUI пусть разбирается
                 if command_handler:
+                    json_data["client_id"] = client_id  # чтобы Core мог ответить конкретному клиенту
                     command_handler("command_received", json_data)
                 
                 # Отправляем подтверждение клиенту (опционально)
@@ -408,9 +481,12 @@ async def websocket_endpoint(websocket: WebSocket):
                     command_handler("error", f"Invalid JSON received: {data}")
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
-        if command_handler:
-            command_handler("client_disconnected", {"ip": websocket.client.host})
+        pass
     except Exception as e:
         if command_handler:
             command_handler("error", f"WebSocket error: {str(e)}")
+    finally:
+        # На любом выходе (в т.ч. обрыв с ошибкой): Core и плагины снимают состояние клиента
+        manager.disconnect(websocket)
+        if command_handler:
+            command_handler("client_disconnected", {"ip": websocket.client.host, "client_id": client_id})
@@ -1,6 +1,6 @@
 import uvicorn
 from PySide6.QtCore import QThread, Signal
-from server_main import app, set_command_handler
+from server_main import app, manager, set_command_handler
 
 class ServerThread(QThread):
     """
@@ -29,6 +29,14 @@ class ServerThread(QThread):
         """Callback, вызываемый из FastAPI (server_main). Пересылает данные в GUI через сигнал."""
         self.server_signal.emit(event_type, data)
 
+    def send_text(self, client_id, message):
+        """JSON-сообщение клиенту напрямую через цикл сервера (потокобезопасно). True — отправлено."""
+        return manager.send_threadsafe(client_id, message)
+
+    def send_bytes(self, client_id, frame):
+        """Бинарный кадр клиенту напрямую через цикл сервера (потокобезопасно). True — отправлен."""
+        return manager.send_bytes_threadsafe(client_id, frame)
+
     def run(self):
         """Запуск сервера."""
         # uvicorn.run блокирует этот поток, пока сервер работает
@@ -1,7 +1,6 @@
 import json
 import os
 import logging
-import base64
 from websockets.sync.client import connect
 
 # Импортируем родительский класс Updater
@@ -132,6 +131,8 @@ class PluginUpdater(Updater):
             files_updated = False
 
             manifest_filename = f"{plugin_id}_manifest.json"
+            plugin_root = os.path.join(self.plugins_dir, plugin_id)
+            asset_paths = []  # пути ресурсов из хранилища (индекс плагина)
 
             for index, file_info in enumerate(files_map):
                 remote_path = file_info["remote_path"]
@@ -145,6 +146,16 @@ class PluginUpdater(Updater):
                 if filename == manifest_filename:
                     continue
 
+                # Ресурс из хранилища: общий для всех плагинов blob качается один раз
+                if file_info.get("blob") and self.assets:
+                    result = self.sync_asset(websocket, file_info, local_path, plugin_id, plugin_root)
+                    if result is None:
+                        logger.error(f"[{plugin_id}] Failed to fetch asset {filename}")
+                        return False
+                    asset_paths.append(os.path.relpath(local_path, plugin_root))
+                    files_updated = files_updated or result
+                    continue
+
                 # Проверка MD5 (Incremental Update)
                 if os.path.exists(local_path) and remote_md5:
                     local_md5 = self.calculate_file_md5(local_path)
@@ -155,30 +166,16 @@ class PluginUpdater(Updater):
 
                 # Скачиваем файл (используем стандартную команду загрузки файлов, так как пути полные)
                 # Важно: сервер должен разрешать скачивание файлов из папки plugins/
-                websocket.send(json.dumps({
-                    "command": "UPDATE_DOWNLOAD_FILE", 
-                    "path": remote_path
-                }))
-
-                file_response = json.loads(websocket.recv())
+                file_data = self.download_file(websocket, remote_path, remote_md5)
+                if file_data is None:
+                    logger.error(f"[{plugin_id}] Failed to download {filename}. Aborting.")
+                    return False # Прерываем обновление этого плагина
                 
-                if file_response.get("type") == "UPDATE_RESPONSE_FILE":
-                    b64_data = file_response.get("data")
-                    file_data = base64.b64decode(b64_data)
-                    
-                    # Проверка целостности
-                    if remote_md5:
-                        downloaded_md5 = self.calculate_bytes_md5(file_data)
-                        if downloaded_md5 != remote_md5:
-                            logger.error(f"[{plugin_id}] MD5 Mismatch for {filename}. Aborting.")
-                            return False # Прерываем обновление этого плагина
-                    
-                    with open(local_path, "wb") as f:
-                        f.write(file_data)
-                    files_updated = True
-                else:
-                    logger.error(f"[{plugin_id}] Failed to download {filename}")
-                    return False
+                self.write_file(local_path, file_data)
+                files_updated = True
+
+            if self.assets:
+                self.prune_asset_index(plugin_id, asset_paths)
 
             if files_updated or server_version != local_version:
                 logger.info(f"[{plugin_id}] Updated {total_files} files.")
@@ -220,6 +217,11 @@ class PluginUpdater(Updater):
             logger.error(f"Global plugin update check failed: {e}")
             return False
 
+        if self.assets:
+            # Blob'ы, на которые больше не ссылается ни один плагин
+            self.assets.collect_garbage()
+            logger.info(f"Assets: downloaded {self.asset_stats['downloaded']}, reused {self.asset_stats['reused']}")
+
         if any_plugin_updated:
             logger.info("Plugins updated -> Restart required.")
             return True
@@ -0,0 +1,182 @@
+import os
+from collections import OrderedDict
+from PySide6.QtCore import QObject
+from PySide6.QtWidgets import QWidget, QAbstractButton, QLabel
+
+# Грубые оценки для подсчета "веса" плагина в RAM (RPi 3B+ — 1 ГБ на все)
+WIDGET_COST = 2 * 1024          # QWidget + QStyle-данные, ~2 КБ на виджет
+BYTES_PER_PIXEL = 4             # ARGB32
+MB = 1024 * 1024
+
+
+def _pixmap_bytes(width, height):
+    return max(0, int(width)) * max(0, int(height)) * BYTES_PER_PIXEL
+
+
+def estimate_widget_footprint(widget: QWidget) -> dict:
+    """
+    Оценивает объем памяти, занимаемый плагином.
+    Учитывает виджеты, иконки кнопок, картинки QLabel, буферы QGraphicsEffect
+    и загруженные QSoundEffect (по размеру исходного файла).
+    Возвращает словарь {widgets, icons, effects, sounds, total} (байты, widgets — штуки).
+    """
+    result = {"widgets": 0, "icons": 0, "effects": 0, "sounds": 0, "total": 0}
+    if widget is None:
+        return result
+
+    children = widget.findChildren(QWidget)
+    result["widgets"] = len(children) + 1
+    total = result["widgets"] * WIDGET_COST
+
+    seen_icons = set()
+    for child in [widget] + children:
+        # Иконки кнопок (pixmap'ы, добавленные в QIcon)
+        if isinstance(child, QAbstractButton):
+            icon = child.icon()
+            if not icon.isNull() and icon.cacheKey() not in seen_icons:
+                seen_icons.add(icon.cacheKey())
+                sizes = icon.availableSizes()
+                if sizes:
+                    result["icons"] += sum(_pixmap_bytes(s.width(), s.height()) for s in sizes)
+                else:
+                    size = child.iconSize()
+                    result["icons"] += _pixmap_bytes(size.width(), size.height())
+        elif isinstance(child, QLabel):
+            pixmap = child.pixmap()
+            if pixmap is not None and not pixmap.isNull():
+                result["icons"] += _pixmap_bytes(pixmap.width(), pixmap.height())
+
+        # Эффекты (тени и т.п.) держат offscreen-буфер размером с виджет
+        if child.graphicsEffect() is not None:
+            size = child.size().expandedTo(child.sizeHint())
+            result["effects"] += _pixmap_bytes(size.width(), size.height())
+
+    # QSoundEffect ищем по имени класса, чтобы не тянуть QtMultimedia на RPi без звука
+    for obj in widget.findChildren(QObject):
+        if obj.metaObject().className() == "QSoundEffect":
+            try:
+                path = obj.source().toLocalFile()
+                if path and os.path.exists(path):
+                    result["sounds"] += os.path.getsize(path)
+            except Exception:
+                pass
+
+    result["total"] = total + result["icons"] + result["effects"] + result["sounds"]
+    return result
+
+
+def format_footprint(footprint: dict) -> str:
+    """Строка для лога: '≈ 3.2 MB (widgets: 120, icons: 1.1 MB, ...)'."""
+    return (f"≈ {footprint['total'] / MB:.1f} MB "
+            f"(widgets: {footprint['widgets']}, "
+            f"icons: {footprint['icons'] / MB:.1f} MB, "
+            f"effects: {footprint['effects'] / MB:.1f} MB, "
+            f"sounds: {footprint['sounds'] / MB:.1f} MB)")
+
+
+class PluginInstanceCache:
+    """
+    LRU-кэш экземпляров клиентских плагинов с бюджетом по памяти и количеству.
+    Неактивные плагины вытесняются: перед удалением у плагина вызывается
+    save_ui_state() (если он есть), результат хранится до повторной загрузки слота
+    и отдается обратно через restore_ui_state(state).
+    """
+    def __init__(self, max_instances=3, max_bytes=64 * MB):
+        self.max_instances = max(1, int(max_instances))
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries = OrderedDict()   # slot_index -> QWidget (от старых к свежим)
+        self._plugin_ids = {}           # slot_index -> plugin_id
+        self._footprints = {}           # slot_index -> footprint dict
+        self._saved_states = {}         # slot_index -> (plugin_id, state)
+
+    # --- Доступ ---
+
+    def __contains__(self, slot_index):
+        return slot_index in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def items(self):
+        return list(self._entries.items())
+
+    def get(self, slot_index):
+        """Возвращает экземпляр и помечает его как недавно использованный."""
+        instance = self._entries.get(slot_index)
+        if instance is not None:
+            self._entries.move_to_end(slot_index)
+        return instance
+
+    def plugin_id(self, slot_index):
+        return self._plugin_ids.get(slot_index)
+
+    def put(self, slot_index, instance, plugin_id=None):
+        """Кладет новый экземпляр в кэш (как самый свежий)."""
+        self._entries[slot_index] = instance
+        self._entries.move_to_end(slot_index)
+        self._plugin_ids[slot_index] = plugin_id
+        self._footprints.pop(slot_index, None)
+
+    def remove(self, slot_index):
+        """Убирает экземпляр из кэша без сохранения состояния. Возвращает экземпляр."""
+        self._plugin_ids.pop(slot_index, None)
+        self._footprints.pop(slot_index, None)
+        self._saved_states.pop(slot_index, None)
+        return self._entries.pop(slot_index, None)
+
+    # --- Память ---
+
+    def measure(self, slot_index):
+        """Пересчитывает footprint экземпляра. Возвращает словарь или None."""
+        instance = self._entries.get(slot_index)
+        if instance is None:
+            return None
+        footprint = estimate_widget_footprint(instance)
+        self._footprints[slot_index] = footprint
+        return footprint
+
+    def total_bytes(self):
+        return sum(fp["total"] for fp in self._footprints.values())
+
+    def _over_budget(self):
+        if len(self._entries) > self.max_instances:
+            return True
+        return bool(self.max_bytes) and self.total_bytes() > self.max_bytes
+
+    def evict_over_budget(self, active_slot=None):
+        """
+        Вытесняет давно неиспользуемые плагины, пока кэш не уложится в бюджет.
+        Активный слот никогда не вытесняется.
+        Возвращает список (slot_index, instance) — их нужно убрать из UI и удалить.
+        """
+        evicted = []
+        while self._over_budget():
+            victim = next((s for s in self._entries if s != active_slot), None)
+            if victim is None:
+                break
+            evicted.append((victim, self._evict(victim)))
+        return evicted
+
+    def _evict(self, slot_index):
+        instance = self._entries.pop(slot_index)
+        plugin_id = self._plugin_ids.pop(slot_index, None)
+        self._footprints.pop(slot_index, None)
+
+        if hasattr(instance, "save_ui_state"):
+            try:
+                state = instance.save_ui_state()
+                if state is not None:
+                    self._saved_states[slot_index] = (plugin_id, state)
+            except Exception as e:
+                print(f"[PluginCache] save_ui_state error (slot {slot_index}): {e}")
+        return instance
+
+    def pop_saved_state(self, slot_index, plugin_id=None):
+        """Возвращает сохраненное состояние UI слота (если оно от того же плагина)."""
+        saved = self._saved_states.pop(slot_index, None)
+        if saved is None:
+            return None
+        saved_id, state = saved
+        if plugin_id is not None and saved_id != plugin_id:
+            return None
+        return state
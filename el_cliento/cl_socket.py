@@ -3,6 +3,8 @@ from PySide6.QtCore import QObject, Signal, QUrl, QTimer
 from PySide6.QtWebSockets import QWebSocket
 from PySide6.QtNetwork import QAbstractSocket
 
+from src.binary_frame import unpack_frame
+
 class BanditoClient(QObject):
     """
     WebSocket клиент для связи с сервером Bandito.
@@ -11,7 +13,7 @@ class BanditoClient(QObject):
     # Сигналы для UI
     connected = Signal()
     disconnected = Signal()
-    message_received = Signal(dict) # Передает распаршенный JSON
+    message_received = Signal(dict) # Передает распаршенный JSON (бинарный кадр — с ключом "binary")
     log_message = Signal(str) # Для вывода логов в консоль/UI
 
     def __init__(self, parent=None):
@@ -28,6 +30,7 @@ class BanditoClient(QObject):
         self.client.connected.connect(self._on_connected)
         self.client.disconnected.connect(self._on_disconnected)
         self.client.textMessageReceived.connect(self._on_message_received)
+        self.client.binaryMessageReceived.connect(self._on_binary_received)
         self.client.errorOccurred.connect(self._on_error)
 
     def set_connection_info(self, ip, port):
@@ -43,6 +46,9 @@ class BanditoClient(QObject):
             self.log_message.emit(f"Connecting to {self.url.toString()}...")
             self.client.open(self.url)
 
+    def is_connected(self):
+        return self.client.state() == QAbstractSocket.ConnectedState
+
     def disconnect_from_server(self):
         """Принудительное отключение."""
         self.reconnect_timer.stop()
@@ -109,6 +115,16 @@ class BanditoClient(QObject):
         except json.JSONDecodeError:
             self.log_message.emit(f"Received raw: {message[:100]}...")
 
+    def _on_binary_received(self, frame):
+        """Бинарный кадр (src/binary_frame.py) -> то же сообщение, что и JSON, плюс "binary"."""
+        try:
+            data = unpack_frame(frame.data())
+        except ValueError as e:
+            self.log_message.emit(f"Received bad binary frame: {e}")
+            return
+        self.message_received.emit(data)
+        self.log_message.emit(f"Received binary: {data['command']} {data['data']} ({len(data['binary'])} bytes)")
+
     def _on_error(self, error_code):
         error_msg = self.client.errorString()
         self.log_message.emit(f"Socket Error: {error_msg}")
@@ -16,6 +16,16 @@ ROOT_DIR = os.path.dirname(BASE_DIR) # Корневая папка проект
 MANIFEST_FILE = os.path.join(BASE_DIR, "cliento_manifest.json")
 CONFIG_FILE = os.path.join(ROOT_DIR, "configs", "el_cliento_config.json")
 
+# Хранилище ресурсов (src/asset_store.py). На старой установке модуля еще нет —
+# тогда файлы качаются по-старому, хранилище появится после обновления.
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+try:
+    from src.asset_store import AssetStore, ASSET_DIR_NAME
+except ImportError:
+    AssetStore = None
+    ASSET_DIR_NAME = "assets"
+
 # Fallback для конфига, если структура папок отличается (например на RPi)
 if not os.path.exists(CONFIG_FILE):
     # Проверяем в текущей директории
@@ -27,6 +37,8 @@ class Updater:
     def __init__(self):
         self.server_url = None
         self.dev_mode = False
+        self.assets = AssetStore(os.path.join(ROOT_DIR, ASSET_DIR_NAME)) if AssetStore else None
+        self.asset_stats = {"downloaded": 0, "reused": 0}
         self.load_config()
 
     def load_config(self):
@@ -86,6 +98,79 @@ class Updater:
         """Считает MD5 от байтов."""
         return hashlib.md5(data).hexdigest()
 
+    def download_file(self, websocket, remote_path, remote_md5=None):
+        """Скачивает файл (UPDATE_DOWNLOAD_FILE). Возвращает байты или None (ошибка / MD5 не совпал)."""
+        filename = os.path.basename(remote_path)
+        websocket.send(json.dumps({
+            "command": "UPDATE_DOWNLOAD_FILE", 
+            "path": remote_path
+        }))
+        
+        file_response = json.loads(websocket.recv())
+        if file_response.get("type") != "UPDATE_RESPONSE_FILE":
+            logger.error(f"Failed to download {filename}: {file_response.get('message')}")
+            return None
+
+        file_data = base64.b64decode(file_response.get("data"))
+        
+        # Проверка целостности скачанного
+        if remote_md5:
+            downloaded_md5 = self.calculate_bytes_md5(file_data)
+            if downloaded_md5 != remote_md5:
+                logger.error(f"MD5 Mismatch for {filename}! Expected: {remote_md5}, Got: {downloaded_md5}.")
+                return None
+        return file_data
+
+    def write_file(self, local_path, data):
+        """
+        Запись скачанного файла через временный файл и os.replace: если путь раньше
+        был жесткой ссылкой на blob хранилища, ссылка заменяется, а blob не меняется.
+        """
+        tmp_path = local_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, local_path)
+
+    def sync_asset(self, websocket, file_info, local_path, owner, owner_root):
+        """
+        Файл манифеста с полем "blob" — через хранилище ресурсов:
+        blob скачивается, только если его нет ни у одного плагина, файл по пути
+        local_path становится ссылкой на blob, путь записывается в индекс owner.
+        Возвращает True (файл изменился), False (без изменений) или None (ошибка).
+        """
+        blob = file_info["blob"]
+        remote_md5 = file_info.get("md5")
+        local_exists = os.path.exists(local_path)
+        local_same = local_exists and self.calculate_file_md5(local_path) == remote_md5
+
+        if self.assets.has(blob):
+            self.asset_stats["reused"] += 1
+        elif local_same:
+            # Файл скачан до появления хранилища — переносим без загрузки
+            self.assets.put_file(local_path)
+        else:
+            file_data = self.download_file(websocket, file_info["remote_path"], remote_md5)
+            if file_data is None:
+                return None
+            self.assets.put_bytes(file_data, blob)
+            self.asset_stats["downloaded"] += 1
+
+        # Одна копия на диске: файл плагина — жесткая ссылка на blob
+        if not (local_exists and os.path.samefile(local_path, self.assets.blob_path(blob))):
+            self.assets.materialize(blob, local_path)
+
+        rel_path = os.path.relpath(local_path, owner_root)
+        self.assets.bind(owner, rel_path, blob, save=False)
+        return not local_same
+
+    def prune_asset_index(self, owner, kept_paths):
+        """Убирает из индекса пути, которых больше нет в манифесте (их blob'ы удалит GC)."""
+        index = self.assets.index(owner)
+        kept = {path.replace("\\", "/") for path in kept_paths}
+        for rel_path in [path for path in index if path not in kept]:
+            del index[rel_path]
+        self.assets.save_index(owner)
+
     def check_and_update(self):
         """
         Основной метод. 
@@ -145,6 +230,7 @@ class Updater:
                 files_map = manifest.get("files_map", [])
                 total_files = len(files_map)
                 files_updated = False # Флаг: были ли изменения файлов
+                asset_paths = []      # пути ресурсов из хранилища (для индекса "cliento")
                 
                 for index, file_info in enumerate(files_map):
                     remote_path = file_info["remote_path"]
@@ -159,6 +245,15 @@ class Updater:
                     if local_path == MANIFEST_FILE:
                         continue
 
+                    # Ресурс из хранилища (одинаковые файлы качаются один раз)
+                    if file_info.get("blob") and self.assets:
+                        result = self.sync_asset(websocket, file_info, local_path, "cliento", ROOT_DIR)
+                        if result is None:
+                            return False
+                        asset_paths.append(os.path.relpath(local_path, ROOT_DIR))
+                        files_updated = files_updated or result
+                        continue
+
                     # 1. Проверка: нужно ли качать?
                     if os.path.exists(local_path) and remote_md5:
                         local_md5 = self.calculate_file_md5(local_path)
@@ -167,31 +262,16 @@ class Updater:
 
                     # logger.info(f"Downloading [{index+1}/{total_files}]: {filename}...")
                     
-                    websocket.send(json.dumps({
-                        "command": "UPDATE_DOWNLOAD_FILE", 
-                        "path": remote_path
-                    }))
-                    
-                    file_response = json.loads(websocket.recv())
-                    
-                    if file_response.get("type") == "UPDATE_RESPONSE_FILE":
-                        b64_data = file_response.get("data")
-                        file_data = base64.b64decode(b64_data)
-                        
-                        # 2. Проверка целостности скачанного
-                        if remote_md5:
-                            downloaded_md5 = self.calculate_bytes_md5(file_data)
-                            if downloaded_md5 != remote_md5:
-                                logger.error(f"MD5 Mismatch for {filename}! Expected: {remote_md5}, Got: {downloaded_md5}. Aborting.")
-                                return False
-                        
-                        # Записываем файл
-                        with open(local_path, "wb") as f:
-                            f.write(file_data)
-                        files_updated = True # Отмечаем, что было обновление
-                    else:
-                        logger.error(f"Failed to download {filename}: {file_response.get('message')}")
+                    file_data = self.download_file(websocket, remote_path, remote_md5)
+                    if file_data is None:
                         return False
+                    
+                    # Записываем файл
+                    self.write_file(local_path, file_data)
+                    files_updated = True # Отмечаем, что было обновление
+
+                if self.assets:
+                    self.prune_asset_index("cliento", asset_paths)
                 
                 logger.info("Update check completed.")
                 
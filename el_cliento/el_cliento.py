@@ -4,11 +4,11 @@ import os
 # До любых импортов Qt — иначе не применится
 os.environ.setdefault("QT_LOGGING_RULES", "*.debug=false;qt.multimedia.*=false")
 
-import json
+import inspect
 import importlib.util
 
 from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QStackedWidget
-from PySide6.QtCore import Qt, QTimer, QTime
+from PySide6.QtCore import Qt, QTimer, QTime, QEvent
 
 # Определяем путь к корню проекта
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -30,6 +30,9 @@ try:
     from src.manager_save_load import ConfigManager
     from cl_socket import BanditoClient
     from el_core.el_sound_manager import ElSoundManager
+    from cl_plugin_cache import PluginInstanceCache, format_footprint, MB
+    from src.plugin_interface import call_plugin_hook, is_background_state
+    from src.plugin_services import PluginServices
 except ImportError as e:
     print(f"Ошибка импорта логики клиента: {e}")
     ConfigManager = None
@@ -65,10 +68,22 @@ class CliMainWindow(QMainWindow):
         self.socket_client.disconnected.connect(self.on_disconnected)
         self.socket_client.message_received.connect(self._handle_message_received)
         
+        # Общие сервисы для плагинов (звук, стили, ресурсы) — один экземпляр на приложение
+        self.services = PluginServices(project_root, sound=self.sound_manager)
+
         self.current_plugin_config = {}
         self.current_active_slot = None
         self._plugin_btn_connections = {}  # slot_index -> QMetaObject.Connection
-        self._plugin_instance_cache = {}   # slot_index -> QWidget (Кэш для сохранения state)
+
+        # LRU-кэш инстансов плагинов (бюджет из el_cliento_config.json)
+        cache_cfg = self.config_manager.load_config()
+        self._plugin_instance_cache = PluginInstanceCache(
+            max_instances=cache_cfg.get("plugin_cache_max_instances", 3),
+            max_bytes=int(cache_cfg.get("plugin_cache_max_mb", 64) * MB)
+        )
+        # Окно свернуто / приложение в фоне -> on_suspend плагинов, возврат -> on_resume
+        self._plugins_suspended = False
+        QApplication.instance().applicationStateChanged.connect(self.on_application_state_changed)
 
         # Timer for real-time clock
         self.clock_timer = QTimer(self)
@@ -174,6 +189,14 @@ class CliMainWindow(QMainWindow):
                     QObject.disconnect(self._plugin_btn_connections[i])
                     del self._plugin_btn_connections[i]
 
+                # Если в слот назначен другой плагин — старый инстанс больше не нужен
+                cached_id = self._plugin_instance_cache.plugin_id(i)
+                if i in self._plugin_instance_cache and (not plugin_data or plugin_data.get("id") != cached_id):
+                    if self.current_active_slot == i:
+                        self.clear_right_frame()
+                        self.current_active_slot = None
+                    self._dispose_plugin_instance(self._plugin_instance_cache.remove(i))
+
                 if plugin_data:
                     name = plugin_data.get("name", "Unknown")
                     btn.setText(name)
@@ -237,12 +260,17 @@ class CliMainWindow(QMainWindow):
             self.plugin_stack.addWidget(QWidget())
 
         # 0. Проверяем кэш
-        if index in self._plugin_instance_cache:
-            instance = self._plugin_instance_cache[index]
+        instance = self._plugin_instance_cache.get(index)
+        if instance is not None:
             if self.plugin_stack.indexOf(instance) == -1:
                 self.plugin_stack.addWidget(instance)
             
+            previous = self._visible_plugin_widget()
+            if previous is not instance:
+                call_plugin_hook(previous, "on_deactivate")
             self.plugin_stack.setCurrentWidget(instance)
+            if previous is not instance:
+                call_plugin_hook(instance, "on_activate")
             self.current_active_slot = index
             self.update_led_indicators(index)
             return
@@ -287,23 +315,40 @@ class CliMainWindow(QMainWindow):
                 if plugin_class:
                     print(f"[Client] Plugin '{plugin_dir_name}' loaded in slot {index}")
                     
-                    # Инстанцируем класс
-                    ui_plugin = plugin_class(self.socket_client, plugin_path)
+                    # Инстанцируем класс (services — если конструктор его принимает, иначе старая сигнатура)
+                    if "services" in inspect.signature(plugin_class).parameters:
+                        ui_plugin = plugin_class(self.socket_client, plugin_path, services=self.services)
+                    else:
+                        ui_plugin = plugin_class(self.socket_client, plugin_path)
                     
+                    plugin_id = plugin_data.get("id")
+
                     # Автоматическая привязка звуков плагина
                     if self.sound_manager:
-                        plugin_id = plugin_data.get("id")
                         self.sound_manager.bind_buttons(ui_plugin, context=f"plugin_{plugin_id}")
+
+                    # Восстанавливаем состояние UI, если плагин ранее вытеснялся из кэша
+                    saved_state = self._plugin_instance_cache.pop_saved_state(index, plugin_id)
+                    if saved_state is not None and hasattr(ui_plugin, "restore_ui_state"):
+                        try:
+                            ui_plugin.restore_ui_state(saved_state)
+                        except Exception as e:
+                            print(f"[Client] restore_ui_state error: {e}")
                     
                     # Кэшируем
-                    self._plugin_instance_cache[index] = ui_plugin
+                    self._plugin_instance_cache.put(index, ui_plugin, plugin_id)
                     
-                    # Добавляем в стек
+                    # Добавляем в стек (предыдущий плагин уходит в фон)
+                    call_plugin_hook(self._visible_plugin_widget(), "on_deactivate")
                     self.plugin_stack.addWidget(ui_plugin)
                     self.plugin_stack.setCurrentWidget(ui_plugin)
+                    call_plugin_hook(ui_plugin, "on_activate")
                     
                     self.current_active_slot = index
                     self.update_led_indicators(index)
+
+                    # Замер памяти — после первой отрисовки, когда известны размеры виджетов
+                    QTimer.singleShot(0, lambda idx=index: self._measure_plugin_footprint(idx))
                     return # Успех
                     
             except Exception as e:
@@ -313,19 +358,86 @@ class CliMainWindow(QMainWindow):
         print("[Client] Fallback to pure UI loading...")
         # ... (код fallback опущен для краткости, аналогично серверу)
 
+    def _measure_plugin_footprint(self, index):
+        """Логирует оценку памяти плагина и вытесняет лишние плагины из кэша."""
+        footprint = self._plugin_instance_cache.measure(index)
+        if footprint:
+            plugin_id = self._plugin_instance_cache.plugin_id(index)
+            print(f"[Client] Plugin '{plugin_id}' (slot {index}) footprint {format_footprint(footprint)}")
+        self._enforce_plugin_cache_budget()
+
+    def _enforce_plugin_cache_budget(self):
+        """Удаляет из стека и памяти плагины, вытесненные из LRU-кэша."""
+        evicted = self._plugin_instance_cache.evict_over_budget(self.current_active_slot)
+        for slot_idx, instance in evicted:
+            print(f"[Client] Plugin in slot {slot_idx} evicted from cache "
+                  f"(total: {self._plugin_instance_cache.total_bytes() / MB:.1f} MB)")
+            self._dispose_plugin_instance(instance)
+
+    def _dispose_plugin_instance(self, instance):
+        """Убирает виджет плагина из стека и удаляет его."""
+        call_plugin_hook(instance, "on_suspend")
+        if hasattr(self, 'plugin_stack') and self.plugin_stack.indexOf(instance) != -1:
+            self.plugin_stack.removeWidget(instance)
+        instance.deleteLater()
+
     def clear_right_frame(self):
         """Переключает стек на пустой виджет (сохранение state)."""
         self.update_led_indicators(None)
         if hasattr(self, 'plugin_stack'):
+            call_plugin_hook(self._visible_plugin_widget(), "on_deactivate")
             self.plugin_stack.setCurrentIndex(0)
             self.current_active_slot = None
 
+    def _visible_plugin_widget(self):
+        """Текущий видимый плагин в стеке (None, если показана заглушка)."""
+        if not hasattr(self, 'plugin_stack') or self.plugin_stack.currentIndex() <= 0:
+            return None
+        return self.plugin_stack.currentWidget()
+
+    def suspend_plugins(self):
+        """Фон или закрытие окна: on_suspend у всех плагинов кэша (остановка таймеров и потоков)."""
+        if self._plugins_suspended:
+            return
+        self._plugins_suspended = True
+        for slot_idx, instance in self._plugin_instance_cache.items():
+            call_plugin_hook(instance, "on_suspend")
+
+    def resume_plugins(self):
+        """Возврат из фона: on_resume у плагинов кэша, затем on_activate у видимого."""
+        if not self._plugins_suspended:
+            return
+        self._plugins_suspended = False
+        for slot_idx, instance in self._plugin_instance_cache.items():
+            call_plugin_hook(instance, "on_resume")
+        call_plugin_hook(self._visible_plugin_widget(), "on_activate")
+
+    def on_application_state_changed(self, state):
+        if is_background_state(state):
+            self.suspend_plugins()
+        elif state == Qt.ApplicationState.ApplicationActive and not self.isMinimized():
+            self.resume_plugins()
+
+    def changeEvent(self, event):
+        """Свернутое окно: плагинов на экране нет — то же, что уход приложения в фон."""
+        if event.type() == QEvent.Type.WindowStateChange:
+            if self.isMinimized():
+                self.suspend_plugins()
+            else:
+                self.resume_plugins()
+        super().changeEvent(event)
+
+    def closeEvent(self, event):
+        """При закрытии окна выгружаем плагины (остановка таймеров и потоков)."""
+        self.suspend_plugins()
+        super().closeEvent(event)
+
     def load_style(self, style_key):
         """Loads style from JSON file (Material Design)."""
         try:
             path = os.path.join(project_root, "resources", "styles", "style_cl_material.json")
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Кэш по mtime: LED-индикаторы запрашивают стиль при каждом переключении слота
+            data = self.services.styles.load(path)
             
             if style_key in data:
                 return "; ".join([f"{k}: {v}" for k, v in data[style_key].items()])
@@ -395,7 +507,6 @@ class CliMainWindow(QMainWindow):
 
     def eventFilter(self, obj, event):
         """Перехват событий для воспроизведения звуков кликов."""
-        from PySide6.QtCore import QEvent
         from PySide6.QtWidgets import QPushButton, QToolButton
         
         if event.type() == QEvent.MouseButtonPress:
@@ -4,6 +4,8 @@ import json
 import urllib.request
 from PySide6.QtCore import QObject, Signal
 
+from src.binary_frame import pack_frame
+
 # Попытка импорта ServerThread
 # Так как el_core может использоваться в разных контекстах, пробуем разные пути
 try:
@@ -64,21 +66,52 @@ class ElComManager(QObject):
         Отправляет сообщение всем подключенным клиентам.
         Использует локальный API endpoint FastAPI сервера для thread-safe рассылки.
         """
+        payload = {
+            "command": command,
+            "data": data if data is not None else {}
+        }
+        self._post("/api/broadcast", json.dumps(payload).encode('utf-8'))
+
+    def send_to(self, client_id: str, command: str, data: dict = None) -> bool:
+        """
+        Отправляет JSON-сообщение одному клиенту. True — доставлено в сокет.
+        Как и send_binary, идет прямо в цикл сервера, без локального HTTP.
+        """
+        if not self.server_thread:
+            return False
+        payload = {
+            "command": command,
+            "data": data if data is not None else {}
+        }
+        return self.server_thread.send_text(client_id, json.dumps(payload))
+
+    def send_binary(self, client_id: str, command: str, data: dict = None, payload: bytes = b"") -> int:
+        """
+        Отправляет бинарный кадр (src/binary_frame.py) одному клиенту.
+        Кадр идет прямо в цикл сервера (без локального HTTP), можно звать из любого потока.
+        Возвращает размер кадра в байтах или 0, если клиент не найден.
+        """
+        if not self.server_thread:
+            return 0
+        frame = pack_frame(command, data, payload)
+        if self.server_thread.send_bytes(client_id, frame):
+            return len(frame)
+        return 0
+
+    def _post(self, path: str, body: bytes):
+        """POST на локальный API сервера (рассылка). Возвращает JSON-ответ или None при ошибке."""
         try:
-            url = f"http://127.0.0.1:{self.port}/api/broadcast"
-            payload = {
-                "command": command,
-                "data": data if data is not None else {}
-            }
-            json_payload = json.dumps(payload).encode('utf-8')
-            
-            req = urllib.request.Request(url, data=json_payload, headers={'Content-Type': 'application/json'})
+            url = f"http://127.0.0.1:{self.port}{path}"
+            req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
             with urllib.request.urlopen(req) as response:
                 if response.status != 200:
-                    self.log_message.emit("error", f"Broadcast failed with status {response.status}")
+                    self.log_message.emit("error", f"Request {path} failed with status {response.status}")
+                    return None
+                return json.loads(response.read() or b"{}")
         except Exception as e:
             # Часто возникает при остановке сервера, можно игнорировать или логировать как debug
-            self.log_message.emit("error", f"Broadcast failed: {e}")
+            self.log_message.emit("error", f"Request {path} failed: {e}")
+            return None
 
     def _handle_server_signal(self, type_msg, data):
         """
@@ -7,6 +7,7 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout
 from .el_state_manager import ElStateManager
 from .el_com_manager import ElComManager
 from .el_sound_manager import ElSoundManager
+from src.plugin_interface import call_plugin_hook
 
 class ElCore(QObject):
     """
@@ -27,6 +28,7 @@ class ElCore(QObject):
         
         # Инициализация менеджеров
         self.state = ElStateManager(config_path)
+        self._plugins_suspended = False     # приложение в фоне: плагины получили on_suspend
         self.com = ElComManager()
         self.sound = ElSoundManager(self)
         
@@ -55,8 +57,28 @@ class ElCore(QObject):
 
     def stop(self):
         """Остановка ядра и сервисов."""
+        self.suspend_plugins()
         self.com.stop_service()
 
+    def suspend_plugins(self):
+        """Выгрузка или уход в фон: у всех загруженных плагинов вызывается on_suspend (потоки, таймеры)."""
+        if self._plugins_suspended:
+            return
+        self._plugins_suspended = True
+        for slot_index, instance in list(self.state.loaded_plugins.items()):
+            call_plugin_hook(instance, "on_suspend")
+
+    def resume_plugins(self):
+        """Возврат из фона: on_resume у всех загруженных плагинов, затем on_activate у активного."""
+        if not self._plugins_suspended:
+            return
+        self._plugins_suspended = False
+        for slot_index, instance in list(self.state.loaded_plugins.items()):
+            call_plugin_hook(instance, "on_resume")
+        active_idx = self.state.get_active_slot()
+        if active_idx is not None:
+            call_plugin_hook(self.state.get_plugin_instance(active_idx), "on_activate")
+
     def set_sound_enabled(self, enabled: bool):
         """
         Обновляет настройки звука КЛИЕНТА:
@@ -91,6 +113,7 @@ class ElCore(QObject):
         Назначает плагин на слот.
         """
         # Очищаем старый инстанс из кэша при смене плагина
+        call_plugin_hook(self.state.get_plugin_instance(slot_index), "on_suspend")
         self.state.clear_plugin_instance(slot_index)
         
         self.state.update_slot(slot_index, plugin_data)
@@ -126,6 +149,7 @@ class ElCore(QObject):
 
         # Если index None - деактивация
         if slot_index is None:
+            self._deactivate_current_plugin()
             self.state.set_active_slot(None)
             self.com.broadcast("SET_ACTIVE_SLOT", {"index": None})
             self.active_slot_changed.emit(None) # UI должен очистить фрейм
@@ -136,7 +160,8 @@ class ElCore(QObject):
             self.log_message.emit("warning", f"Cannot activate empty slot {slot_index}")
             return
 
-        # 1. Update State
+        # 1. Update State (скрываемый плагин останавливает таймеры/потоки)
+        self._deactivate_current_plugin()
         self.state.set_active_slot(slot_index)
         
         # 2. Broadcast
@@ -151,10 +176,17 @@ class ElCore(QObject):
         try:
             plugin_widget = self._load_plugin_instance(slot_index, plugin_data)
             if plugin_widget:
+                call_plugin_hook(plugin_widget, "on_activate")
                 self.plugin_view_loaded.emit(plugin_widget)
         except Exception as e:
             self.log_message.emit("error", f"Failed to load plugin: {e}")
 
+    def _deactivate_current_plugin(self):
+        """Вызывает on_deactivate у плагина активного слота (если он загружен)."""
+        active_idx = self.state.get_active_slot()
+        if active_idx is not None:
+            call_plugin_hook(self.state.get_plugin_instance(active_idx), "on_deactivate")
+
     # --- Внутренняя логика загрузки плагинов ---
 
     def _load_plugin_instance(self, slot_index, plugin_data):
@@ -281,6 +313,21 @@ class ElCore(QObject):
                         self.log_message.emit("error", f"Plugin execution error: {e}")
                 else:
                     self.log_message.emit("warning", f"Active plugin {active_idx} cannot handle button press")
+            return
+
+        if command == "ASSET_HAVE":
+            # Клиент сообщает, какие файлы (md5) у него уже есть — сервер досылает только недостающее
+            payload = cmd_data.get("payload", {})
+            scope = payload.get("scope")
+            digests = payload.get("digests")
+            client_id = cmd_data.get("client_id")
+            if scope and isinstance(digests, dict) and client_id:
+                self.state.set_client_assets(client_id, scope, digests)
+                print(f"[Core] ASSET_HAVE {client_id} '{scope}': {len(digests)} files")
+
+        # Остальные команды — загруженным плагинам (необязательный метод handle_client_command)
+        for instance in list(self.state.loaded_plugins.values()):
+            call_plugin_hook(instance, "handle_client_command", command, cmd_data.get("payload", {}), cmd_data.get("client_id"))
 
     def _on_client_switched_slot(self, index):
         """Клиент сам переключил слот."""
@@ -288,10 +335,16 @@ class ElCore(QObject):
         self.activate_slot(index)
 
     def _on_client_connected(self, data):
-        self.state.add_client(data.get("ip"))
+        self.state.add_client(data.get("client_id") or data.get("ip"))
 
     def _on_client_disconnected(self, data):
-        self.state.remove_client(data.get("ip"))
+        client_id = data.get("client_id") or data.get("ip")
+        for instance in list(self.state.loaded_plugins.values()):
+            call_plugin_hook(instance, "handle_client_disconnected", client_id)
+        metrics = self.state.remove_client(client_id)
+        if metrics:
+            summary = ", ".join(f"{key}={value}" for key, value in sorted(metrics.items()))
+            self.log_message.emit("info", f"Client {client_id} session: {summary}")
 
     def get_initial_config(self):
         """Возвращает конфиг для начальной инициализации UI."""
@@ -12,6 +12,7 @@ class ElSoundManager(QObject):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.sounds = {}
+        self.file_sounds = {}  # path -> QSoundEffect (кэш для play_file)
         self.config_map = {}
         self._enabled = True
         self._volume = 0.5
@@ -76,14 +77,24 @@ class ElSoundManager(QObject):
             print(f"[SoundManager] Sound not found: '{name}'")
 
     def play_file(self, file_path):
-        """Воспроизводит звук напрямую из файла (без кэширования в self.sounds)."""
-        if not self._enabled or not self._has_audio or not os.path.exists(file_path):
+        """
+        Воспроизводит звук напрямую из файла.
+        Эффект создается один раз на путь и переиспользуется (без повторного декодирования).
+        """
+        if not self._enabled or not self._has_audio:
             return
-            
-        # Создаем временный эффект (Qt сам очистит его, если привязать к parent или использовать deleteLater)
-        effect = QSoundEffect(self)
-        effect.setSource(QUrl.fromLocalFile(file_path))
-        effect.setVolume(self._volume)
+
+        effect = self.file_sounds.get(file_path)
+        if effect is None:
+            if not os.path.exists(file_path):
+                return
+            effect = QSoundEffect(self)
+            effect.setSource(QUrl.fromLocalFile(file_path))
+            effect.setVolume(self._volume)
+            self.file_sounds[file_path] = effect
+
+        if effect.isPlaying():
+            effect.stop()
         effect.play()
 
     def bind_buttons(self, container, context="ui_main"):
@@ -116,5 +127,5 @@ class ElSoundManager(QObject):
         if not self._has_audio:
             return
         self._volume = max(0.0, min(1.0, volume))
-        for effect in self.sounds.values():
+        for effect in list(self.sounds.values()) + list(self.file_sounds.values()):
             effect.setVolume(self._volume)
@@ -20,7 +20,7 @@ class ElStateManager:
     1. Хранение конфигурации слотов (какой плагин где).
     2. Хранение текущего активного слота (runtime).
     3. Кэширование загруженных объектов плагинов.
-    4. Отслеживание подключенных клиентов.
+    4. Отслеживание подключенных клиентов (инвентарь файлов и метрики сессии).
     """
     def __init__(self, config_path):
         self.config_path = config_path
@@ -31,6 +31,8 @@ class ElStateManager:
         self.active_slot = None  # int index or None
         self.loaded_plugins = {} # {index: plugin_instance}
         self.connected_clients = set() # Set of client identifiers (e.g., IP:Port)
+        self.client_assets = {}  # {client_id: {scope: {rel_path: md5}}} — что уже лежит у клиента
+        self.client_metrics = {} # {client_id: {metric: value}} — счетчики текущей сессии
         
         # Инициализация
         self._init_empty_slots()
@@ -154,14 +156,42 @@ class ElStateManager:
     def add_client(self, client_id):
         """Регистрирует подключение клиента."""
         self.connected_clients.add(client_id)
+        self.client_assets[client_id] = {}
+        self.client_metrics[client_id] = {}
         # print(f"[ElStateManager] Client connected: {client_id}. Total: {len(self.connected_clients)}")  # DEBUG
 
     def remove_client(self, client_id):
-        """Регистрирует отключение клиента."""
+        """
+        Регистрирует отключение клиента.
+        Возвращает метрики завершенной сессии.
+        """
         if client_id in self.connected_clients:
             self.connected_clients.remove(client_id)
             # print(f"[ElStateManager] Client disconnected: {client_id}. Total: {len(self.connected_clients)}")  # DEBUG
+        self.client_assets.pop(client_id, None)
+        return self.client_metrics.pop(client_id, {})
 
     def get_clients(self):
         """Возвращает список подключенных клиентов."""
         return list(self.connected_clients)
+
+    # --- Client Assets & Metrics ---
+
+    def set_client_assets(self, client_id, scope: str, digests: dict):
+        """Запоминает инвентарь клиента: {rel_path: md5} для области scope (например, "shortcut/ico")."""
+        if client_id not in self.connected_clients:
+            return
+        self.client_assets.setdefault(client_id, {})[scope] = dict(digests)
+
+    def get_client_assets(self, client_id, scope: str):
+        """
+        Инвентарь клиента для scope (изменяемый dict) или None,
+        если клиент его не присылал (старая версия клиента).
+        """
+        return self.client_assets.get(client_id, {}).get(scope)
+
+    def add_client_metric(self, client_id, key: str, value=1):
+        """Увеличивает счетчик сессии клиента."""
+        metrics = self.client_metrics.get(client_id)
+        if metrics is not None:
+            metrics[key] = metrics.get(key, 0) + value
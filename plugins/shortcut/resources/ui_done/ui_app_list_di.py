@@ -3,7 +3,7 @@
 ################################################################################
 ## Form generated from reading UI file 'app_list_di.ui'
 ##
-## Created by: Qt User Interface Compiler version 6.7.2
+## Created by: Qt User Interface Compiler version 6.8.1
 ##
 ## WARNING! All changes made in this file will be lost when recompiling UI file!
 ################################################################################
@@ -16,8 +16,8 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QApplication, QFrame, QGridLayout, QGroupBox,
-    QHBoxLayout, QLineEdit, QListWidget, QListWidgetItem,
-    QSizePolicy, QToolButton, QVBoxLayout, QWidget)
+    QHBoxLayout, QLineEdit, QListView, QSizePolicy,
+    QToolButton, QVBoxLayout, QWidget)
 
 class Ui_app_list_qW(object):
     def setupUi(self, app_list_qW):
@@ -85,7 +85,7 @@ class Ui_app_list_qW(object):
         self.list_layout.setSpacing(5)
         self.list_layout.setObjectName(u"list_layout")
         self.list_layout.setContentsMargins(5, 5, 5, 5)
-        self.app_listW = QListWidget(self.app_list_groupB)
+        self.app_listW = QListView(self.app_list_groupB)
         self.app_listW.setObjectName(u"app_listW")
         sizePolicy1.setHeightForWidth(self.app_listW.sizePolicy().hasHeightForWidth())
         self.app_listW.setSizePolicy(sizePolicy1)
@@ -3,7 +3,7 @@
 ################################################################################
 ## Form generated from reading UI file 'ico_list_di.ui'
 ##
-## Created by: Qt User Interface Compiler version 6.7.2
+## Created by: Qt User Interface Compiler version 6.8.1
 ##
 ## WARNING! All changes made in this file will be lost when recompiling UI file!
 ################################################################################
@@ -16,8 +16,8 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QApplication, QFrame, QGridLayout, QGroupBox,
-    QHBoxLayout, QListView, QListWidget, QListWidgetItem,
-    QSizePolicy, QToolButton, QVBoxLayout, QWidget)
+    QHBoxLayout, QLineEdit, QListView, QSizePolicy,
+    QToolButton, QVBoxLayout, QWidget)
 
 class Ui_ico_list_qW(object):
     def setupUi(self, ico_list_qW):
@@ -52,11 +52,17 @@ class Ui_ico_list_qW(object):
         self.verticalLayout_3.setSpacing(5)
         self.verticalLayout_3.setObjectName(u"verticalLayout_3")
         self.verticalLayout_3.setContentsMargins(5, 5, 5, 5)
+        self.search_lineE = QLineEdit(self.ico_list_groupB)
+        self.search_lineE.setObjectName(u"search_lineE")
+        self.search_lineE.setClearButtonEnabled(True)
+
+        self.verticalLayout_3.addWidget(self.search_lineE)
+
         self.horizontalLayout = QHBoxLayout()
         self.horizontalLayout.setSpacing(10)
         self.horizontalLayout.setObjectName(u"horizontalLayout")
         self.horizontalLayout.setContentsMargins(5, 5, 5, 5)
-        self.ico_listW = QListWidget(self.ico_list_groupB)
+        self.ico_listW = QListView(self.ico_list_groupB)
         self.ico_listW.setObjectName(u"ico_listW")
         sizePolicy1 = QSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Preferred)
         sizePolicy1.setHorizontalStretch(0)
@@ -98,8 +104,8 @@ class Ui_ico_list_qW(object):
 
         self.verticalLayout_3.addLayout(self.button_layout)
 
-        self.verticalLayout_3.setStretch(0, 9)
-        self.verticalLayout_3.setStretch(1, 1)
+        self.verticalLayout_3.setStretch(1, 9)
+        self.verticalLayout_3.setStretch(2, 1)
 
         self.gridLayout.addWidget(self.ico_list_groupB, 0, 0, 1, 1)
 
@@ -109,15 +115,13 @@ class Ui_ico_list_qW(object):
 
         self.retranslateUi(ico_list_qW)
 
-        self.ico_listW.setCurrentRow(-1)
-
-
         QMetaObject.connectSlotsByName(ico_list_qW)
     # setupUi
 
     def retranslateUi(self, ico_list_qW):
         ico_list_qW.setWindowTitle(QCoreApplication.translate("ico_list_qW", u"Select ico", None))
         self.ico_list_groupB.setTitle(QCoreApplication.translate("ico_list_qW", u"Ico List", None))
+        self.search_lineE.setPlaceholderText(QCoreApplication.translate("ico_list_qW", u"Search", None))
         self.select_toolB.setText(QCoreApplication.translate("ico_list_qW", u"Select", None))
         self.cancel_toolB.setText(QCoreApplication.translate("ico_list_qW", u"\u0421ancel", None))
     # retranslateUi
@@ -3,7 +3,7 @@
 ################################################################################
 ## Form generated from reading UI file 'shortcut_bandito.ui'
 ##
-## Created by: Qt User Interface Compiler version 6.7.2
+## Created by: Qt User Interface Compiler version 6.8.1
 ##
 ## WARNING! All changes made in this file will be lost when recompiling UI file!
 ################################################################################
@@ -19,7 +19,7 @@ from PySide6.QtWidgets import (QApplication, QCheckBox, QComboBox, QFrame,
     QGridLayout, QGroupBox, QHBoxLayout, QHeaderView,
     QKeySequenceEdit, QLabel, QLineEdit, QPushButton,
     QSizePolicy, QStackedWidget, QTabWidget, QToolButton,
-    QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget)
+    QTreeView, QVBoxLayout, QWidget)
 
 class Ui_stream_bandito(object):
     def setupUi(self, stream_bandito):
@@ -119,7 +119,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_10.setAutoRepeatInterval(300)
         self.butt_toolB_10.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_10.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_10.setProperty("applyShadow", True)
+        self.butt_toolB_10.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_10, 2, 1, 1, 1)
 
@@ -138,7 +138,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_09.setAutoRepeatInterval(300)
         self.butt_toolB_09.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_09.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_09.setProperty("applyShadow", True)
+        self.butt_toolB_09.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_09, 2, 0, 1, 1)
 
@@ -157,7 +157,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_01.setAutoRepeatInterval(300)
         self.butt_toolB_01.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_01.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_01.setProperty("applyShadow", True)
+        self.butt_toolB_01.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_01, 0, 0, 1, 1)
 
@@ -176,7 +176,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_02.setAutoRepeatInterval(300)
         self.butt_toolB_02.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_02.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_02.setProperty("applyShadow", True)
+        self.butt_toolB_02.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_02, 0, 1, 1, 1)
 
@@ -195,7 +195,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_08.setAutoRepeatInterval(300)
         self.butt_toolB_08.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_08.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_08.setProperty("applyShadow", True)
+        self.butt_toolB_08.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_08, 1, 3, 1, 1)
 
@@ -214,7 +214,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_07.setAutoRepeatInterval(300)
         self.butt_toolB_07.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_07.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_07.setProperty("applyShadow", True)
+        self.butt_toolB_07.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_07, 1, 2, 1, 1)
 
@@ -233,7 +233,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_03.setAutoRepeatInterval(300)
         self.butt_toolB_03.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_03.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_03.setProperty("applyShadow", True)
+        self.butt_toolB_03.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_03, 0, 2, 1, 1)
 
@@ -252,7 +252,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_11.setAutoRepeatInterval(300)
         self.butt_toolB_11.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_11.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_11.setProperty("applyShadow", True)
+        self.butt_toolB_11.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_11, 2, 2, 1, 1)
 
@@ -271,7 +271,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_06.setAutoRepeatInterval(300)
         self.butt_toolB_06.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_06.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_06.setProperty("applyShadow", True)
+        self.butt_toolB_06.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_06, 1, 1, 1, 1)
 
@@ -290,7 +290,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_04.setAutoRepeatInterval(300)
         self.butt_toolB_04.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_04.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_04.setProperty("applyShadow", True)
+        self.butt_toolB_04.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_04, 0, 3, 1, 1)
 
@@ -309,7 +309,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_12.setAutoRepeatInterval(300)
         self.butt_toolB_12.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_12.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_12.setProperty("applyShadow", True)
+        self.butt_toolB_12.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_12, 2, 3, 1, 1)
 
@@ -328,7 +328,7 @@ class Ui_stream_bandito(object):
         self.butt_toolB_05.setAutoRepeatInterval(300)
         self.butt_toolB_05.setPopupMode(QToolButton.ToolButtonPopupMode.DelayedPopup)
         self.butt_toolB_05.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-        self.butt_toolB_05.setProperty("applyShadow", True)
+        self.butt_toolB_05.setProperty(u"applyShadow", True)
 
         self.gridLayout.addWidget(self.butt_toolB_05, 1, 0, 1, 1)
 
@@ -751,12 +751,11 @@ class Ui_stream_bandito(object):
         self.right_layout = QVBoxLayout()
         self.right_layout.setSpacing(10)
         self.right_layout.setObjectName(u"right_layout")
-        self.treeWidget = QTreeWidget(self.frame)
-        __qtreewidgetitem = QTreeWidgetItem()
-        __qtreewidgetitem.setText(0, u"1");
-        self.treeWidget.setHeaderItem(__qtreewidgetitem)
+        self.treeWidget = QTreeView(self.frame)
         self.treeWidget.setObjectName(u"treeWidget")
         self.treeWidget.setMaximumSize(QSize(250, 430))
+        self.treeWidget.setUniformRowHeights(True)
+        self.treeWidget.header().setVisible(False)
 
         self.right_layout.addWidget(self.treeWidget)
 
@@ -816,9 +815,9 @@ class Ui_stream_bandito(object):
         self.butt_toolB_10.setText(QCoreApplication.translate("stream_bandito", u"...", None))
         self.butt_toolB_09.setText(QCoreApplication.translate("stream_bandito", u"...", None))
         self.butt_toolB_01.setText(QCoreApplication.translate("stream_bandito", u"...", None))
-        self.butt_toolB_01.setProperty("shadowPreset", QCoreApplication.translate("stream_bandito", u"button", None))
+        self.butt_toolB_01.setProperty(u"shadowPreset", QCoreApplication.translate("stream_bandito", u"button", None))
         self.butt_toolB_02.setText(QCoreApplication.translate("stream_bandito", u"...", None))
-        self.butt_toolB_02.setProperty("shadowPreset", QCoreApplication.translate("stream_bandito", u"glow_pink", None))
+        self.butt_toolB_02.setProperty(u"shadowPreset", QCoreApplication.translate("stream_bandito", u"glow_pink", None))
         self.butt_toolB_08.setText(QCoreApplication.translate("stream_bandito", u"...", None))
         self.butt_toolB_07.setText(QCoreApplication.translate("stream_bandito", u"...", None))
         self.butt_toolB_03.setText(QCoreApplication.translate("stream_bandito", u"...", None))
@@ -1,8 +1,10 @@
 import os
 import json
-from PySide6.QtWidgets import QWidget, QButtonGroup, QFileDialog, QMenu, QTreeWidgetItem, QAbstractItemView, QDialog
+import time
+from PySide6.QtWidgets import QApplication, QWidget, QButtonGroup, QFileDialog, QMenu, QAbstractItemView, QDialog
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QIcon, QKeySequence
+from src.plugin_interface import ElPlugin
 
 # Импорты менеджера и сервиса
 try:
@@ -10,11 +12,15 @@ try:
     from .src.sh_bandito_service import (
         load_json, parse_style_to_css, copy_icon_to_plugin
     )
+    from .src.sh_icon_import import is_image_file, button_icon
+    from .src.sh_prefab_library import PrefabTreeModel
 except ImportError:
     from src.sh_bandito_manager import ShortcutBanditoManager
     from src.sh_bandito_service import (
         load_json, parse_style_to_css, copy_icon_to_plugin
     )
+    from src.sh_icon_import import is_image_file, button_icon
+    from src.sh_prefab_library import PrefabTreeModel
 
 # Импорты диалогов
 try:
@@ -43,7 +49,7 @@ except Exception as e:
     print(f"[ShortcutBandito] Error loading UI: {e}")
     Ui_stream_bandito = object
 
-class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
+class ShortcutBanditoPlugin(QWidget, ElPlugin, Ui_stream_bandito):
     def __init__(self, plugin_path, core=None):
         super().__init__()
         self.plugin_path = plugin_path
@@ -112,14 +118,25 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
         self.sh_hand_input_lineE.blockSignals(False)
 
     def setup_tree_widget(self):
-        """Настройка дерева префабов."""
+        """Настройка дерева префабов (модель обновляется сама по сигналам менеджера)."""
+        self.prefab_model = PrefabTreeModel(self.manager, self.plugin_path, self.devicePixelRatioF(), self)
+        self.treeWidget.setModel(self.prefab_model)
         self.treeWidget.setDragEnabled(True)
-        self.treeWidget.setAcceptDrops(True)
-        self.treeWidget.setDropIndicatorShown(True)
-        self.treeWidget.setDragDropMode(QAbstractItemView.DragDrop)
+        self.treeWidget.setDragDropMode(QAbstractItemView.DragOnly)
         self.treeWidget.setContextMenuPolicy(Qt.CustomContextMenu)
         self.treeWidget.customContextMenuRequested.connect(self.show_tree_context_menu)
-        self.update_tree_view()
+        self.prefab_model.modelReset.connect(self.expand_prefab_categories)
+        self.expand_prefab_categories()
+
+    def expand_prefab_categories(self):
+        # Раскрываем только категории: expandAll() держит persistent-индекс на каждую
+        # строку, и любая вставка/удаление префаба обходила бы их все
+        for row in range(self.prefab_model.rowCount()):
+            self.treeWidget.expand(self.prefab_model.index(row, 0))
+
+    def selected_prefab_name(self):
+        """Имя префаба, выделенного в дереве, или None."""
+        return self.prefab_model.prefab_name(self.treeWidget.currentIndex())
 
     def set_editor_enabled(self, enabled):
         self.Example_groupB.setEnabled(enabled)
@@ -171,25 +188,74 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
     def btn_dragEnterEvent(self, event, btn):
         if event.mimeData().hasFormat("application/x-qabstractitemmodeldatalist"):
             event.acceptProposedAction()
+        elif self._dropped_image_path(event):
+            event.acceptProposedAction()
+
+    def _dropped_image_path(self, event):
+        """Путь к картинке, перетаскиваемой из проводника (или None)."""
+        mime = event.mimeData()
+        if not mime.hasUrls():
+            return None
+        for url in mime.urls():
+            path = url.toLocalFile()
+            if path and is_image_file(path):
+                return path
+        return None
 
     def btn_dropEvent(self, event, btn):
-        selected_items = self.treeWidget.selectedItems()
-        if not selected_items: return
-        
-        data = selected_items[0].data(0, Qt.UserRole)
-        prefab_name = data.get("prefab_name")
-        prefabs = self.manager.get_prefabs()
-        
-        if prefab_name in prefabs:
-            new_btn_data = prefabs[prefab_name].copy()
-            self.manager.update_button(self.manager.current_page, btn.objectName(), new_btn_data)
+        # Картинка из проводника -> нормализованная иконка кнопки
+        image_path = self._dropped_image_path(event)
+        if image_path:
+            rel_path = copy_icon_to_plugin(image_path, self.plugin_path)
+            if rel_path:
+                self.current_icon_path = rel_path
+                self.Example_toolB.setIcon(button_icon(self.plugin_path, rel_path))
+                page_data = self.manager.get_data().get(f"page_{self.manager.current_page}", {})
+                btn_data = page_data.get(btn.objectName())
+                if btn_data:
+                    new_btn_data = dict(btn_data, icon_path=rel_path)
+                    self.manager.update_button(self.manager.current_page, btn.objectName(), new_btn_data)
+                event.acceptProposedAction()
+            return
+
+        prefab_name = self.selected_prefab_name()
+        if prefab_name and self.prefab_model.contains(prefab_name):
+            # Бросили на одну из выделенных кнопок — префаб получает все выделение
+            selected = self.selected_button_names()
+            targets = selected if btn.objectName() in selected else [btn.objectName()]
+            self.manager.apply_prefab(prefab_name, targets)
             event.acceptProposedAction()
 
+    def selected_button_names(self):
+        """Выделенные кнопки сетки (Ctrl+клик — несколько)."""
+        return [btn.objectName() for btn in self.button_group.buttons() if btn.isChecked()]
+
     def show_context_menu(self, pos, btn):
+        selected = self.selected_button_names()
+        targets = selected if btn.objectName() in selected else [btn.objectName()]
+
         menu = QMenu(self)
-        delete_action = menu.addAction("Delete")
-        if menu.exec(btn.mapToGlobal(pos)) == delete_action:
-            self.manager.delete_button(self.manager.current_page, btn.objectName())
+        delete_action = menu.addAction("Delete" if len(targets) == 1 else f"Delete ({len(targets)})")
+        menu.addSeparator()
+        duplicate_page_action = menu.addAction("Duplicate page")
+        move_left_action = menu.addAction("Move page left")
+        move_right_action = menu.addAction("Move page right")
+        move_left_action.setEnabled(self.manager.current_page > 1)
+        move_right_action.setEnabled(f"page_{self.manager.current_page + 1}" in self.manager.get_data())
+
+        action = menu.exec(btn.mapToGlobal(pos))
+        page = self.manager.current_page
+        if action == delete_action:
+            with self.manager.batch():
+                for btn_name in targets:
+                    self.manager.delete_button(page, btn_name)
+        elif action == duplicate_page_action:
+            self.manager.current_page = self.manager.duplicate_page(page)
+            self.refresh_page()
+        elif action in (move_left_action, move_right_action):
+            step = -1 if action == move_left_action else 1
+            self.manager.current_page = self.manager.move_page(page, page + step)
+            self.refresh_page()
 
     def on_button_toggled(self, btn_id):
         clicked_btn = self.button_group.button(btn_id)
@@ -200,7 +266,11 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
         sound_key = context_map.get(btn_name, "button_click")
         self.sound_manager.play(sound_key)
 
-        if clicked_btn.isChecked():
+        # Ctrl+клик — добавить/убрать кнопку из выделения (групповые операции)
+        multi_select = bool(QApplication.keyboardModifiers() & Qt.ControlModifier)
+        if clicked_btn.isChecked() and multi_select and len(self.selected_button_names()) > 1:
+            self.set_editor_enabled(False)
+        elif clicked_btn.isChecked():
             for btn in self.button_group.buttons():
                 if btn is not clicked_btn: btn.setChecked(False)
             self.set_editor_enabled(True)
@@ -266,12 +336,11 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
         dialog = SavePrefabDialog(self, default_name=name)
         if dialog.exec() == QDialog.Accepted:
             prefab_name = dialog.get_prefab_name()
-            if prefab_name in self.manager.get_prefabs():
+            if self.prefab_model.contains(prefab_name):
                 if QuestionsDialog(self, question_text=f"Overwrite '{prefab_name}'?").exec() != QDialog.Accepted:
                     return
             self.manager.save_prefab(prefab_name, new_btn_data)
             self.manager.update_button(self.manager.current_page, checked_btn.objectName(), new_btn_data)
-            self.update_tree_view()
 
     def refresh_page(self):
         if hasattr(self, 'current_page_lable'):
@@ -289,7 +358,7 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
                     btn.setText("")
                     icon_path = props.get("icon_path")
                     if icon_path and os.path.exists(os.path.join(self.plugin_path, icon_path)):
-                        btn.setIcon(QIcon(os.path.join(self.plugin_path, icon_path)))
+                        btn.setIcon(button_icon(self.plugin_path, icon_path))
                         size = props.get("icon_size", 64)
                         from PySide6.QtCore import QSize
                         btn.setIconSize(QSize(size, size))
@@ -305,37 +374,19 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
         self.Example_toolB.setIcon(QIcon())
         self.back_page_toolB.setEnabled(self.manager.current_page > 1)
         self.next_page_toolB.setEnabled(f"page_{self.manager.current_page + 1}" in self.manager.get_data())
-        self.update_tree_view()
 
     def update_tree_view(self):
-        self.treeWidget.clear()
-        cats = {
-            "program": QTreeWidgetItem(self.treeWidget, ["Application"]),
-            "shortcut": QTreeWidgetItem(self.treeWidget, ["Shortcut"]),
-            "system": QTreeWidgetItem(self.treeWidget, ["Action"]),
-            "action": QTreeWidgetItem(self.treeWidget, ["Action"]),
-            "other": QTreeWidgetItem(self.treeWidget, ["Other"])
-        }
-        for c in cats.values(): c.setExpanded(True)
-        
-        for name, data in self.manager.get_prefabs().items():
-            item = QTreeWidgetItem([name])
-            item.setData(0, Qt.UserRole, {"prefab_name": name})
-            icon_path = data.get("icon_path")
-            if icon_path and os.path.exists(os.path.join(self.plugin_path, icon_path)):
-                item.setIcon(0, QIcon(os.path.join(self.plugin_path, icon_path)))
-            
-            act_type = data.get("action", {}).get("type", "other")
-            cats.get(act_type, cats["other"]).addChild(item)
+        """Полная пересборка дерева (файл префабов заменен извне)."""
+        self.prefab_model.reload()
 
     def browse_icon_handler(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Select Icon", "", "Images (*.png *.jpg *.ico *.svg)")
+        path, _ = QFileDialog.getOpenFileName(self, "Select Icon", "", "Images (*.png *.jpg *.jpeg *.ico *.svg *.bmp *.gif *.webp)")
         if path:
             rel_path = copy_icon_to_plugin(path, self.plugin_path)
             if rel_path:
                 self.current_icon_path = rel_path
                 from PySide6.QtCore import QSize
-                self.Example_toolB.setIcon(QIcon(os.path.join(self.plugin_path, rel_path)))
+                self.Example_toolB.setIcon(button_icon(self.plugin_path, rel_path))
                 self.Example_toolB.setIconSize(QSize(70, 70))
 
     def open_ico_library(self):
@@ -345,7 +396,7 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
             if rel_path:
                 self.current_icon_path = rel_path
                 from PySide6.QtCore import QSize
-                self.Example_toolB.setIcon(QIcon(os.path.join(self.plugin_path, rel_path)))
+                self.Example_toolB.setIcon(button_icon(self.plugin_path, rel_path))
                 self.Example_toolB.setIconSize(QSize(70, 70))
 
     def load_button_settings(self, btn_name):
@@ -379,7 +430,7 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
         self.Example_toolB.setText(btn_data.get("name", "..."))
         icon_path = btn_data.get("icon_path")
         if icon_path and os.path.exists(os.path.join(self.plugin_path, icon_path)):
-            self.Example_toolB.setIcon(QIcon(os.path.join(self.plugin_path, icon_path)))
+            self.Example_toolB.setIcon(button_icon(self.plugin_path, icon_path))
             size = btn_data.get("icon_size", 64)
             from PySide6.QtCore import QSize
             self.Example_toolB.setIconSize(QSize(size, size))
@@ -396,7 +447,26 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
     def handle_button_press(self, *args, **kwargs):
         """Обработка нажатия кнопки от ядра сервера."""
         if args:
-            self.manager.handle_remote_press(args[0])
+            self.manager.handle_remote_press(args[0], received_at=time.perf_counter())
+
+    def on_deactivate(self):
+        """Плагин скрыт: макросы останавливаются, отложенные правки сразу на диск."""
+        self.manager.executor.cancel_macros()
+        self.manager.flush()
+
+    def on_suspend(self):
+        """Выгрузка плагина / выход из приложения / уход в фон."""
+        self.manager.shutdown()
+
+    def on_resume(self):
+        self.manager.start_executor()
+
+    def handle_client_command(self, command, payload, client_id):
+        """Команды клиентов, пересылаемые ядром (инвентарь иконок и т.п.)."""
+        self.manager.handle_client_command(command, payload, client_id)
+
+    def handle_client_disconnected(self, client_id):
+        self.manager.handle_client_disconnected(client_id)
 
     def open_app_selector(self):
         dialog = AppListDialog(self)
@@ -407,22 +477,24 @@ class ShortcutBanditoPlugin(QWidget, Ui_stream_bandito):
                 if not self.app_title_lineE.text(): self.app_title_lineE.setText(name)
 
     def show_tree_context_menu(self, pos):
-        item = self.treeWidget.itemAt(pos)
-        if not item or not item.parent(): return
+        prefab_name = self.prefab_model.prefab_name(self.treeWidget.indexAt(pos))
+        if not prefab_name: return
         
         menu = QMenu(self.treeWidget)
+        selected = self.selected_button_names()
+        apply_act = menu.addAction(f"Apply to selected ({len(selected)})")
+        apply_act.setEnabled(bool(selected))
         rename_act, delete_act = menu.addAction("Rename"), menu.addAction("Delete")
-        action = menu.exec(self.treeWidget.mapToGlobal(pos))
+        action = menu.exec(self.treeWidget.viewport().mapToGlobal(pos))
         
-        prefab_name = item.data(0, Qt.UserRole).get("prefab_name")
-        if action == delete_act:
+        if action == apply_act:
+            self.manager.apply_prefab(prefab_name, selected)
+        elif action == delete_act:
             if QuestionsDialog(self, question_text=f"Delete prefab '{prefab_name}'?").exec() == QDialog.Accepted:
                 self.manager.delete_prefab(prefab_name)
-                self.update_tree_view()
         elif action == rename_act:
             dialog = SavePrefabDialog(self, default_name=prefab_name)
             if dialog.exec() == QDialog.Accepted:
                 new_name = dialog.get_prefab_name()
                 if new_name != prefab_name:
                     self.manager.rename_prefab(prefab_name, new_name)
-                    self.update_tree_view()
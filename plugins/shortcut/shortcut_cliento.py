@@ -1,54 +1,58 @@
 import os
 import json
 from PySide6.QtWidgets import QWidget, QToolButton, QGridLayout, QFrame, QGraphicsOpacityEffect
-from PySide6.QtGui import QIcon, QPixmap
-from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QEvent, QRect, QSize
+from PySide6.QtGui import QIcon
+from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QEvent, QRect, QSize, QTimer
 
 # Импорты сервисов и менеджера
 try:
     from .src.sh_cliento_service import (
         load_config, load_style_data, parse_style_to_css, 
-        load_anim_config
+        load_anim_config, sorted_page_names, page_sort_key, ICON_OWNER
     )
     from .src.sh_cliento_manager import ShortcutClientManager
+    from .src.sh_icon_cache import get_icon_cache
 except ImportError:
     from src.sh_cliento_service import (
         load_config, load_style_data, parse_style_to_css, 
-        load_anim_config
+        load_anim_config, sorted_page_names, page_sort_key, ICON_OWNER
     )
     from src.sh_cliento_manager import ShortcutClientManager
+    from src.sh_icon_cache import get_icon_cache
+
+from src.asset_store import AssetStore, ASSET_DIR_NAME
 
 try:
     from resources.ui_done.ui_shortcut_cliento import Ui_stream_cliento
 except ImportError:
     from .resources.ui_done.ui_shortcut_cliento import Ui_stream_cliento
 
+# Ленивые страницы: строятся при первом переходе, соседние — заранее в простое
+PAGE_PREFETCH_RADIUS = 1   # сколько страниц по обе стороны от текущей строить заранее
+PAGE_KEEP_RADIUS = 2       # страницы дальше этого расстояния освобождаются (заглушка)
+
 class ShortcutClientPlugin(QWidget, Ui_stream_cliento):
-    def __init__(self, socket_client, plugin_path):
+    def __init__(self, socket_client, plugin_path, services=None):
         super().__init__()
         self.plugin_path = plugin_path
+        self.services = services
         
-        # Инициализация звука
-        from el_core.el_sound_manager import ElSoundManager
-        self.sound_manager = ElSoundManager(self)
-        
-        # Загрузка конфига звуков (как на сервере)
-        sound_cfg_path = os.path.join(os.path.dirname(os.path.dirname(self.plugin_path)), "configs", "el_sound_config.json")
-        self.sound_manager.load_config(sound_cfg_path)
+        # Звук: общий менеджер клиента (звуки и el_sound_config.json уже загружены)
+        if services is not None and services.sound is not None:
+            self.sound_manager = services.sound
+        else:
+            self.sound_manager = self._create_own_sound_manager()
         
-        # Load current sound state from client config
-        try:
-            from src.manager_save_load import ConfigManager
-            cliento_cfg_path = os.path.join(os.path.dirname(os.path.dirname(self.plugin_path)), "configs", "el_cliento_config.json")
-            if os.path.exists(cliento_cfg_path):
-                cliento_cfg = ConfigManager(cliento_cfg_path).load_config()
-                self.sound_manager.set_enabled(cliento_cfg.get("sound_enabled", True))
-        except Exception as e:
-            print(f"[ShortcutPlugin] Error loading sound config: {e}")
+        # Общее хранилище ресурсов (иконки/звуки по индексу плагина)
+        if services is not None and getattr(services, "assets", None) is not None:
+            self.assets = services.assets
+        else:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(plugin_path)))
+            self.assets = AssetStore(os.path.join(project_root, ASSET_DIR_NAME))
         
         # Инициализация менеджера
-        self.manager = ShortcutClientManager(socket_client, plugin_path)
-        self.manager.config_updated.connect(self._handle_config_updated)
+        self.manager = ShortcutClientManager(socket_client, plugin_path, assets=self.assets)
+        self.manager.config_changed.connect(self._apply_config_diff)
         self.manager.page_change_requested.connect(self.handle_page_change)
         
         # Инициализация UI
@@ -57,6 +61,9 @@ class ShortcutClientPlugin(QWidget, Ui_stream_cliento):
         # Загрузка данных
         self.anim_config = load_anim_config(self.plugin_path)
         self.active_animations = {}
+        self.icon_cache = get_icon_cache(self.plugin_path)
+        self._swapping_page = False
+        self._prefetch_scheduled = False
         
         # Применение стилей и конфига
         self.apply_plugin_styles()
@@ -65,15 +72,40 @@ class ShortcutClientPlugin(QWidget, Ui_stream_cliento):
         # Настройка кнопок
         self.setup_buttons()
         
-        # Применяем эффекты Elevation
+        # Применяем эффекты Elevation (только уже построенные страницы)
         for btn in self.findChildren(QToolButton):
             if btn.property("applyShadow"):
                 self.apply_elevation(btn)
+
+        # Ленивая сборка: текущая страница сразу, соседние — в простое
+        self.Button_stackedWidget.currentChanged.connect(self._on_current_page_changed)
+        self._ensure_page_built(self.Button_stackedWidget.currentIndex())
+        self._schedule_prefetch()
         
         # Подписка на сокет через менеджер
         if socket_client:
             socket_client.message_received.connect(self.manager.on_server_message)
 
+    def _create_own_sound_manager(self):
+        """Фоллбек для запуска без services: собственный ElSoundManager."""
+        from el_core.el_sound_manager import ElSoundManager
+        sound_manager = ElSoundManager(self)
+        
+        # Загрузка конфига звуков (как на сервере)
+        sound_cfg_path = os.path.join(os.path.dirname(os.path.dirname(self.plugin_path)), "configs", "el_sound_config.json")
+        sound_manager.load_config(sound_cfg_path)
+        
+        # Load current sound state from client config
+        try:
+            from src.manager_save_load import ConfigManager
+            cliento_cfg_path = os.path.join(os.path.dirname(os.path.dirname(self.plugin_path)), "configs", "el_cliento_config.json")
+            if os.path.exists(cliento_cfg_path):
+                cliento_cfg = ConfigManager(cliento_cfg_path).load_config()
+                sound_manager.set_enabled(cliento_cfg.get("sound_enabled", True))
+        except Exception as e:
+            print(f"[ShortcutPlugin] Error loading sound config: {e}")
+        return sound_manager
+
     def apply_plugin_styles(self):
         """Загружает и применяет стили."""
         # Новые стили Material 2
@@ -82,6 +114,12 @@ class ShortcutClientPlugin(QWidget, Ui_stream_cliento):
         # Старые стили (закомментированы)
         # style_path = os.path.join(self.plugin_path, "config", "style_shortcut_cliento.json")
         
+        if self.services is not None:
+            css = self.services.styles.css(style_path, skip=("animation",))
+            if css:
+                self.setStyleSheet(css)
+            return
+
         if os.path.exists(style_path):
             try:
                 with open(style_path, 'r', encoding='utf-8') as f:
@@ -152,10 +190,181 @@ class ShortcutClientPlugin(QWidget, Ui_stream_cliento):
         self.active_animations[btn] = anim
         anim.start()
 
-    def _handle_config_updated(self, new_config):
-        """Реакция на обновление конфига от менеджера."""
-        self.clear_ui()
-        self.setup_buttons()
+    def _apply_config_diff(self, diff):
+        """
+        Точечное обновление UI по diff конфига (см. diff_configs).
+        Перестраиваются только новые страницы и изменившиеся кнопки;
+        текущая страница и состояние остальных кнопок сохраняются.
+        """
+        stack = self.Button_stackedWidget
+        current_page = stack.currentWidget()
+        current_name = current_page.objectName() if current_page else None
+        current_index = stack.currentIndex()
+
+        # 1. Удаленные страницы
+        for page_name in diff["removed_pages"]:
+            page = self._find_page(page_name)
+            if page is not None:
+                self._forget_animations(page)
+                stack.removeWidget(page)
+                page.deleteLater()
+
+        # 2. Новые страницы — заглушкой на свое место по номеру (строятся при переходе)
+        for page_name in diff["added_pages"]:
+            page = self._find_page(page_name)
+            if page is None:
+                stack.insertWidget(self._page_insert_index(page_name), self._create_placeholder(page_name))
+            elif not self._is_placeholder(page):
+                self._init_page(page, self.manager.config.get(page_name, {}))
+
+        # 3. Изменившиеся кнопки построенных страниц (заглушки соберутся из нового конфига)
+        for page_name, changes in diff["changed_buttons"].items():
+            page = self._find_page(page_name)
+            if page is None or self._is_placeholder(page):
+                continue
+            for btn_name, props in changes.items():
+                btn = page.findChild(QToolButton, btn_name)
+                if btn is None:
+                    continue
+                if props is None or "icon_path" not in props:
+                    btn.setIcon(QIcon())
+                if props is not None:
+                    self.configure_button(btn, props)
+
+        # 4. Возвращаемся на ту же страницу (или ближайшую, если ее удалили)
+        page = self._find_page(current_name) if current_name else None
+        if page is not None:
+            self._show_page(stack.indexOf(page))
+        elif stack.count() > 0:
+            self._show_page(max(0, min(current_index, stack.count() - 1)))
+        self._schedule_prefetch()
+
+    def _find_page(self, page_name):
+        """Страница стека по objectName (None, если нет)."""
+        stack = self.Button_stackedWidget
+        for i in range(stack.count()):
+            widget = stack.widget(i)
+            if widget.objectName() == page_name:
+                return widget
+        return None
+
+    def _page_insert_index(self, page_name):
+        """Позиция новой страницы в стеке с учетом сортировки по номеру."""
+        stack = self.Button_stackedWidget
+        key = page_sort_key(page_name)
+        index = 0
+        while index < stack.count() and page_sort_key(stack.widget(index).objectName()) < key:
+            index += 1
+        return index
+
+    def _init_page(self, page, buttons_config):
+        """Настройка кнопок, теней и обработчиков одной страницы."""
+        for btn in page.findChildren(QToolButton):
+            props = buttons_config.get(btn.objectName())
+            if props:
+                self.configure_button(btn, props)
+            if btn.graphicsEffect() is None:
+                self.apply_elevation(btn)
+            self._bind_button(btn)
+
+    def _forget_animations(self, page):
+        """Останавливает анимации кнопок удаляемой страницы."""
+        for btn in page.findChildren(QToolButton):
+            anim = self.active_animations.pop(btn, None)
+            if anim:
+                anim.stop()
+
+    # --- Ленивые страницы ---
+
+    def _create_placeholder(self, page_name):
+        """Пустая страница-заглушка: держит место в стеке, пока страница не нужна."""
+        page = QWidget()
+        page.setObjectName(page_name)
+        page.setProperty("lazyPage", True)
+        return page
+
+    def _is_placeholder(self, page):
+        return bool(page.property("lazyPage"))
+
+    def _swap_page(self, index, new_page):
+        """Заменяет виджет страницы в стеке, не меняя текущую страницу."""
+        stack = self.Button_stackedWidget
+        old_page = stack.widget(index)
+        was_current = stack.currentIndex() == index
+        self._swapping_page = True
+        try:
+            stack.insertWidget(index, new_page)
+            if was_current:
+                stack.setCurrentWidget(new_page)
+            stack.removeWidget(old_page)
+        finally:
+            self._swapping_page = False
+        old_page.deleteLater()
+
+    def _ensure_page_built(self, index):
+        """Строит страницу вместо заглушки (кнопки, тени, обработчики). Возвращает страницу."""
+        stack = self.Button_stackedWidget
+        page = stack.widget(index)
+        if page is None or not self._is_placeholder(page):
+            return page
+
+        page_name = page.objectName()
+        built = self.create_page_structure(page_name)
+        self._init_page(built, self.manager.config.get(page_name, {}))
+        self._swap_page(index, built)
+        return built
+
+    def _release_page(self, index):
+        """Возвращает далекую страницу к заглушке, освобождая виджеты и тени."""
+        stack = self.Button_stackedWidget
+        page = stack.widget(index)
+        if page is None or self._is_placeholder(page) or index == stack.currentIndex():
+            return
+        self._forget_animations(page)
+        self._swap_page(index, self._create_placeholder(page.objectName()))
+
+    def _show_page(self, index):
+        """Переход на страницу: сначала сборка, затем показ (без мигания заглушки)."""
+        stack = self.Button_stackedWidget
+        if not 0 <= index < stack.count():
+            return
+        self._ensure_page_built(index)
+        stack.setCurrentIndex(index)
+
+    def _on_current_page_changed(self, index):
+        """Страховка для прямых setCurrentIndex: достраиваем страницу и соседей."""
+        if self._swapping_page or index < 0:
+            return
+        self._ensure_page_built(index)
+        self._schedule_prefetch()
+
+    def _schedule_prefetch(self):
+        if not self._prefetch_scheduled:
+            self._prefetch_scheduled = True
+            QTimer.singleShot(0, self._prefetch_neighbours)
+
+    def _prefetch_neighbours(self):
+        """
+        Строит по одной соседней странице за проход цикла событий,
+        затем освобождает страницы дальше PAGE_KEEP_RADIUS.
+        """
+        self._prefetch_scheduled = False
+        stack = self.Button_stackedWidget
+        current = stack.currentIndex()
+        if current < 0:
+            return
+
+        for distance in range(1, PAGE_PREFETCH_RADIUS + 1):
+            for index in (current + distance, current - distance):
+                page = stack.widget(index) if 0 <= index < stack.count() else None
+                if page is not None and self._is_placeholder(page):
+                    self._ensure_page_built(index)
+                    self._schedule_prefetch()
+                    return
+
+        for index in range(stack.count()):
+            if abs(index - current) > PAGE_KEEP_RADIUS:
+                self._release_page(index)
 
     def handle_page_change(self, direction):
         """Навигация по страницам."""
@@ -194,16 +403,19 @@ class ShortcutClientPlugin(QWidget, Ui_stream_cliento):
         existing_pages = {self.Button_stackedWidget.widget(i).objectName(): self.Button_stackedWidget.widget(i) 
                           for i in range(self.Button_stackedWidget.count())}
 
-        sorted_pages = sorted(self.manager.config.keys(), 
-                             key=lambda x: int(x.split('_')[1]) if '_' in x else 0)
+        sorted_pages = sorted_page_names(self.manager.config)
 
         for page_name in sorted_pages:
             if page_name not in existing_pages:
-                page_widget = self.create_page_structure(page_name)
+                # Страница строится при первом переходе (см. _ensure_page_built)
+                page_widget = self._create_placeholder(page_name)
                 self.Button_stackedWidget.addWidget(page_widget)
                 existing_pages[page_name] = page_widget
+                continue
             
             page_widget = existing_pages[page_name]
+            if self._is_placeholder(page_widget):
+                continue
             for btn_name, btn_props in self.manager.config[page_name].items():
                 btn = page_widget.findChild(QToolButton, btn_name)
                 if btn:
@@ -260,38 +472,56 @@ class ShortcutClientPlugin(QWidget, Ui_stream_cliento):
         btn.setIconSize(QSize(130, 130))
         
         if "icon_path" in props:
-            icon_path = os.path.join(self.plugin_path, props["icon_path"])
-            if os.path.exists(icon_path):
-                icon = QIcon()
-                icon.addPixmap(QPixmap(icon_path), QIcon.Normal, QIcon.Off)
+            # Иконка растеризуется один раз под размер кнопки (RAM/диск кэш)
+            icon_path = self.asset_path(props["icon_path"])
+            icon = self.icon_cache.icon(icon_path, btn.iconSize(), btn.devicePixelRatioF())
+            if icon is not None:
                 btn.setIcon(icon)
 
+    def asset_path(self, rel_path):
+        """Путь к ресурсу плагина через индекс AssetStore (иначе файл в папке плагина)."""
+        return self.assets.resolve(ICON_OWNER, rel_path, self.plugin_path)
+
     def bind_all_buttons(self):
         """Подключение сигналов клика."""
         for btn in self.findChildren(QToolButton):
-            btn.installEventFilter(self)
-            
-            # 1. Отключаем только наше предыдущее соединение, если оно существует
-            if hasattr(btn, '_click_connection'):
-                try:
-                    btn.clicked.disconnect(btn._click_connection)
-                except (TypeError, RuntimeError):
-                    pass
-            
-            # 2. Создаем новое соединение и сохраняем ссылку на него
-            # Используем lambda с захватом текущего btn
-            btn._click_connection = btn.clicked.connect(lambda checked=False, b=btn: self.on_ui_button_clicked(b))
+            self._bind_button(btn)
 
-    def on_ui_button_clicked(self, btn):
-        """Передача клика в менеджер и воспроизведение звука."""
-        page_id = "unknown"
+    def _bind_button(self, btn):
+        """Фильтр анимации и обработчик клика для одной кнопки."""
+        btn.installEventFilter(self)
+        
+        # 1. Отключаем только наше предыдущее соединение, если оно существует
+        if hasattr(btn, '_click_connection'):
+            try:
+                btn.clicked.disconnect(btn._click_connection)
+            except (TypeError, RuntimeError):
+                pass
+        
+        # 2. Создаем новое соединение и сохраняем ссылку на него
+        # Используем lambda с захватом текущего btn
+        btn._click_connection = btn.clicked.connect(lambda checked=False, b=btn: self.on_ui_button_clicked(b))
+
+        # Нажатие/отпускание — для макросов "пока удерживается"
+        if not hasattr(btn, '_hold_connections'):
+            btn._hold_connections = (
+                btn.pressed.connect(lambda b=btn: self.manager.process_button_down(b.objectName(), self._page_id_of(b))),
+                btn.released.connect(lambda b=btn: self.manager.process_button_up(b.objectName(), self._page_id_of(b))),
+            )
+
+    def _page_id_of(self, btn):
+        """Имя страницы (page_N), на которой находится кнопка."""
         parent = btn.parentWidget()
         while parent and parent != self:
             if "page" in parent.objectName():
-                page_id = parent.objectName()
-                break
+                return parent.objectName()
             parent = parent.parentWidget()
-            
+        return "unknown"
+
+    def on_ui_button_clicked(self, btn):
+        """Передача клика в менеджер и воспроизведение звука."""
+        page_id = self._page_id_of(btn)
+
         # 1. Воспроизведение звука
         btn_name = btn.objectName()
         sound_played = False
@@ -306,26 +536,48 @@ class ShortcutClientPlugin(QWidget, Ui_stream_cliento):
         if not sound_played:
             btn_props = self.manager.get_button_props(btn_name, page_id)
             if btn_props and "sound_path" in btn_props:
-                sound_file = os.path.join(self.plugin_path, btn_props["sound_path"])
+                sound_file = self.asset_path(btn_props["sound_path"])
                 if os.path.exists(sound_file):
                     self.sound_manager.play_file(sound_file)
                     sound_played = True
         
         # Звук по умолчанию, если ничего не найдено
         if not sound_played:
-            default_sound = os.path.join(self.plugin_path, "resources", "sound", "button_click.wav")
+            default_sound = self.asset_path("resources/sound/button_click.wav")
             if os.path.exists(default_sound):
                 self.sound_manager.play_file(default_sound)
 
         # 2. Логика действия
         self.manager.process_button_click(btn.objectName(), page_id)
 
+    def on_deactivate(self):
+        """Плагин скрыт: останавливаем анимации и возвращаем кнопки в исходный размер."""
+        for btn, anim in list(self.active_animations.items()):
+            anim.stop()
+            if hasattr(btn, 'original_geometry'):
+                btn.setGeometry(btn.original_geometry)
+        self.active_animations.clear()
+
+    def on_suspend(self):
+        self.on_deactivate()
+        self.icon_cache.flush_index()
+
+    def save_ui_state(self):
+        """Состояние UI для восстановления после вытеснения из кэша клиента."""
+        return {"page_index": self.Button_stackedWidget.currentIndex()}
+
+    def restore_ui_state(self, state):
+        """Восстановление состояния UI (текущая страница)."""
+        idx = state.get("page_index", 0)
+        if 0 <= idx < self.Button_stackedWidget.count():
+            self._show_page(idx)
+
     def next_page(self):
         idx = self.Button_stackedWidget.currentIndex()
         if idx < self.Button_stackedWidget.count() - 1:
-            self.Button_stackedWidget.setCurrentIndex(idx + 1)
+            self._show_page(idx + 1)
 
     def prev_page(self):
         idx = self.Button_stackedWidget.currentIndex()
         if idx > 0:
-            self.Button_stackedWidget.setCurrentIndex(idx - 1)
+            self._show_page(idx - 1)
@@ -1,10 +1,6 @@
 import os
-import sys
-from PySide6.QtWidgets import QDialog, QListWidgetItem, QAbstractItemView
-from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QIcon
-from PySide6.QtWidgets import QFileIconProvider
-from PySide6.QtCore import QFileInfo
+from PySide6.QtWidgets import QDialog, QAbstractItemView
+from PySide6.QtCore import Qt
 
 # Импорт UI
 try:
@@ -12,122 +8,113 @@ try:
 except ImportError:
     from ..resources.ui_done.ui_app_list_di import Ui_app_list_qW
 
+try:
+    from .sh_app_index import AppIndex, AppIndexThread, AppListModel, AppFilterProxy, INDEX_FILE_NAME
+    from .sh_app_search import AppUsage, USAGE_FILE_NAME
+except ImportError:
+    from sh_app_index import AppIndex, AppIndexThread, AppListModel, AppFilterProxy, INDEX_FILE_NAME
+    from sh_app_search import AppUsage, USAGE_FILE_NAME
+
+# Сканеры, пережившие закрытие диалога: держим ссылку до завершения потока
+_running_scanners = set()
+
+
 class AppListDialog(QDialog, Ui_app_list_qW):
     """
     Диалог выбора приложения из меню Пуск.
+    Список — модель/представление: индекс с прошлого запуска показывается сразу,
+    обновление (по mtime папок) идет в фоне.
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, roots=None, index_path=None, usage_path=None):
         super().__init__(parent)
         self.setupUi(self)
+        config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config")
 
         self.setWindowTitle("Select Application")
         self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
 
+        # Модель и ранжированный поиск (частые выборы — выше)
+        self.usage = AppUsage(usage_path or os.path.join(config_dir, USAGE_FILE_NAME))
+        self.model = AppListModel(self)
+        self.proxy = AppFilterProxy(self, usage=self.usage)
+        self.proxy.setSourceModel(self.model)
+
         # Настройка списка
+        self.app_listW.setModel(self.proxy)
+        self.app_listW.setUniformItemSizes(True)
         self.app_listW.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.app_listW.itemSelectionChanged.connect(self.on_selection_changed)
-        self.app_listW.itemDoubleClicked.connect(self.accept)
-
-        # Икон-провайдер для получения иконок файлов
-        self.icon_provider = QFileIconProvider()
+        self.app_listW.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        self.proxy.modelReset.connect(self.on_selection_changed)
+        self.app_listW.doubleClicked.connect(self.accept)
 
         # Кнопки
         self.select_toolB.clicked.connect(self.accept)
         self.cancel_toolB.clicked.connect(self.reject)
         self.select_toolB.setEnabled(False)
 
-        # Инициализация списка для хранения всех приложений
-        self.all_apps = []
-
         # Подключение сигналов поиска
         self.search_lineE.textChanged.connect(self.on_search_text_changed)
         self.search_toolB.clicked.connect(self.on_search_button_clicked)
 
-        # Загрузка списка (в фоне или сразу)
+        # Индекс приложений (roots — для других папок, например тестового дерева)
+        self.index = AppIndex(index_path or os.path.join(config_dir, INDEX_FILE_NAME), roots)
+        self._scanner = None
         self.load_applications()
 
     def load_applications(self):
-        """Сканирует папки Start Menu и заполняет список."""
-        # Пути к Start Menu
-        paths = [
-            os.path.join(os.environ["ProgramData"], "Microsoft", "Windows", "Start Menu", "Programs"),
-            os.path.join(os.environ["APPDATA"], "Microsoft", "Windows", "Start Menu", "Programs")
-        ]
-
-        apps = []
-
-        for root_path in paths:
-            if not os.path.exists(root_path): continue
-
-            for root, dirs, files in os.walk(root_path):
-                for file in files:
-                    if file.lower().endswith(".lnk"):
-                        name = os.path.splitext(file)[0]
-                        full_path = os.path.join(root, file)
-                        apps.append((name, full_path))
-
-        # Сортировка по имени
-        apps.sort(key=lambda x: x[0].lower())
-
-        # Сохранение полного списка приложений
-        self.all_apps = apps
-
-        # Отображение списка
-        self.refresh_list_display(self.all_apps)
-
-    def refresh_list_display(self, apps_to_display):
-        """Очищает и перезаполняет список приложений."""
-        self.app_listW.clear()
-
-        for name, path in apps_to_display:
-            item = QListWidgetItem(name)
-            item.setToolTip(path)
-            item.setData(Qt.UserRole, path)
-
-            # Получаем иконку
-            file_info = QFileInfo(path)
-            icon = self.icon_provider.icon(file_info)
-            item.setIcon(icon)
-
-            self.app_listW.addItem(item)
-
-    def filter_applications(self, search_text):
-        """Фильтрует приложения по поисковому тексту (case-insensitive startswith)."""
-        # Если текст пуст, возвращаем все приложения
-        if not search_text.strip():
-            return self.all_apps
-
-        # Фильтруем приложения: ищем совпадение в начале имени (case-insensitive)
-        search_text_lower = search_text.lower()
-        filtered_apps = [
-            (name, path) for name, path in self.all_apps
-            if name.lower().startswith(search_text_lower)
-        ]
-
-        return filtered_apps
+        """Показывает сохраненный индекс и запускает фоновое обновление."""
+        self.model.set_apps(self.index.cached_apps())
+
+        self._scanner = AppIndexThread(self.index)
+        self._scanner.apps_ready.connect(self.on_apps_ready)
+        self._scanner.finished.connect(lambda scanner=self._scanner: _running_scanners.discard(scanner))
+        _running_scanners.add(self._scanner)
+        self._scanner.start()
+
+    def on_apps_ready(self, apps):
+        """Результат фонового сканирования: модель сбрасывается, только если список изменился."""
+        if apps != self.model.apps():
+            selected_path, _ = self.get_selected_app()
+            self.model.set_apps(apps)
+            self.select_path(selected_path)
+
+    def select_path(self, path):
+        if not path:
+            return
+        for row in range(self.proxy.rowCount()):
+            index = self.proxy.index(row, 0)
+            if index.data(Qt.UserRole) == path:
+                self.app_listW.setCurrentIndex(index)
+                break
 
     def on_search_text_changed(self, text):
-        """Обработчик изменения текста в поле поиска (поиск в реальном времени)."""
-        filtered_apps = self.filter_applications(text)
-        self.refresh_list_display(filtered_apps)
+        """Обработчик изменения текста в поле поиска (поиск в реальном времени, лучшее совпадение — первым)."""
+        self.proxy.set_search_text(text)
+        if self.proxy.rowCount() and text.strip():
+            self.app_listW.setCurrentIndex(self.proxy.index(0, 0))
 
     def on_search_button_clicked(self):
         """Обработчик нажатия кнопки поиска."""
-        search_text = self.search_lineE.text()
-        filtered_apps = self.filter_applications(search_text)
-        self.refresh_list_display(filtered_apps)
+        self.proxy.set_search_text(self.search_lineE.text())
 
-    def on_selection_changed(self):
+    def on_selection_changed(self, *args):
         """Активирует кнопку выбора при выделении элемента."""
-        self.select_toolB.setEnabled(bool(self.app_listW.selectedItems()))
+        self.select_toolB.setEnabled(self.app_listW.selectionModel().hasSelection())
 
     def get_selected_app(self):
         """Возвращает (path, name) выбранного приложения."""
-        items = self.app_listW.selectedItems()
-        if not items:
+        indexes = self.app_listW.selectionModel().selectedIndexes()
+        if not indexes:
             return None, None
-            
-        item = items[0]
-        name = item.text()
-        path = item.data(Qt.UserRole)
-        return path, name
+        index = indexes[0]
+        return index.data(Qt.UserRole), index.data(Qt.DisplayRole)
+
+    def done(self, result):
+        if result == QDialog.Accepted:
+            path, _ = self.get_selected_app()
+            if path:
+                self.usage.record(path)
+        # Сканирование может еще идти — результат закрытому диалогу не нужен
+        if self._scanner is not None and self._scanner.isRunning():
+            self._scanner.apps_ready.disconnect(self.on_apps_ready)
+        super().done(result)
@@ -1,43 +1,58 @@
 import os
-from PySide6.QtWidgets import QDialog, QListWidgetItem
-from PySide6.QtGui import QIcon
-from PySide6.QtCore import QSize
+from PySide6.QtWidgets import QDialog
+from PySide6.QtCore import Qt
 
 try:
     from resources.ui_done.ui_ico_list_di import Ui_ico_list_qW
 except ImportError:
     from ..resources.ui_done.ui_ico_list_di import Ui_ico_list_qW
 
+try:
+    from .sh_icon_library import IconLibraryModel, IconFilterProxy, list_icon_files
+except ImportError:
+    from sh_icon_library import IconLibraryModel, IconFilterProxy, list_icon_files
+
+
 class IcoListDialog(QDialog, Ui_ico_list_qW):
+    """
+    Библиотека иконок (resources/ico).
+    Открывается сразу: список файлов — без декодирования, миниатюры строятся
+    в пуле потоков только для видимых ячеек и кэшируются на диске.
+    """
     def __init__(self, parent=None, icon_dir=""):
         super().__init__(parent)
         self.setupUi(self)
         self.icon_dir = icon_dir
         self.selected_icon_path = None
-        
+
+        # resources/ico -> корень плагина (для кэша миниатюр)
+        plugin_path = os.path.dirname(os.path.dirname(os.path.abspath(icon_dir)))
+        self.model = IconLibraryModel(plugin_path, self.ico_listW.iconSize(), self.devicePixelRatioF(), self)
+        self.proxy = IconFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.ico_listW.setModel(self.proxy)
+        self.ico_listW.setUniformItemSizes(True)
+
         self.load_icons()
-        
+
         self.select_toolB.clicked.connect(self.accept)
         self.cancel_toolB.clicked.connect(self.reject)
-        self.ico_listW.itemDoubleClicked.connect(self.accept)
+        self.ico_listW.doubleClicked.connect(self.accept)
+        self.search_lineE.textChanged.connect(self.proxy.set_search_text)
 
     def load_icons(self):
         if not os.path.exists(self.icon_dir):
             return
-            
-        extensions = ('.png', '.jpg', '.jpeg', '.ico', '.svg')
-        for file_name in os.listdir(self.icon_dir):
-            if file_name.lower().endswith(extensions):
-                full_path = os.path.join(self.icon_dir, file_name)
-                item = QListWidgetItem(file_name)
-                item.setIcon(QIcon(full_path))
-                item.setData(32, full_path) # Qt.UserRole = 32
-                self.ico_listW.addItem(item)
+        self.model.set_icons(list_icon_files(self.icon_dir))
 
     def get_selected_icon(self):
-        current_item = self.ico_listW.currentItem()
-        if current_item:
+        index = self.ico_listW.currentIndex()
+        if index.isValid():
             # Возвращаем относительный путь для сохранения в конфиге
             # Предполагаем, что иконки всегда в resources/ico внутри плагина
-            return os.path.join("resources", "ico", current_item.text()).replace("\\", "/")
+            return os.path.join("resources", "ico", index.data(Qt.UserRole)).replace("\\", "/")
         return None
+
+    def done(self, result):
+        self.model.shutdown()
+        super().done(result)
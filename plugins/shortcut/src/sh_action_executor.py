@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import time
+import queue
+import shlex
+import shutil
+import threading
+import subprocess
+from src.latency_histogram import LatencyHistogram
+try:
+    from .sh_macro_scheduler import Macro, MacroScheduler
+except ImportError:
+    from sh_macro_scheduler import Macro, MacroScheduler
+
+try:
+    import keyboard
+except ImportError:
+    keyboard = None
+
+# Ярлыки .lnk разбираются через WScript.Shell (pywin32, только Windows)
+try:
+    import pythoncom
+    import win32com.client
+except ImportError:
+    pythoncom = None
+
+# Алиасы клавиш: текст QKeySequence ("Win+E", "Meta+E") -> имена keyboard
+KEY_ALIASES = {"win": "windows", "meta": "windows", "del": "delete", "ins": "insert",
+               "pgup": "page up", "pgdown": "page down", "return": "enter", "esc": "esc"}
+# Файлы, которые запускаются напрямую (без оболочки и ассоциаций)
+EXECUTABLE_EXTENSIONS = (".exe", ".com")
+# Нажатие дольше этого — в лог (очередь забита или тяжелый запуск)
+SLOW_PRESS_MS = 100
+# Интервал повтора макроса "held" по умолчанию (мс)
+DEFAULT_REPEAT_INTERVAL_MS = 100
+
+
+class CompiledAction:
+    """
+    Действие кнопки, подготовленное заранее:
+      hotkey  — разобранная последовательность клавиш (keyboard.parse_hotkey);
+      launch  — argv + рабочая папка (Popen без оболочки);
+      open    — файл/ссылка через ассоциацию ОС (.url, документы, папки);
+      shell   — крайний случай: строка, которую не удалось разобрать в argv;
+      macro   — Macro (sh_macro_scheduler), выполняется MacroScheduler.
+    Только внутри макроса: delay (секунды), key_down / key_up (разобранные клавиши).
+    """
+    __slots__ = ("kind", "args", "cwd", "source")
+
+    def __init__(self, kind, args, cwd=None, source=""):
+        self.kind = kind
+        self.args = args
+        self.cwd = cwd
+        self.source = source
+
+    def run(self):
+        if self.kind == "hotkey":
+            keyboard.send(self.args)
+        elif self.kind == "launch":
+            subprocess.Popen(self.args, cwd=self.cwd, close_fds=True)
+        elif self.kind == "open":
+            if hasattr(os, "startfile"):
+                os.startfile(self.args)
+            else:
+                opener = "open" if sys.platform == "darwin" else "xdg-open"
+                subprocess.Popen([opener, self.args], close_fds=True)
+        elif self.kind == "shell":
+            subprocess.Popen(self.args, shell=True, cwd=self.cwd)
+        elif self.kind == "key_down":
+            keyboard.press(self.args)
+        elif self.kind == "key_up":
+            keyboard.release(self.args)
+        elif self.kind == "delay":
+            time.sleep(self.args)
+
+    def release(self):
+        """Отпускает клавиши шага key_down (отмена макроса)."""
+        if self.kind == "key_down":
+            keyboard.release(self.args)
+
+    def __repr__(self):
+        return f"<CompiledAction {self.kind} {self.args!r}>"
+
+
+def compile_action(action):
+    """
+    Разбирает действие из конфига ({"type", "value"}) один раз.
+    Возвращает CompiledAction или None (пустое/клиентское действие, ошибка разбора).
+    """
+    act_type = action.get("type")
+    if act_type == "macro":
+        try:
+            return _compile_macro(action)
+        except Exception as e:
+            print(f"[ShortcutExecutor] Cannot compile macro: {e}")
+            return None
+    value = str(action.get("value") or "").strip()
+    if not value:
+        return None
+    try:
+        if act_type == "shortcut":
+            return _compile_hotkey(value)
+        if act_type == "program":
+            return _compile_program(value)
+    except Exception as e:
+        print(f"[ShortcutExecutor] Cannot compile {act_type} '{value}': {e}")
+    # "system" (page_prev/page_next/...) выполняется на клиенте
+    return None
+
+
+def normalize_hotkey(value):
+    """"Ctrl+Shift+F3" / "Win+E" -> "ctrl+shift+f3" / "windows+e" (по клавишам, а не подстрокой)."""
+    steps = []
+    for step in value.split(","):
+        step = step.strip()
+        if step.endswith("++"):
+            step = step[:-2] + "+plus"
+        keys = [KEY_ALIASES.get(key.strip().lower(), key.strip().lower()) for key in step.split("+")]
+        steps.append("+".join(key for key in keys if key))
+    return ", ".join(step for step in steps if step)
+
+
+def _compile_hotkey(value):
+    if keyboard is None:
+        print("[ShortcutExecutor] 'keyboard' is not installed, hotkeys are disabled")
+        return None
+    hotkey = normalize_hotkey(value)
+    return CompiledAction("hotkey", keyboard.parse_hotkey(hotkey), source=value)
+
+
+def _compile_macro(action):
+    """
+    {"type": "macro", "value": [шаги], "repeat": "once" | "held",
+     "interval": мс, "on_press": "ignore" | "cancel" | "restart"}
+    Шаги — обычные действия ("program", "shortcut") плюс
+    {"type": "delay", "value": мс} и {"type": "key_down" | "key_up", "value": "shift"}.
+    """
+    steps = []
+    for number, step in enumerate(action.get("value") or [], 1):
+        step_type = step.get("type") if isinstance(step, dict) else None
+        if step_type == "delay":
+            steps.append(CompiledAction("delay", max(0.0, float(step.get("value") or 0)) / 1000))
+            continue
+        if step_type in ("key_down", "key_up"):
+            hotkey = _compile_hotkey(str(step.get("value") or ""))
+            compiled = CompiledAction(step_type, hotkey.args, source=hotkey.source) if hotkey else None
+        elif step_type in ("program", "shortcut"):
+            compiled = compile_action(step)
+        else:
+            compiled = None
+        if compiled is None:
+            raise ValueError(f"step {number} is not executable: {step!r}")
+        steps.append(compiled)
+    if not steps:
+        return None
+    macro = Macro(
+        steps,
+        repeat=action.get("repeat", "once"),
+        interval=float(action.get("interval", DEFAULT_REPEAT_INTERVAL_MS)) / 1000,
+        on_press=action.get("on_press", "ignore"),
+    )
+    return CompiledAction("macro", macro, source=f"{len(steps)} steps")
+
+
+def _compile_program(value):
+    path = os.path.expandvars(value.strip('"'))
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".lnk" and os.path.isfile(path):
+        resolved = _resolve_shortcut(path)
+        if resolved:
+            return resolved
+        return CompiledAction("open", path, source=value)
+
+    if os.path.isfile(path):
+        if ext in EXECUTABLE_EXTENSIONS or (os.name != "nt" and os.access(path, os.X_OK)):
+            return CompiledAction("launch", [path], cwd=os.path.dirname(path) or None, source=value)
+        return CompiledAction("open", path, source=value)
+    if os.path.isdir(path) or "://" in value:
+        return CompiledAction("open", value if "://" in value else path, source=value)
+
+    # Командная строка: "notepad C:\file.txt", "python -m http.server"
+    argv = [arg.strip('"') for arg in shlex.split(value, posix=os.name != "nt")]
+    executable = shutil.which(argv[0]) if argv else None
+    if executable:
+        return CompiledAction("launch", [executable] + argv[1:], source=value)
+
+    print(f"[ShortcutExecutor] '{value}' is not a file or a known command, will run through the shell")
+    return CompiledAction("shell", value, source=value)
+
+
+def _resolve_shortcut(path):
+    """Цель ярлыка .lnk -> CompiledAction("launch"), если это исполняемый файл."""
+    if pythoncom is None:
+        return None
+    try:
+        link = win32com.client.Dispatch("WScript.Shell").CreateShortcut(path)
+        target = link.Targetpath
+    except Exception as e:
+        print(f"[ShortcutExecutor] Cannot read shortcut '{path}': {e}")
+        return None
+    if not target or not target.lower().endswith(EXECUTABLE_EXTENSIONS) or not os.path.isfile(target):
+        return None  # ярлыки на папки/документы/UWP — через ассоциацию
+    argv = [target]
+    if link.Arguments:
+        argv += shlex.split(link.Arguments, posix=False)
+    cwd = link.WorkingDirectory or os.path.dirname(target)
+    return CompiledAction("launch", argv, cwd=cwd, source=path)
+
+
+def _action_cache_key(action):
+    """Ключ кэша компиляции (у макроса value — список, поэтому JSON)."""
+    return json.dumps(action, sort_keys=True, ensure_ascii=False)
+
+
+def extract_actions(config_data):
+    """Действия кнопок из конфига: {"page_N:btn": {"type", "value"}} (копии, для другого потока)."""
+    actions = {}
+    for page_key, page in config_data.items():
+        if not page_key.startswith("page_") or not isinstance(page, dict):
+            continue
+        for btn_name, btn_data in page.items():
+            action = btn_data.get("action") if isinstance(btn_data, dict) else None
+            if action:
+                actions[f"{page_key}:{btn_name}"] = dict(action)
+    return actions
+
+
+class ShortcutActionExecutor(threading.Thread):
+    """
+    Поток выполнения действий кнопок.
+
+    GUI-поток только кладет нажатие в очередь (press) — запуск программ
+    и эмуляция клавиш идут здесь. План (кнопка -> CompiledAction) собирается
+    в этом же потоке при загрузке/изменении конфига; уже разобранные действия
+    берутся из кэша. Макросы передаются в MacroScheduler (свой поток).
+    """
+    def __init__(self):
+        super().__init__(name="ShortcutActionExecutor", daemon=True)
+        self._queue = queue.Queue()
+        self._plan = {}
+        self._compiled = {}  # JSON действия -> CompiledAction | None
+        self.latency = LatencyHistogram("press->fire")
+        self.scheduler = MacroScheduler()
+
+    def load_plan(self, config_data):
+        """Пересобрать план по конфигу (не блокирует: компиляция в потоке исполнителя)."""
+        self._queue.put(("plan", extract_actions(config_data)))
+
+    def press(self, key, received_at=None):
+        """Нажатие кнопки "page_N:btn". received_at — time.perf_counter() получения нажатия."""
+        self._queue.put(("press", key, received_at or time.perf_counter()))
+
+    def release(self, key):
+        """Кнопка отпущена (макросы "held"). Идет через очередь — после своего press."""
+        self._queue.put(("release", key))
+
+    def cancel_macros(self):
+        """Остановить все выполняющиеся макросы. Через очередь — после уже принятых нажатий."""
+        self._queue.put(("cancel",))
+
+    def stop(self, timeout=1.0):
+        self._queue.put(None)
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+        self.scheduler.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                try:
+                    if item[0] == "plan":
+                        self._build_plan(item[1])
+                    elif item[0] == "release":
+                        self.scheduler.release(item[1])
+                    elif item[0] == "cancel":
+                        self.scheduler.cancel_all()
+                    else:
+                        self._fire(item[1], item[2])
+                except Exception as e:
+                    print(f"[ShortcutExecutor] {item[0]} error: {e}")
+        finally:
+            self.scheduler.stop()
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+
+    def _build_plan(self, actions):
+        compiled = {}
+        plan = {}
+        for key, action in actions.items():
+            cache_key = _action_cache_key(action)
+            if cache_key not in compiled:
+                compiled[cache_key] = (self._compiled[cache_key] if cache_key in self._compiled
+                                       else compile_action(action))
+            if compiled[cache_key] is not None:
+                plan[key] = compiled[cache_key]
+        # Макрос кнопки изменен или удален — выполняющийся запуск останавливается
+        for key in self.scheduler.active_keys():
+            if plan.get(key) is not self._plan.get(key):
+                self.scheduler.cancel(key)
+        self._compiled = compiled  # кэш только по актуальному конфигу
+        self._plan = plan
+        print(f"[ShortcutExecutor] Plan: {len(plan)} actions")
+
+    def _fire(self, key, received_at):
+        compiled = self._plan.get(key)
+        if compiled is None:
+            print(f"[ShortcutExecutor] No action for {key}")
+            return
+        if compiled.kind == "macro":
+            outcome = self.scheduler.press(key, compiled.args)
+            if outcome != "started":
+                print(f"[ShortcutExecutor] Macro {key}: {outcome}")
+        else:
+            compiled.run()
+        latency_ms = (time.perf_counter() - received_at) * 1000
+        self.latency.record(latency_ms)
+        if latency_ms > SLOW_PRESS_MS:
+            print(f"[ShortcutExecutor] Slow press {key}: {latency_ms:.1f} ms ({compiled.kind})")
@@ -0,0 +1,239 @@
+import os
+import json
+from PySide6.QtCore import (Qt, QThread, Signal, QTimer, QFileInfo,
+                            QAbstractListModel, QModelIndex, QSortFilterProxyModel)
+from PySide6.QtWidgets import QFileIconProvider
+try:
+    from .sh_app_search import AppSearchIndex
+except ImportError:
+    from sh_app_search import AppSearchIndex
+
+APP_EXTENSIONS = (".lnk",)
+INDEX_FILE_NAME = "app_index.json"   # plugins/shortcut/config (только на сервере, у каждой машины свой)
+INDEX_VERSION = 1
+# Иконки: сколько извлекать за один проход цикла событий (прокрутка не подвисает)
+ICON_BATCH = 8
+
+
+
+def default_app_roots():
+    """Папки меню «Пуск» (общая и пользователя). Вне Windows — пусто."""
+    roots = []
+    for env in ("ProgramData", "APPDATA"):
+        base = os.environ.get(env)
+        if base:
+            roots.append(os.path.join(base, "Microsoft", "Windows", "Start Menu", "Programs"))
+    return roots
+
+
+class AppIndex:
+    """
+    Индекс приложений (ярлыков) в заданных корневых папках.
+
+    Для каждой папки хранится mtime и ее содержимое (файлы-ярлыки, подпапки).
+    Повторное сканирование читает (listdir) только папки с изменившимся mtime —
+    для остальных достаточно одного stat. Индекс сохраняется между запусками.
+    """
+    def __init__(self, index_path, roots=None, extensions=APP_EXTENSIONS):
+        self.index_path = index_path
+        self.roots = [os.path.normpath(root) for root in (default_app_roots() if roots is None else roots)]
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self._dirs = self._load()   # dir -> {"mtime": ns, "files": [...], "subdirs": [...]}
+        self.stats = {"dirs": 0, "rescanned": 0}
+
+    def scan(self):
+        """Обходит корни, обновляет индекс. Возвращает [(name, path)] по алфавиту."""
+        self.stats = {"dirs": 0, "rescanned": 0}
+        seen = {}
+        apps = []
+        for root in self.roots:
+            self._scan_dir(root, seen, apps)
+        changed = self.stats["rescanned"] or len(seen) != len(self._dirs)
+        self._dirs = seen   # удаленные папки выпадают из индекса
+        if changed:
+            self._save()
+        apps.sort(key=lambda app: app[0].lower())
+        return apps
+
+    def cached_apps(self):
+        """Приложения из сохраненного индекса (без обращения к диску) — для мгновенного показа."""
+        apps = []
+        for path, entry in self._dirs.items():
+            for file_name in entry.get("files", []):
+                apps.append((os.path.splitext(file_name)[0], os.path.join(path, file_name)))
+        apps.sort(key=lambda app: app[0].lower())
+        return apps
+
+    def _scan_dir(self, path, seen, apps):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        entry = self._dirs.get(path)
+        if entry is None or entry.get("mtime") != mtime:
+            entry = self._list_dir(path, mtime)
+            self.stats["rescanned"] += 1
+        if entry is None:
+            return
+        seen[path] = entry
+        self.stats["dirs"] += 1
+        for file_name in entry["files"]:
+            apps.append((os.path.splitext(file_name)[0], os.path.join(path, file_name)))
+        for sub_name in entry["subdirs"]:
+            self._scan_dir(os.path.join(path, sub_name), seen, apps)
+
+    def _list_dir(self, path, mtime):
+        files, subdirs = [], []
+        try:
+            with os.scandir(path) as entries:
+                for item in entries:
+                    if item.is_dir(follow_symlinks=False):
+                        subdirs.append(item.name)
+                    elif item.name.lower().endswith(self.extensions):
+                        files.append(item.name)
+        except OSError as e:
+            print(f"[AppIndex] Cannot read '{path}': {e}")
+            return None
+        return {"mtime": mtime, "files": sorted(files), "subdirs": sorted(subdirs)}
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return {}
+        if data.get("extensions") != list(self.extensions):
+            return {}
+        return data.get("dirs") or {}
+
+    def _save(self):
+        data = {"version": INDEX_VERSION, "extensions": list(self.extensions), "dirs": self._dirs}
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"[AppIndex] Index write error: {e}")
+
+
+class AppIndexThread(QThread):
+    """Сканирование AppIndex в фоне; результат — сигналом в GUI-поток."""
+    apps_ready = Signal(list)   # [(name, path)]
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+
+    def run(self):
+        apps = self.index.scan()
+        print(f"[AppIndex] {len(apps)} apps, {self.index.stats['dirs']} dirs "
+              f"({self.index.stats['rescanned']} rescanned)")
+        self.apps_ready.emit(apps)
+
+
+class AppListModel(QAbstractListModel):
+    """
+    Список приложений (name, path).
+    Иконка строки запрашивается представлением только для видимых строк —
+    извлекается отложенно (ICON_BATCH за проход) и кэшируется.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._apps = []
+        self._rows = {}             # path -> row
+        self._icons = {}            # path -> QIcon
+        self._pending = {}          # path -> None (упорядоченное множество)
+        self._icon_provider = QFileIconProvider()
+        self._icon_timer = QTimer(self)
+        self._icon_timer.setSingleShot(True)
+        self._icon_timer.timeout.connect(self._load_pending_icons)
+
+    def set_apps(self, apps):
+        self.beginResetModel()
+        self._apps = list(apps)
+        self._rows = {path: row for row, (_, path) in enumerate(self._apps)}
+        self._pending.clear()
+        self.endResetModel()
+
+    def apps(self):
+        return self._apps
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._apps)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name, path = self._apps[index.row()]
+        if role == Qt.DisplayRole:
+            return name
+        if role in (Qt.ToolTipRole, Qt.UserRole):
+            return path
+        if role == Qt.DecorationRole:
+            icon = self._icons.get(path)
+            if icon is None:
+                # Последние запрошенные — первыми (при быстрой прокрутке это видимые строки)
+                self._pending.pop(path, None)
+                self._pending[path] = None
+                if not self._icon_timer.isActive():
+                    self._icon_timer.start(0)
+            return icon
+        return None
+
+    def _load_pending_icons(self):
+        for _ in range(min(ICON_BATCH, len(self._pending))):
+            path = next(reversed(self._pending))
+            del self._pending[path]
+            self._icons[path] = self._icon_provider.icon(QFileInfo(path))
+            row = self._rows.get(path)
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+        if self._pending:
+            self._icon_timer.start(0)
+
+
+class AppFilterProxy(QSortFilterProxyModel):
+    """
+    Ранжированный поиск: фильтр и порядок строк — по AppSearchIndex
+    (качество совпадения + частота выбора из AppUsage). Пустой запрос — весь список по алфавиту.
+    """
+    def __init__(self, parent=None, usage=None):
+        super().__init__(parent)
+        self.usage = usage
+        self.search_index = AppSearchIndex()
+        self._boost = {}
+        self._query = ""
+        self._scores = None   # source_row -> score; None — без фильтра
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelReset.connect(self._rebuild_index)
+        self._rebuild_index()
+
+    def set_search_text(self, text):
+        self._query = text
+        self._scores = self.search_index.search(text, self._boost)
+        self.invalidate()
+        # Сортировка только по рангу; без запроса — исходный (алфавитный) порядок
+        self.sort(0 if self._scores is not None else -1)
+
+    def _rebuild_index(self):
+        apps = self.sourceModel().apps()
+        self.search_index.build([name for name, _ in apps])
+        self._boost = self.usage.bonuses([path for _, path in apps]) if self.usage else {}
+        self.set_search_text(self._query)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._scores is None or source_row in self._scores
+
+    def lessThan(self, left, right):
+        left_score = self._scores.get(left.row(), 0) if self._scores else 0
+        right_score = self._scores.get(right.row(), 0) if self._scores else 0
+        if left_score != right_score:
+            return left_score > right_score
+        return left.row() < right.row()
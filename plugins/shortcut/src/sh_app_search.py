@@ -0,0 +1,199 @@
+import os
+import re
+import json
+import math
+import time
+
+USAGE_FILE_NAME = "app_usage.json"   # plugins/shortcut/config (только на сервере)
+# Бонус выбора: USAGE_WEIGHT * log2(1 + выборов), затухание вдвое за USAGE_HALF_LIFE_DAYS
+USAGE_WEIGHT = 40
+USAGE_HALF_LIFE_DAYS = 30
+
+# Качество совпадения (больше — выше в списке); бонус использования не перекрывает разницу уровней
+SCORE_EXACT = 1000
+SCORE_PREFIX = 900
+SCORE_TOKEN_PREFIX = 800
+SCORE_TOKEN_CHAIN = 700
+SCORE_ALL_TOKENS = 650
+SCORE_SUBSTRING = 500
+SCORE_FUZZY = 300
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+class AppSearchIndex:
+    """
+    Поисковый индекс по именам приложений.
+
+    Совпадения (по убыванию качества): имя целиком, начало имени, начало слова
+    ("code" -> "Visual Studio Code"), цепочка начал слов ("vsc", "vscode"),
+    все слова запроса — начала слов имени ("stu vis"), подстрока, нечеткое
+    совпадение (буквы запроса по порядку, "vsdcd").
+
+    Поиск инкрементальный: если новый запрос продолжает предыдущий, кандидаты —
+    результаты предыдущего (множество совпадений при удлинении запроса только
+    сужается). Первый символ — по индексу "символ -> записи".
+    """
+    def __init__(self):
+        self._names = []        # lower
+        self._tokens = []       # [[token, ...]]
+        self._by_char = {}      # символ -> [id]
+        self._last_query = None
+        self._last_ids = None
+
+    def build(self, names):
+        """Полная пересборка (список приложений изменился). id записи = индекс в names."""
+        self._names = [name.lower() for name in names]
+        self._tokens = [_tokens(name) for name in names]
+        by_char = {}
+        for entry_id, name in enumerate(self._names):
+            for char in set(name):
+                by_char.setdefault(char, []).append(entry_id)
+        self._by_char = by_char
+        self._last_query = None
+        self._last_ids = None
+
+    def __len__(self):
+        return len(self._names)
+
+    def search(self, query, boost=None):
+        """
+        Возвращает {id: score} записей, подходящих под запрос.
+        boost — {id: бонус} (частота выбора), добавляется к качеству совпадения.
+        """
+        query = " ".join(query.lower().split())
+        if not query:
+            self._last_query = None
+            self._last_ids = None
+            return None
+
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_ids
+        else:
+            candidates = self._seed(query)
+
+        boost = boost or {}
+        query_tokens = query.split(" ")
+        scores = {}
+        for entry_id in candidates:
+            score = self._score(entry_id, query, query_tokens)
+            if score is not None:
+                scores[entry_id] = score + boost.get(entry_id, 0)
+
+        self._last_query = query
+        self._last_ids = list(scores)
+        return scores
+
+    def _seed(self, query):
+        """Кандидаты без предыдущего результата: записи, содержащие самый редкий символ запроса."""
+        chars = set(query) - {" "}
+        if not chars:
+            return range(len(self._names))
+        lists = [self._by_char.get(char, ()) for char in chars]
+        return min(lists, key=len)
+
+    def _score(self, entry_id, query, query_tokens):
+        name = self._names[entry_id]
+        if name == query:
+            return SCORE_EXACT
+        if name.startswith(query):
+            return SCORE_PREFIX - len(name) / 100   # при равенстве — короче выше
+
+        tokens = self._tokens[entry_id]
+        for position, token in enumerate(tokens):
+            if token.startswith(query):
+                return SCORE_TOKEN_PREFIX - position * 5
+        if len(query_tokens) == 1 and len(query) > 1 and _token_chain(tokens, query):
+            return SCORE_TOKEN_CHAIN - len(tokens)   # меньше лишних слов — выше
+        if len(query_tokens) > 1 and all(
+                any(token.startswith(part) for token in tokens) for part in query_tokens):
+            return SCORE_ALL_TOKENS
+
+        position = name.find(query)
+        if position >= 0:
+            return SCORE_SUBSTRING - min(position, 100)
+        return _fuzzy_score(name, query)
+
+
+def _token_chain(tokens, query, start=0, first_token=0):
+    """Запрос — начала слов имени подряд по порядку: "vsc", "vscode" -> visual + studio + code."""
+    if start == len(query):
+        return True
+    for i in range(first_token, len(tokens)):
+        token = tokens[i]
+        if token[0] != query[start]:
+            continue
+        length = 1
+        while length < len(token) and start + length < len(query) and token[length] == query[start + length]:
+            length += 1
+        for taken in range(length, 0, -1):
+            if _token_chain(tokens, query, start + taken, i + 1):
+                return True
+    return False
+
+
+def _fuzzy_score(name, query):
+    """Буквы запроса по порядку; штраф за разрывы, бонус за начало слова. None — нет совпадения."""
+    score = SCORE_FUZZY
+    position = -1
+    for char in query:
+        if char == " ":
+            continue
+        found = name.find(char, position + 1)
+        if found < 0:
+            return None
+        gap = found - position - 1
+        if gap:
+            score -= min(gap, 10)
+        if found == 0 or not name[found - 1].isalnum():
+            score += 3
+        position = found
+    return max(score, 1)
+
+
+class AppUsage:
+    """Частота и давность выбора приложений (ключ — путь), для ранжирования поиска."""
+    def __init__(self, path):
+        self.path = path
+        self._data = self._load()   # app_path -> {"count": n, "last": unix time}
+
+    def record(self, app_path):
+        entry = self._data.setdefault(app_path, {"count": 0, "last": 0})
+        entry["count"] += 1
+        entry["last"] = time.time()
+        self._save()
+
+    def bonus(self, app_path, now=None):
+        entry = self._data.get(app_path)
+        if not entry:
+            return 0.0
+        age_days = max(0.0, ((now or time.time()) - entry.get("last", 0)) / 86400)
+        decay = 0.5 ** (age_days / USAGE_HALF_LIFE_DAYS)
+        return USAGE_WEIGHT * math.log2(1 + entry.get("count", 0)) * decay
+
+    def bonuses(self, app_paths):
+        """{индекс: бонус} только для выбиравшихся приложений (разреженно)."""
+        now = time.time()
+        return {i: self.bonus(path, now) for i, path in enumerate(app_paths) if path in self._data}
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[AppUsage] Write error: {e}")
@@ -1,15 +1,23 @@
 import os
-from PySide6.QtCore import QObject, Signal
+import copy
+from contextlib import contextmanager
+from PySide6.QtCore import QObject, Signal, QTimer
+from src.asset_store import blob_name
 try:
     from .sh_bandito_service import (
-        load_json, save_json,
-        prepare_icon_payload, execute_system_action
+        load_json, save_json, ICON_SCOPE, read_icon_file,
+        prepare_icon_payload, icon_payload_size
     )
+    from .sh_action_executor import ShortcutActionExecutor
 except ImportError:
     from sh_bandito_service import (
-        load_json, save_json,
-        prepare_icon_payload, execute_system_action
+        load_json, save_json, ICON_SCOPE, read_icon_file,
+        prepare_icon_payload, icon_payload_size
     )
+    from sh_action_executor import ShortcutActionExecutor
+
+# Отложенная запись: все правки за это окно сохраняются одной записью
+SAVE_DELAY_MS = 500
 
 class ShortcutBanditoManager(QObject):
     """
@@ -18,6 +26,11 @@ class ShortcutBanditoManager(QObject):
     """
     config_updated = Signal()
     page_changed = Signal(int)
+    # Префабы: точечные изменения для дерева редактора (PrefabTreeModel)
+    prefab_saved = Signal(str)          # добавлен или перезаписан
+    prefab_deleted = Signal(str)
+    prefab_renamed = Signal(str, str)   # старое имя, новое имя
+    prefabs_reset = Signal()            # префабы заменены целиком (откат batch())
     
     def __init__(self, plugin_path, core=None):
         super().__init__()
@@ -36,6 +49,21 @@ class ShortcutBanditoManager(QObject):
         
         # Состояние
         self.current_page = 1
+        self._client_blobs = {}  # client_id -> blob'ы иконок в хранилище клиента (из ASSET_HAVE)
+
+        # Отложенное сохранение: изменения помечают документ, таймер пишет на диск
+        self._dirty = set()  # "config", "prefabs"
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self.flush)
+
+        # Транзакция batch(): изменения копятся и применяются одной записью и одной рассылкой
+        self._batch = None  # {"changed": bool, "icons": set()} или None
+
+        # Нажатия кнопок выполняются в отдельном потоке по заранее собранному плану
+        self.executor = None
+        self.start_executor()
 
     def get_data(self):
         return self.config_data
@@ -50,9 +78,76 @@ class ShortcutBanditoManager(QObject):
         return self.actions_config.get("actions", [])
 
     def save_all(self):
-        """Сохранение всех данных на диск."""
-        save_json(self.config_path, self.config_data)
-        save_json(self.prefab_path, self.prefabs)
+        """Немедленное сохранение всех данных на диск."""
+        self._dirty.update(("config", "prefabs"))
+        self.flush()
+
+    def mark_dirty(self, document):
+        """
+        Помечает документ ("config" / "prefabs") измененным.
+        Запись — через SAVE_DELAY_MS после первой правки (серия правок = одна запись).
+        """
+        self._dirty.add(document)
+        if not self._save_timer.isActive():
+            self._save_timer.start()
+
+    def flush(self):
+        """Записывает измененные документы (таймер, выгрузка плагина, выход)."""
+        self._save_timer.stop()
+        if "config" in self._dirty and save_json(self.config_path, self.config_data):
+            self._dirty.discard("config")
+        if "prefabs" in self._dirty and save_json(self.prefab_path, self.prefabs):
+            self._dirty.discard("prefabs")
+
+    # --- Транзакции ---
+
+    @contextmanager
+    def batch(self):
+        """
+        Групповое редактирование:
+
+            with manager.batch():
+                manager.update_button(...)
+                manager.delete_button(...)
+
+        Внутри блока изменения только накапливаются; при выходе — одна пометка
+        на запись, одна рассылка SHORTCUT_CONFIG_UPDATE и один config_updated.
+        При исключении конфиг и префабы откатываются, клиенты ничего не получают.
+        Вложенный batch() становится частью внешнего.
+        """
+        if self._batch is not None:
+            yield self
+            return
+
+        snapshot = (copy.deepcopy(self.config_data), copy.deepcopy(self.prefabs), set(self._dirty))
+        self._batch = {"changed": False, "icons": set()}
+        try:
+            yield self
+        except Exception:
+            self.config_data, self.prefabs, self._dirty = snapshot
+            self._batch = None
+            self.prefabs_reset.emit()
+            raise
+        batch, self._batch = self._batch, None
+        if batch["changed"]:
+            self._commit_config_change(batch["icons"])
+
+    def _config_changed(self, icon_rel_path=None):
+        """Конфиг кнопок изменен: сразу или по завершении batch()."""
+        icons = {icon_rel_path} if icon_rel_path else set()
+        if self._batch is not None:
+            self._batch["changed"] = True
+            self._batch["icons"].update(icons)
+            return
+        self._commit_config_change(icons)
+
+    def _commit_config_change(self, icons):
+        self.mark_dirty("config")
+        self.executor.load_plan(self.config_data)
+        self.sync_with_clients(icon_rel_paths=icons)
+        self.config_updated.emit()
+
+    # --- Кнопки и страницы ---
 
     def update_button(self, page_idx, btn_name, btn_data):
         """Обновление данных кнопки на странице."""
@@ -61,52 +156,32 @@ class ShortcutBanditoManager(QObject):
             self.config_data[page_key] = {}
         
         self.config_data[page_key][btn_name] = btn_data
-        self.save_all()
-        self.sync_with_clients(icon_rel_path=btn_data.get("icon_path"))
-        self.config_updated.emit()
+        self._config_changed(icon_rel_path=btn_data.get("icon_path"))
 
     def delete_button(self, page_idx, btn_name):
         """Удаление кнопки со страницы."""
         page_key = f"page_{page_idx}"
         if page_key in self.config_data and btn_name in self.config_data[page_key]:
             del self.config_data[page_key][btn_name]
-            self.save_all()
-            self.sync_with_clients()
-            self.config_updated.emit()
+            self._config_changed()
 
     def add_new_page(self):
         """Добавление новой страницы."""
         indices = [int(k.split('_')[1]) for k in self.config_data.keys() if k.startswith("page_")]
         new_idx = max(indices) + 1 if indices else 1
         self.config_data[f"page_{new_idx}"] = {}
-        self.save_all()
-        self.sync_with_clients()
+        self._config_changed()
         return new_idx
 
     def remove_page(self, page_idx):
         """Удаление страницы и переиндексация оставшихся."""
-        page_key = f"page_{page_idx}"
-        if page_key in self.config_data:
-            del self.config_data[page_key]
-            
+        pos = self._page_position(page_idx)
+        if pos is not None:
             # Переиндексация страниц для исключения дырок (1, 3 -> 1, 2)
-            new_config = {}
-            # Получаем все ключи страниц и сортируем их по номеру
-            page_keys = [k for k in self.config_data.keys() if k.startswith("page_")]
-            sorted_keys = sorted(page_keys, key=lambda x: int(x.split('_')[1]))
-            
-            for i, old_key in enumerate(sorted_keys, 1):
-                new_config[f"page_{i}"] = self.config_data[old_key]
-            
-            # Сохраняем остальные ключи (не страницы), если они есть
-            for k, v in self.config_data.items():
-                if not k.startswith("page_"):
-                    new_config[k] = v
-            
-            self.config_data = new_config
-            self.save_all()
-            self.sync_with_clients()
-            self.config_updated.emit() # УВЕДОМЛЯЕМ UI ОБ ИЗМЕНЕНИИ СТРУКТУРЫ
+            pages = self._page_list()
+            del pages[pos]
+            self._set_pages(pages)
+            self._config_changed() # УВЕДОМЛЯЕМ UI ОБ ИЗМЕНЕНИИ СТРУКТУРЫ
         
         # Возвращаем ближайший существующий индекс
         indices = [int(k.split('_')[1]) for k in self.config_data.keys() if k.startswith("page_")]
@@ -117,6 +192,64 @@ class ShortcutBanditoManager(QObject):
             return max(indices)
         return page_idx
 
+    def duplicate_page(self, page_idx):
+        """Копия страницы вставляется сразу после нее. Возвращает индекс копии."""
+        pos = self._page_position(page_idx)
+        if pos is None:
+            return page_idx
+        pages = self._page_list()
+        pages.insert(pos + 1, copy.deepcopy(pages[pos]))
+        self._set_pages(pages)
+        self._config_changed()
+        return pos + 2
+
+    def move_page(self, page_idx, new_idx):
+        """Перемещение страницы на позицию new_idx (1..N). Возвращает итоговый индекс."""
+        pos = self._page_position(page_idx)
+        if pos is None:
+            return page_idx
+        pages = self._page_list()
+        new_idx = max(1, min(new_idx, len(pages)))
+        if new_idx == pos + 1:
+            return new_idx
+        pages.insert(new_idx - 1, pages.pop(pos))
+        self._set_pages(pages)
+        self._config_changed()
+        return new_idx
+
+    def apply_prefab(self, prefab_name, btn_names, page_idx=None):
+        """Назначает префаб нескольким кнопкам одной транзакцией. Возвращает число кнопок."""
+        prefab = self.get_prefabs().get(prefab_name)
+        if not prefab:
+            return 0
+        page_idx = page_idx or self.current_page
+        with self.batch():
+            for btn_name in btn_names:
+                self.update_button(page_idx, btn_name, copy.deepcopy(prefab))
+        return len(btn_names)
+
+    def _page_keys(self):
+        """Ключи страниц по порядку номеров (page_1, page_2, ...)."""
+        page_keys = [k for k in self.config_data.keys() if k.startswith("page_")]
+        return sorted(page_keys, key=lambda x: int(x.split('_')[1]))
+
+    def _page_list(self):
+        return [self.config_data[k] for k in self._page_keys()]
+
+    def _page_position(self, page_idx):
+        """Позиция страницы page_idx в _page_list() или None."""
+        page_keys = self._page_keys()
+        page_key = f"page_{page_idx}"
+        return page_keys.index(page_key) if page_key in page_keys else None
+
+    def _set_pages(self, pages):
+        """Записывает страницы подряд с page_1; остальные ключи (не страницы) сохраняются."""
+        new_config = {f"page_{i}": page for i, page in enumerate(pages, 1)}
+        for k, v in self.config_data.items():
+            if not k.startswith("page_"):
+                new_config[k] = v
+        self.config_data = new_config
+
     def save_prefab(self, name, data):
         """Сохранение префаба."""
         prefabs_dict = self.get_prefabs()
@@ -128,7 +261,8 @@ class ShortcutBanditoManager(QObject):
         else:
              self.prefabs = prefabs_dict
              
-        self.save_all()
+        self.mark_dirty("prefabs")
+        self.prefab_saved.emit(name)
 
     def delete_prefab(self, name):
         """Удаление префаба."""
@@ -141,7 +275,8 @@ class ShortcutBanditoManager(QObject):
             else:
                 self.prefabs = prefabs_dict
                 
-            self.save_all()
+            self.mark_dirty("prefabs")
+            self.prefab_deleted.emit(name)
 
     def rename_prefab(self, old_name, new_name):
         """Переименование префаба."""
@@ -154,37 +289,156 @@ class ShortcutBanditoManager(QObject):
             else:
                 self.prefabs = prefabs_dict
                 
-            self.save_all()
+            self.mark_dirty("prefabs")
+            self.prefab_renamed.emit(old_name, new_name)
 
-    def sync_with_clients(self, icon_rel_path=None):
+    def sync_with_clients(self, icon_rel_paths=()):
         """Синхронизация конфига и иконок с клиентами через Core."""
         if not self.core or not self.core.com:
             print("[ShortcutManager] No core/com available for broadcast")
             return
         try:
-            if icon_rel_path:
-                icon_payload = prepare_icon_payload(self.plugin_path, icon_rel_path)
-                if icon_payload:
-                    self.core.com.broadcast("SHORTCUT_ICON_UPDATE", icon_payload)
+            for icon_rel_path in sorted(icon_rel_paths):
+                self.push_icon(icon_rel_path)
             self.core.com.broadcast("SHORTCUT_CONFIG_UPDATE", self.config_data)
         except Exception as e:
             print(f"[ShortcutManager] Broadcast error: {e}")
 
-    def handle_remote_press(self, btn_id_full):
-        """Обработка нажатия кнопки (приходит от ElCore сервера)."""
-        try:
-            if ":" in btn_id_full:
-                page_num, btn_name = btn_id_full.split(":")
-                page_key = f"page_{page_num}"
-            else:
-                page_key = "page_1"
-                btn_name = btn_id_full
+    def push_icon(self, icon_rel_path, client_ids=None, count_skipped=True):
+        """
+        Отправляет иконку только тем клиентам, у которых ее нет (сверка md5 с инвентарем
+        ASSET_HAVE). Новым клиентам — бинарным кадром, старым (без инвентаря) — base64 как раньше.
+        count_skipped=False — сверка при подключении: пропуск не считается экономией
+        (раньше такие иконки не отправлялись вовсе).
+        Возвращает число клиентов, которым иконка была отправлена.
+        """
+        content, digest = read_icon_file(self.plugin_path, icon_rel_path)
+        if content is None:
+            return 0
 
-            btn_data = self.config_data.get(page_key, {}).get(btn_name, {})
-            action = btn_data.get("action")
-            if action:
-                execute_system_action(action)
-            else:
-                print(f"[ShortcutManager] No action for {page_key}:{btn_name}")
-        except Exception as e:
-            print(f"[ShortcutManager] Remote press error: {e}")
+        state = self.core.state
+        legacy_payload = None   # base64 строится только для клиентов без инвентаря
+        legacy_size = icon_payload_size(icon_rel_path, len(content))  # от него считается экономия
+        sent_count = 0
+
+        for client_id in (client_ids if client_ids is not None else state.get_clients()):
+            have = state.get_client_assets(client_id, ICON_SCOPE)
+            if have is None:
+                if legacy_payload is None:
+                    legacy_payload = prepare_icon_payload(icon_rel_path, content)
+                if self.core.com.send_to(client_id, "SHORTCUT_ICON_UPDATE", legacy_payload):
+                    sent_count += 1
+                continue
+
+            if have.get(icon_rel_path) == digest:
+                if not count_skipped:
+                    continue
+                state.add_client_metric(client_id, "icons_skipped")
+                state.add_client_metric(client_id, "bytes_saved", legacy_size)
+                continue
+
+            if blob_name(digest, icon_rel_path) in self._client_blobs.get(client_id, ()):
+                # Клиент сообщил, что этот blob есть в его хранилище (под другим путем) — хватит привязки
+                if self.core.com.send_to(client_id, "SHORTCUT_ICON_UPDATE", {"path": icon_rel_path, "md5": digest}):
+                    have[icon_rel_path] = digest
+                    sent_count += 1
+                    state.add_client_metric(client_id, "icons_linked")
+                    state.add_client_metric(client_id, "bytes_saved", legacy_size)
+                continue
+
+            frame_size = self.core.com.send_binary(
+                client_id, "SHORTCUT_ICON_UPDATE", {"path": icon_rel_path, "md5": digest}, content
+            )
+            if frame_size:
+                have[icon_rel_path] = digest
+                sent_count += 1
+                state.add_client_metric(client_id, "icons_sent")
+                state.add_client_metric(client_id, "bytes_sent", frame_size)
+                state.add_client_metric(client_id, "bytes_saved", max(0, legacy_size - frame_size))
+        return sent_count
+
+    def referenced_icons(self):
+        """Иконки, на которые ссылаются кнопки конфига."""
+        icons = set()
+        for page in self.config_data.values():
+            if isinstance(page, dict):
+                for btn_data in page.values():
+                    if isinstance(btn_data, dict) and btn_data.get("icon_path"):
+                        icons.add(btn_data["icon_path"])
+        return icons
+
+    def handle_client_command(self, command, payload, client_id):
+        """
+        Команды клиентов:
+          SHORTCUT_BUTTON_RELEASE — кнопка с макросом "held" отпущена;
+          ASSET_HAVE — инвентарь иконок, досылаем недостающие иконки конфига;
+          SHORTCUT_ICON_REQUEST — привязка к blob не удалась, нужен сам файл.
+        """
+        if command == "SHORTCUT_BUTTON_RELEASE":
+            self.executor.release(self._press_key(payload.get("id", "")))
+            return
+        if not self.core or not self.core.com or not client_id:
+            return
+        if command == "SHORTCUT_ICON_REQUEST":
+            icon_rel_path = payload.get("path")
+            if icon_rel_path not in self.referenced_icons():
+                return
+            have = self.core.state.get_client_assets(client_id, ICON_SCOPE)
+            if have is not None:
+                have.pop(icon_rel_path, None)
+            _, digest = read_icon_file(self.plugin_path, icon_rel_path)
+            if digest:
+                self._client_blobs.get(client_id, set()).discard(blob_name(digest, icon_rel_path))
+            sent = self.push_icon(icon_rel_path, [client_id], count_skipped=False)
+        elif command == "ASSET_HAVE" and payload.get("scope") == ICON_SCOPE:
+            self._client_blobs[client_id] = set(payload.get("blobs") or ())
+            sent = sum(
+                self.push_icon(icon_rel_path, [client_id], count_skipped=False)
+                for icon_rel_path in sorted(self.referenced_icons())
+            )
+        else:
+            return
+        if sent:
+            print(f"[ShortcutManager] Sent {sent} missing icons to {client_id}")
+            # Клиент перерисует кнопки с обновленными иконками (см. ShortcutClientManager._updated_icons)
+            self.core.com.send_to(client_id, "SHORTCUT_CONFIG_UPDATE", self.config_data)
+
+    def handle_client_disconnected(self, client_id):
+        """
+        Клиент отключился: SHORTCUT_BUTTON_RELEASE от него уже не придет, поэтому
+        макросы "held" останавливаются (нажатия не привязаны к клиенту — все сразу).
+        """
+        self._client_blobs.pop(client_id, None)
+        self.executor.cancel_macros()
+
+    def handle_remote_press(self, btn_id_full, received_at=None):
+        """
+        Обработка нажатия кнопки (приходит от ElCore сервера).
+        Только ставит нажатие в очередь исполнителя — GUI не ждет запуска программ.
+        """
+        self.executor.press(self._press_key(btn_id_full), received_at)
+
+    @staticmethod
+    def _press_key(btn_id_full):
+        """"2:butt_toolB_01" -> "page_2:butt_toolB_01" (ключ плана исполнителя)."""
+        if ":" in btn_id_full:
+            page_num, btn_name = btn_id_full.split(":", 1)
+            return f"page_{page_num}:{btn_name}"
+        return f"page_1:{btn_id_full}"
+
+    def start_executor(self):
+        """Запуск потока исполнителя (при создании менеджера и после on_resume)."""
+        if self.executor is not None and self.executor.is_alive():
+            return
+        self.executor = ShortcutActionExecutor()
+        self.executor.start()
+        self.executor.load_plan(self.config_data)
+
+    def shutdown(self):
+        """Выгрузка плагина: запись правок, остановка исполнителя, статистика задержек."""
+        self.flush()
+        self.executor.stop()
+        print(f"[ShortcutManager] {self.executor.latency.summary()}")
+        scheduler = self.executor.scheduler
+        if any(scheduler.stats.values()):
+            print(f"[ShortcutManager] {scheduler.jitter.summary()}; macros {scheduler.stats}")
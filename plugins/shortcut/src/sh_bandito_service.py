@@ -1,9 +1,13 @@
 import os
 import json
 import base64
+import hashlib
 import shutil
-import subprocess
 from PySide6.QtCore import QSize
+try:
+    from .sh_icon_import import import_icon
+except ImportError:
+    from sh_icon_import import import_icon
 
 def load_json(path):
     """Универсальная загрузка JSON."""
@@ -17,14 +21,23 @@ def load_json(path):
         return {}
 
 def save_json(path, data):
-    """Универсальное сохранение JSON."""
+    """
+    Универсальное сохранение JSON.
+    Атомарно: запись во временный файл + rename, при сбое старый файл остается целым.
+    """
+    tmp_path = path + ".tmp"
     try:
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'w', encoding='utf-8') as f:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
         return True
     except Exception as e:
         print(f"[ShortcutService] Error saving JSON {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
 
 def parse_style_to_css(style_data):
@@ -35,52 +48,53 @@ def parse_style_to_css(style_data):
         css += f"{selector} {{ {props_str} }} \n"
     return css
 
-def prepare_icon_payload(plugin_path, icon_rel_path):
-    """Подготовка данных иконки для отправки (base64)."""
+ICON_SCOPE = "shortcut/ico"  # область инвентаря клиента (ASSET_HAVE) для иконок кнопок
+
+def read_icon_file(plugin_path, icon_rel_path):
+    """Содержимое иконки и ее md5 (для отправки бинарным кадром) или (None, None)."""
     full_path = os.path.join(plugin_path, icon_rel_path)
-    if not os.path.exists(full_path):
-        return None
     try:
         with open(full_path, "rb") as f:
-            encoded_content = base64.b64encode(f.read()).decode('utf-8')
-        return {
-            "path": icon_rel_path,
-            "content": encoded_content
-        }
-    except Exception as e:
-        print(f"[ShortcutService] Icon prep error: {e}")
-        return None
+            content = f.read()
+    except OSError:
+        return None, None
+    return content, hashlib.md5(content).hexdigest()
 
-def execute_system_action(action):
-    """Выполнение системного действия (программа или хоткей)."""
-    act_type = action.get("type")
-    value = action.get("value")
-    if not value: return
+def prepare_icon_payload(icon_rel_path, content):
+    """Данные иконки для клиентов без инвентаря (base64 в JSON)."""
+    return {
+        "path": icon_rel_path,
+        "content": base64.b64encode(content).decode('utf-8')
+    }
 
-    if act_type == "program":
-        try:
-            subprocess.Popen(value, shell=True)
-        except Exception as e:
-            print(f"[ShortcutService] Program exec error: {e}")
-    elif act_type == "shortcut":
-        try:
-            import keyboard
-            hotkey_str = value.lower().replace("win", "windows")
-            keyboard.send(hotkey_str)
-        except Exception as e:
-            print(f"[ShortcutService] Hotkey error: {e}")
+def icon_payload_size(icon_rel_path, content_size):
+    """Размер base64-сообщения SHORTCUT_ICON_UPDATE без кодирования: 4 * ceil(n / 3) + конверт."""
+    envelope = json.dumps({"command": "SHORTCUT_ICON_UPDATE", "data": {"path": icon_rel_path, "content": ""}})
+    return len(envelope) + 4 * ((content_size + 2) // 3)
 
 def copy_icon_to_plugin(src_path, plugin_path):
-    """Копирует иконку в ресурсы плагина и возвращает относительный путь."""
+    """
+    Импортирует иконку в ресурсы плагина и возвращает относительный путь.
+    Внешние файлы проходят нормализацию (sh_icon_import: уменьшение до размера
+    кнопки клиента, PNG без метаданных, дедупликация по md5).
+    """
     ico_dir = os.path.join(plugin_path, "resources", "ico")
     os.makedirs(ico_dir, exist_ok=True)
     
     file_name = os.path.basename(src_path)
     dest_path = os.path.join(ico_dir, file_name)
     
+    # Иконка уже в библиотеке плагина — используем как есть
+    if os.path.abspath(src_path) == os.path.abspath(dest_path):
+        return f"resources/ico/{file_name}"
+
+    rel_path = import_icon(src_path, plugin_path)
+    if rel_path:
+        return rel_path
+
+    # Фоллбек: формат не декодируется Qt — копируем без изменений
     try:
-        if os.path.abspath(src_path) != os.path.abspath(dest_path):
-            shutil.copy2(src_path, dest_path)
+        shutil.copy2(src_path, dest_path)
         return f"resources/ico/{file_name}"
     except Exception as e:
         print(f"[ShortcutService] Icon copy error: {e}")
@@ -1,9 +1,17 @@
 import os
 from PySide6.QtCore import QObject, Signal
 try:
-    from .sh_cliento_service import save_config, handle_icon_save
+    from .sh_cliento_service import (
+        save_config, handle_icon_save, diff_configs, is_empty_diff,
+        ICON_SCOPE, collect_icon_digests, collect_icon_blobs
+    )
+    from .sh_icon_cache import get_icon_cache
 except ImportError:
-    from sh_cliento_service import save_config, handle_icon_save
+    from sh_cliento_service import (
+        save_config, handle_icon_save, diff_configs, is_empty_diff,
+        ICON_SCOPE, collect_icon_digests, collect_icon_blobs
+    )
+    from sh_icon_cache import get_icon_cache
 
 class ShortcutClientManager(QObject):
     """
@@ -11,13 +19,22 @@ class ShortcutClientManager(QObject):
     Управляет состоянием, сетевыми командами и системными действиями.
     """
     config_updated = Signal(dict)
+    config_changed = Signal(dict)       # diff (см. diff_configs) — для точечного обновления UI
     page_change_requested = Signal(str) # "next", "prev"
     
-    def __init__(self, socket_client, plugin_path):
+    def __init__(self, socket_client, plugin_path, assets=None):
         super().__init__()
         self.socket_client = socket_client
         self.plugin_path = plugin_path
+        self.assets = assets  # AssetStore: иконки от сервера хранятся один раз на все плагины
         self.config = {}
+        self._updated_icons = set()  # иконки, перезаписанные с последнего обновления конфига
+
+        # Инвентарь иконок: сервер досылает только те, которых нет (или они другие)
+        if self.socket_client:
+            self.socket_client.connected.connect(self.advertise_icons)
+            if getattr(self.socket_client, "is_connected", lambda: False)():
+                self.advertise_icons()
 
     def set_config(self, config):
         self.config = config
@@ -33,25 +50,58 @@ class ShortcutClientManager(QObject):
         if command == "SHORTCUT_CONFIG_UPDATE":
             self.handle_config_update(payload)
         elif command == "SHORTCUT_ICON_UPDATE":
-            self.handle_icon_update(payload)
+            self.handle_icon_update(payload, data.get("binary"))
 
-    def handle_icon_update(self, icon_data):
-        """Сохранение иконки через сервис."""
-        saved_path = handle_icon_save(self.plugin_path, icon_data)
+    def advertise_icons(self):
+        """Отправляет серверу md5 имеющихся иконок и blob'ы хранилища (ASSET_HAVE)."""
+        icon_cache = get_icon_cache(self.plugin_path)
+        digests = collect_icon_digests(self.plugin_path, icon_cache.digest, self.assets)
+        icon_cache.flush_index()  # новые хэши — одной записью на весь инвентарь
+        self.socket_client.send_command("ASSET_HAVE", {
+            "scope": ICON_SCOPE,
+            "digests": digests,
+            "blobs": collect_icon_blobs(self.assets),
+        })
+
+    def handle_icon_update(self, icon_data, content=None):
+        """Сохранение иконки через сервис (content — байты бинарного кадра)."""
+        saved_path = handle_icon_save(self.plugin_path, icon_data, content, self.assets)
+        if saved_path:
+            self._updated_icons.add(icon_data.get("path"))
+        elif content is None and not icon_data.get("content") and icon_data.get("path"):
+            # Привязка к blob, которого в хранилище нет (удален сборкой мусора и т.п.) — нужен сам файл
+            self.socket_client.send_command("SHORTCUT_ICON_REQUEST", {"path": icon_data.get("path")})
 
     def handle_config_update(self, new_config):
-        """Обновление конфига в памяти, на диске и уведомление UI."""
+        """Обновление конфига в памяти, на диске и уведомление UI (только об изменившемся)."""
+        diff = diff_configs(self.config, new_config)
         self.config = new_config
+
+        # Иконка могла смениться на диске без изменения icon_path в конфиге
+        if self._updated_icons:
+            for page_name, buttons in new_config.items():
+                if page_name in diff["added_pages"]:
+                    continue
+                for btn_name, props in buttons.items():
+                    if props.get("icon_path") in self._updated_icons:
+                        diff["changed_buttons"].setdefault(page_name, {})[btn_name] = props
+            self._updated_icons.clear()
+
+        if is_empty_diff(diff):
+            # Повторная рассылка того же конфига (например, при переподключении) — UI не трогаем
+            return
         if save_config(self.plugin_path, new_config):
             self.config_updated.emit(new_config)
+            self.config_changed.emit(diff)
 
     def process_button_click(self, btn_id, page_id):
         """
         Решает, что делать при нажатии кнопки: 
         выполнить локальное действие или отправить на сервер.
         """
-        page_num = page_id.replace("page_", "") if "page_" in page_id else "1"
-        
+        if self.is_held_macro(btn_id, page_id):
+            return  # уже отправлено при нажатии (process_button_down)
+
         # Проверка локальных действий (system)
         if page_id in self.config and btn_id in self.config[page_id]:
             btn_props = self.config[page_id][btn_id]
@@ -67,7 +117,27 @@ class ShortcutClientManager(QObject):
                     return
 
         # Если не системное — отправка на сервер
-        self.send_to_server(f"{page_num}:{btn_id}")
+        self.send_to_server(self._press_id(btn_id, page_id))
+
+    def process_button_down(self, btn_id, page_id):
+        """Макрос "пока удерживается": нажатие уходит на сервер сразу, не дожидаясь отпускания."""
+        if self.is_held_macro(btn_id, page_id):
+            self.send_to_server(self._press_id(btn_id, page_id))
+
+    def process_button_up(self, btn_id, page_id):
+        """Отпускание кнопки с макросом "held" — сервер останавливает повтор."""
+        if self.is_held_macro(btn_id, page_id) and self.socket_client:
+            self.socket_client.send_command("SHORTCUT_BUTTON_RELEASE", {"id": self._press_id(btn_id, page_id)})
+
+    def is_held_macro(self, btn_id, page_id):
+        action = (self.get_button_props(btn_id, page_id) or {}).get("action") or {}
+        return action.get("type") == "macro" and action.get("repeat") == "held"
+
+    @staticmethod
+    def _press_id(btn_id, page_id):
+        """Идентификатор нажатия для сервера: "<номер страницы>:<кнопка>"."""
+        page_num = page_id.replace("page_", "") if "page_" in page_id else "1"
+        return f"{page_num}:{btn_id}"
 
     def get_button_props(self, btn_id, page_id):
         """Возвращает свойства кнопки из конфига."""
@@ -1,6 +1,12 @@
 import os
 import json
 import base64
+import hashlib
+
+from src.asset_store import blob_name
+
+ICON_SCOPE = "shortcut/ico"  # область инвентаря (ASSET_HAVE), см. ElCore._handle_client_command
+ICON_OWNER = "shortcut"      # владелец в индексе AssetStore
 
 def load_config(plugin_path):
     """Загружает конфигурацию кнопок из JSON."""
@@ -24,6 +30,57 @@ def save_config(plugin_path, data):
     except Exception as e:
         return False
 
+def page_sort_key(page_name):
+    """page_10 идет после page_9 (сортировка по номеру, а не по строке)."""
+    try:
+        return int(page_name.split('_')[1])
+    except (IndexError, ValueError):
+        return 0
+
+def sorted_page_names(config):
+    """Имена страниц конфига в порядке отображения."""
+    return sorted(config.keys(), key=page_sort_key)
+
+def diff_configs(old_config, new_config):
+    """
+    Сравнивает старый и новый конфиг кнопок.
+    Возвращает словарь:
+        added_pages     — новые страницы (строятся целиком)
+        removed_pages   — удаленные страницы
+        changed_buttons — {page: {btn: props}} для существующих страниц;
+                          props = None, если кнопку убрали из конфига
+    """
+    old_config = old_config or {}
+    new_config = new_config or {}
+
+    added_pages = [p for p in sorted_page_names(new_config) if p not in old_config]
+    removed_pages = [p for p in sorted_page_names(old_config) if p not in new_config]
+
+    changed_buttons = {}
+    for page_name, new_buttons in new_config.items():
+        old_buttons = old_config.get(page_name)
+        if old_buttons is None or old_buttons == new_buttons:
+            continue
+        changes = {}
+        for btn_name, props in new_buttons.items():
+            if old_buttons.get(btn_name) != props:
+                changes[btn_name] = props
+        for btn_name in old_buttons:
+            if btn_name not in new_buttons:
+                changes[btn_name] = None
+        if changes:
+            changed_buttons[page_name] = changes
+
+    return {
+        "added_pages": added_pages,
+        "removed_pages": removed_pages,
+        "changed_buttons": changed_buttons
+    }
+
+def is_empty_diff(diff):
+    """True, если конфиги совпадают."""
+    return not (diff["added_pages"] or diff["removed_pages"] or diff["changed_buttons"])
+
 def load_style_data(plugin_path):
     """Загружает сырые данные стилей из JSON."""
     style_path = os.path.join(plugin_path, "config", "style_shortcut_cliento.json")
@@ -53,20 +110,78 @@ def load_anim_config(plugin_path):
         "easing_curve": "OutQuad"
     })
 
-def handle_icon_save(plugin_path, icon_data):
-    """Декодирует base64 и сохраняет иконку."""
+def handle_icon_save(plugin_path, icon_data, content=None, assets=None):
+    """
+    Сохраняет иконку от сервера.
+    content — сырые байты из бинарного кадра; без него берется base64 из icon_data["content"].
+    Без данных, но с md5 — сервер знает, что такой файл уже есть в хранилище
+    (под другим путем или у другого плагина): иконка берется оттуда.
+    assets — AssetStore: файл кладется в хранилище и привязывается к пути в индексе плагина.
+    """
     rel_path = icon_data.get("path")
     content_b64 = icon_data.get("content")
+    expected_md5 = icon_data.get("md5")
     
-    if not rel_path or not content_b64:
+    if not rel_path:
         return None
         
     full_path = os.path.join(plugin_path, rel_path)
     try:
+        if content is None and not content_b64:
+            if not (assets and expected_md5):
+                return None
+            blob = blob_name(expected_md5, rel_path)
+            if not assets.has(blob):
+                print(f"[ShortcutService] Blob not found for {rel_path}")
+                return None
+            assets.materialize(blob, full_path)
+            assets.bind(ICON_OWNER, rel_path, blob)
+            return full_path
+
+        file_data = content if content is not None else base64.b64decode(content_b64)
+        if expected_md5 and hashlib.md5(file_data).hexdigest() != expected_md5:
+            print(f"[ShortcutService] Icon md5 mismatch: {rel_path}")
+            return None
+        if assets:
+            blob = assets.put_bytes(file_data, rel_path)
+            assets.materialize(blob, full_path)
+            assets.bind(ICON_OWNER, rel_path, blob)
+            return full_path
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        file_data = base64.b64decode(content_b64)
-        with open(full_path, "wb") as f:
+        tmp_path = full_path + ".tmp"
+        with open(tmp_path, "wb") as f:
             f.write(file_data)
+        os.replace(tmp_path, full_path)
         return full_path
     except Exception as e:
         return None
+
+def collect_icon_digests(plugin_path, digest_func, assets=None):
+    """
+    Инвентарь иконок для ASSET_HAVE: {"resources/ico/<file>": md5}.
+    md5 файлов из индекса хранилища берется из имени blob (без чтения файла).
+    """
+    ico_dir = os.path.join(plugin_path, "resources", "ico")
+    digests = {}
+    if not os.path.isdir(ico_dir):
+        return digests
+    known = assets.index(ICON_OWNER) if assets else {}
+    for file_name in os.listdir(ico_dir):
+        full_path = os.path.join(ico_dir, file_name)
+        if not os.path.isfile(full_path) or file_name.endswith(".tmp"):
+            continue
+        rel_path = f"resources/ico/{file_name}"
+        blob = known.get(rel_path)
+        digest = blob.split(".", 1)[0] if blob else digest_func(full_path)
+        if digest:
+            digests[rel_path] = digest
+    return digests
+
+def collect_icon_blobs(assets):
+    """
+    Blob'ы иконок, которые действительно лежат в хранилище (ASSET_HAVE "blobs").
+    Только к ним сервер привязывает иконку без передачи файла.
+    """
+    if not assets:
+        return []
+    return sorted({blob for blob in assets.index(ICON_OWNER).values() if assets.has(blob)})
@@ -0,0 +1,200 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from PySide6.QtCore import QSize, Qt, QTimer
+from PySide6.QtGui import QIcon, QImage, QImageReader, QPixmap
+
+MB = 1024 * 1024
+DEFAULT_MAX_BYTES = 16 * MB     # RAM под готовые pixmap'ы (RPi 3B+)
+CACHE_DIR_NAME = "ico_cache"    # plugins/shortcut/resources/ico_cache: кнопки — на клиенте, thumbs/ — библиотека на сервере
+INDEX_FILE_NAME = "index.json"  # путь -> (mtime, size, md5): чтобы не хэшировать исходник каждый раз
+INDEX_SAVE_DELAY_MS = 1000      # индекс пишется на SD-карту один раз после серии новых хэшей
+
+_caches = {}  # plugin_path -> ShIconCache (общий кэш для всех экземпляров плагина)
+
+
+def get_icon_cache(plugin_path):
+    """Общий кэш иконок плагина: переживает пересоздание ShortcutClientPlugin."""
+    key = os.path.abspath(plugin_path)
+    cache = _caches.get(key)
+    if cache is None:
+        cache = ShIconCache(plugin_path)
+        _caches[key] = cache
+    return cache
+
+
+class ShIconCache:
+    """
+    Кэш иконок кнопок, растеризованных под целевой размер.
+
+    1. Память: LRU (path, mtime, size, dpr) -> QPixmap с бюджетом в байтах.
+    2. Диск: PNG в resources/ico_cache, имя — (md5 исходника, размер, DPR).
+    3. Промах: QImageReader с setScaledSize — SVG растеризуется сразу в нужном
+       размере, большие PNG декодируются с уменьшением.
+    """
+    def __init__(self, plugin_path, max_bytes=DEFAULT_MAX_BYTES):
+        self.plugin_path = plugin_path
+        self.cache_dir = os.path.join(plugin_path, "resources", CACHE_DIR_NAME)
+        self.max_bytes = max_bytes
+        self._pixmaps = OrderedDict()   # key -> QPixmap
+        self._bytes = 0
+        self._index_path = os.path.join(self.cache_dir, INDEX_FILE_NAME)
+        self._index = self._load_index()
+        self._index_dirty = False
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "rasterized": 0}
+
+    # --- Публичный API ---
+
+    def icon(self, icon_path, size=QSize(130, 130), dpr=1.0):
+        """QIcon с заранее масштабированным pixmap или None, если файла нет."""
+        pixmap = self.pixmap(icon_path, size, dpr)
+        if pixmap is None:
+            return None
+        icon = QIcon()
+        icon.addPixmap(pixmap, QIcon.Normal, QIcon.Off)
+        return icon
+
+    def pixmap(self, icon_path, size=QSize(130, 130), dpr=1.0):
+        """Pixmap, вписанный в size (логические пиксели) с учетом DPR."""
+        try:
+            stat = os.stat(icon_path)
+        except OSError:
+            return None
+
+        dpr = round(float(dpr or 1.0), 2)
+        key = (os.path.abspath(icon_path), stat.st_mtime_ns, size.width(), size.height(), dpr)
+
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return pixmap
+
+        image = self._load_image(icon_path, stat, size, dpr)
+        if image is None or image.isNull():
+            return None
+
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        self._remember(key, pixmap)
+        return pixmap
+
+    def digest(self, icon_path):
+        """md5 файла иконки (из индекса, без повторного чтения неизмененных файлов) или None."""
+        try:
+            stat = os.stat(icon_path)
+        except OSError:
+            return None
+        return self._source_digest(icon_path, stat)
+
+    def flush_index(self):
+        """Записывает индекс хэшей, если в нем есть новые записи (таймер, конец пакета, выгрузка)."""
+        if not self._index_dirty:
+            return
+        self._index_dirty = False
+        self._save_index()
+
+    def clear_memory(self):
+        """Сбрасывает RAM-кэш (дисковый кэш остается)."""
+        self._pixmaps.clear()
+        self._bytes = 0
+
+    def memory_bytes(self):
+        return self._bytes
+
+    # --- Загрузка ---
+
+    def _load_image(self, icon_path, stat, size, dpr):
+        target = QSize(round(size.width() * dpr), round(size.height() * dpr))
+        digest = self._source_digest(icon_path, stat)
+        disk_path = None
+        if digest:
+            disk_name = f"{digest}_{size.width()}x{size.height()}@{dpr:g}x.png"
+            disk_path = os.path.join(self.cache_dir, disk_name)
+            if os.path.exists(disk_path):
+                image = QImage(disk_path)
+                if not image.isNull():
+                    self.stats["disk_hits"] += 1
+                    return image
+
+        image = self.rasterize(icon_path, target)
+        if image is None:
+            return None
+        self.stats["rasterized"] += 1
+
+        if disk_path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = disk_path + ".tmp"
+                if image.save(tmp_path, "PNG"):
+                    os.replace(tmp_path, disk_path)
+            except OSError as e:
+                print(f"[ShIconCache] Disk cache write error: {e}")
+        return image
+
+    @staticmethod
+    def rasterize(icon_path, target: QSize):
+        """Декодирует изображение сразу в размер, вписанный в target (с сохранением пропорций)."""
+        reader = QImageReader(icon_path)
+        reader.setAutoTransform(True)
+        source_size = reader.size()
+        if source_size.isValid() and not source_size.isEmpty():
+            scaled = source_size.scaled(target, Qt.KeepAspectRatio)
+            # Мелкие растровые иконки не увеличиваем — только векторные
+            if scaled.width() < source_size.width() or icon_path.lower().endswith(".svg"):
+                reader.setScaledSize(scaled)
+        image = reader.read()
+        if image.isNull():
+            print(f"[ShIconCache] Cannot read '{icon_path}': {reader.errorString()}")
+            return None
+        if image.width() > target.width() or image.height() > target.height():
+            image = image.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+    # --- LRU ---
+
+    def _remember(self, key, pixmap):
+        cost = pixmap.width() * pixmap.height() * 4
+        self._pixmaps[key] = pixmap
+        self._bytes += cost
+        while self._bytes > self.max_bytes and len(self._pixmaps) > 1:
+            _, old = self._pixmaps.popitem(last=False)
+            self._bytes -= old.width() * old.height() * 4
+
+    # --- Индекс хэшей исходников ---
+
+    def _source_digest(self, icon_path, stat):
+        """md5 исходного файла; пересчитывается только при смене mtime/размера."""
+        path = os.path.abspath(icon_path)
+        entry = self._index.get(path)
+        if entry and entry.get("mtime") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+            return entry.get("md5")
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.md5(f.read()).hexdigest()
+        except OSError:
+            return None
+        self._index[path] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "md5": digest}
+        if not self._index_dirty:
+            self._index_dirty = True
+            QTimer.singleShot(INDEX_SAVE_DELAY_MS, self.flush_index)
+        return digest
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self._index_path)
+        except OSError as e:
+            print(f"[ShIconCache] Index write error: {e}")
@@ -0,0 +1,166 @@
+import os
+import re
+import json
+import hashlib
+from PySide6.QtCore import QSize, Qt, QBuffer, QByteArray, QIODevice
+from PySide6.QtGui import QIcon, QImage, QImageReader, QPainter
+
+# Размер иконки на кнопке клиента (QToolButton.iconSize = 130x130)
+ICON_TARGET_SIZE = 130
+# Масштабы: 1x — resources/ico (OTA-папка, уходит клиентам), 2x — resources/ico_2x
+# (то же имя; только для HiDPI-экрана сервера, клиентам не отправляется)
+ICON_SCALES = (1, 2)
+HIDPI_DIR_NAME = "ico_2x"
+INDEX_FILE_NAME = "icon_import_index.json"   # plugins/shortcut/config (только на сервере)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.ico', '.svg', '.bmp', '.gif', '.webp')
+
+
+def is_image_file(path):
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def import_icon(src_path, plugin_path, target_size=ICON_TARGET_SIZE, scales=ICON_SCALES):
+    """
+    Импорт иконки в resources/ico с нормализацией:
+      1. декодирование с уменьшением до target_size (SVG/ICO растеризуются);
+      2. перерисовка в чистый ARGB32 — без EXIF/текстовых чанков/ICC;
+      3. PNG для каждого масштаба (1x: resources/ico/<name>.png, 2x: resources/ico_2x/<name>.png);
+      4. дедупликация по md5: повторный импорт того же файла (или файла с тем же
+         результатом) возвращает уже существующую иконку.
+    Возвращает относительный путь 1x-иконки ("resources/ico/...") или None.
+    """
+    index_path = os.path.join(plugin_path, "config", INDEX_FILE_NAME)
+    index = _load_index(index_path)
+    sources = index.setdefault("sources", {})   # md5 исходника -> rel_path
+    outputs = index.setdefault("outputs", {})   # md5 результата 1x -> rel_path
+
+    try:
+        with open(src_path, "rb") as f:
+            source_md5 = hashlib.md5(f.read()).hexdigest()
+    except OSError as e:
+        print(f"[ShortcutIconImport] Cannot read '{src_path}': {e}")
+        return None
+
+    known = sources.get(source_md5)
+    if known and os.path.exists(os.path.join(plugin_path, known)):
+        print(f"[ShortcutIconImport] Duplicate of {known}, reusing")
+        return known
+
+    encoded = {}
+    for scale in scales:
+        data = _encode_png(src_path, target_size * scale)
+        if data is None:
+            return None
+        encoded[scale] = data
+
+    base_md5 = hashlib.md5(encoded[scales[0]]).hexdigest()
+    known = outputs.get(base_md5)
+    if known and os.path.exists(os.path.join(plugin_path, known)):
+        sources[source_md5] = known
+        _save_index(index_path, index)
+        print(f"[ShortcutIconImport] Same image as {known}, reusing")
+        return known
+
+    ico_dir = os.path.join(plugin_path, "resources", "ico")
+    os.makedirs(ico_dir, exist_ok=True)
+    stem = _safe_stem(src_path)
+    file_name = f"{stem}.png"
+    if os.path.exists(os.path.join(ico_dir, file_name)):
+        # Имя занято другой картинкой — добавляем короткий хэш
+        file_name = f"{stem}_{base_md5[:8]}.png"
+
+    try:
+        for scale, data in encoded.items():
+            scale_dir = ico_dir if scale == 1 else os.path.join(plugin_path, "resources", HIDPI_DIR_NAME)
+            os.makedirs(scale_dir, exist_ok=True)
+            _write_atomic(os.path.join(scale_dir, file_name), data)
+    except OSError as e:
+        print(f"[ShortcutIconImport] Write error: {e}")
+        return None
+
+    rel_path = f"resources/ico/{file_name}"
+    sources[source_md5] = rel_path
+    outputs[base_md5] = rel_path
+    _save_index(index_path, index)
+
+    src_size = os.path.getsize(src_path)
+    print(f"[ShortcutIconImport] {os.path.basename(src_path)} ({src_size / 1024:.1f} KB) -> "
+          f"{file_name} ({len(encoded[scales[0]]) / 1024:.1f} KB)")
+    return rel_path
+
+
+def button_icon(plugin_path, rel_path):
+    """
+    QIcon кнопки редактора: 1x из resources/ico и, если есть, 2x из resources/ico_2x.
+    Qt сам выбирает pixmap по DPR экрана, 2x читается только при DPR > 1.
+    """
+    icon = QIcon(os.path.join(plugin_path, rel_path))
+    hidpi_path = os.path.join(plugin_path, "resources", HIDPI_DIR_NAME, os.path.basename(rel_path))
+    if os.path.dirname(rel_path).replace("\\", "/") == "resources/ico" and os.path.exists(hidpi_path):
+        icon.addFile(hidpi_path)
+    return icon
+
+
+def _encode_png(src_path, max_side):
+    """Декодирует исходник в размер, вписанный в max_side x max_side, и кодирует в PNG."""
+    reader = QImageReader(src_path)
+    reader.setAutoTransform(True)
+    target = QSize(max_side, max_side)
+
+    source_size = reader.size()
+    if source_size.isValid() and not source_size.isEmpty():
+        scaled = source_size.scaled(target, Qt.KeepAspectRatio)
+        # Растровые картинки не увеличиваем, векторные растеризуем сразу в нужный размер
+        if scaled.width() < source_size.width() or src_path.lower().endswith(".svg"):
+            reader.setScaledSize(scaled)
+
+    image = reader.read()
+    if image.isNull():
+        print(f"[ShortcutIconImport] Cannot decode '{src_path}': {reader.errorString()}")
+        return None
+    if image.width() > max_side or image.height() > max_side:
+        image = image.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    # Перерисовка в новый QImage: метаданные исходника (text/EXIF/ICC) не переносятся
+    clean = QImage(image.size(), QImage.Format_ARGB32)
+    clean.fill(Qt.transparent)
+    painter = QPainter(clean)
+    painter.drawImage(0, 0, image)
+    painter.end()
+
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    if not clean.save(buffer, "PNG", 9):
+        return None
+    return bytes(QByteArray(buffer.data()))
+
+
+def _safe_stem(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    stem = re.sub(r"[^\w\-]+", "_", stem).strip("_")
+    return stem or "icon"
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _load_index(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_index(path, index):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=4, ensure_ascii=False)
+    except OSError as e:
+        print(f"[ShortcutIconImport] Index write error: {e}")
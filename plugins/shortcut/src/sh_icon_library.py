@@ -0,0 +1,182 @@
+import os
+import hashlib
+from PySide6.QtCore import (Qt, QObject, QRunnable, QThreadPool, Signal, QSize,
+                            QAbstractListModel, QModelIndex, QSortFilterProxyModel)
+from PySide6.QtGui import QIcon, QImage, QPixmap
+try:
+    from .sh_icon_cache import ShIconCache, CACHE_DIR_NAME
+    from .sh_icon_import import IMAGE_EXTENSIONS
+except ImportError:
+    from sh_icon_cache import ShIconCache, CACHE_DIR_NAME
+    from sh_icon_import import IMAGE_EXTENSIONS
+
+THUMBS_DIR_NAME = "thumbs"   # resources/ico_cache/thumbs: миниатюры библиотеки (диалог выбора иконки на сервере)
+
+
+def list_icon_files(icon_dir):
+    """[(имя файла, полный путь, mtime_ns)] по алфавиту."""
+    icons = []
+    try:
+        with os.scandir(icon_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                try:
+                    icons.append((name, entry.path, entry.stat().st_mtime_ns))
+                except OSError:
+                    continue
+    except OSError as e:
+        print(f"[IconLibrary] Cannot read '{icon_dir}': {e}")
+    icons.sort(key=lambda icon: icon[0].lower())
+    return icons
+
+
+def thumbnail_key(path, mtime_ns, side):
+    """Имя миниатюры в кэше (без .png): меняется вместе с файлом и размером."""
+    return hashlib.md5(f"{os.path.abspath(path)}|{mtime_ns}|{side}".encode("utf-8")).hexdigest()
+
+
+def prune_thumbnails(cache_dir, keep_keys):
+    """
+    Удаляет миниатюры, которых нет в keep_keys (иконка изменена или удалена,
+    другой размер). Возвращает число удаленных файлов.
+    """
+    removed = 0
+    try:
+        with os.scandir(cache_dir) as entries:
+            stale = [entry.path for entry in entries
+                     if entry.name.endswith(".png") and entry.name[:-4] not in keep_keys]
+    except OSError:
+        return 0
+    for path in stale:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class _ThumbnailSignals(QObject):
+    ready = Signal(str, QImage)   # путь, миниатюра (null — не удалось прочитать)
+
+
+class ThumbnailTask(QRunnable):
+    """Миниатюра в пуле потоков: дисковый кэш по (путь, mtime, размер), иначе растеризация."""
+    def __init__(self, path, mtime_ns, side, cache_dir, signals):
+        super().__init__()
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.side = side
+        self.cache_dir = cache_dir
+        self.signals = signals
+
+    def run(self):
+        cache_path = os.path.join(self.cache_dir, f"{thumbnail_key(self.path, self.mtime_ns, self.side)}.png")
+        image = QImage(cache_path) if os.path.exists(cache_path) else QImage()
+        if image.isNull():
+            image = ShIconCache.rasterize(self.path, QSize(self.side, self.side)) or QImage()
+            if not image.isNull():
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    tmp_path = f"{cache_path}.{id(self)}.tmp"
+                    if image.save(tmp_path, "PNG"):
+                        os.replace(tmp_path, cache_path)
+                except OSError as e:
+                    print(f"[IconLibrary] Thumbnail cache write error: {e}")
+        self.signals.ready.emit(self.path, image)
+
+
+class IconLibraryModel(QAbstractListModel):
+    """
+    Иконки библиотеки для сетки (QListView, IconMode).
+    Миниатюра запрашивается только когда представление рисует ячейку
+    (DecorationRole) и строится в QThreadPool; последние запрошенные — первыми.
+    """
+    def __init__(self, plugin_path, thumb_size=QSize(48, 48), dpr=1.0, parent=None):
+        super().__init__(parent)
+        self.cache_dir = os.path.join(plugin_path, "resources", CACHE_DIR_NAME, THUMBS_DIR_NAME)
+        self.thumb_side = round(max(thumb_size.width(), thumb_size.height()) * (dpr or 1.0))
+        self.dpr = dpr or 1.0
+        self._icons = []        # [(name, path, mtime_ns)]
+        self._rows = {}         # path -> row
+        self._thumbs = {}       # path -> QIcon (null QIcon — файл не читается)
+        self._requested = set()
+        self._priority = 0
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, QThreadPool.globalInstance().maxThreadCount() - 1))
+        self._signals = _ThumbnailSignals(self)
+        self._signals.ready.connect(self._on_thumbnail_ready)
+
+    def set_icons(self, icons):
+        self._pool.clear()
+        self.beginResetModel()
+        self._icons = list(icons)
+        self._rows = {path: row for row, (_, path, _) in enumerate(self._icons)}
+        self._requested.clear()
+        self.endResetModel()
+        # Миниатюры измененных и удаленных иконок — в фоне, после видимых ячеек
+        keep = {thumbnail_key(path, mtime_ns, self.thumb_side) for _, path, mtime_ns in self._icons}
+        self._pool.start(lambda: self._prune(keep), -1)
+
+    def _prune(self, keep):
+        removed = prune_thumbnails(self.cache_dir, keep)
+        if removed:
+            print(f"[IconLibrary] Removed {removed} stale thumbnails")
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._icons)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name, path, mtime_ns = self._icons[index.row()]
+        if role in (Qt.DisplayRole, Qt.UserRole):
+            return name
+        if role == Qt.ToolTipRole:
+            return path
+        if role == Qt.DecorationRole:
+            icon = self._thumbs.get(path)
+            if icon is None and path not in self._requested:
+                self._requested.add(path)
+                self._priority += 1
+                task = ThumbnailTask(path, mtime_ns, self.thumb_side, self.cache_dir, self._signals)
+                self._pool.start(task, self._priority)
+            return icon
+        return None
+
+    def _on_thumbnail_ready(self, path, image):
+        self._requested.discard(path)
+        icon = QIcon()
+        if not image.isNull():
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(self.dpr)
+            icon.addPixmap(pixmap)
+        self._thumbs[path] = icon
+        row = self._rows.get(path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def shutdown(self):
+        """Закрытие диалога: очередь сбрасывается, выполняющиеся задачи дожидаются."""
+        self._pool.clear()
+        self._pool.waitForDone()
+
+
+class IconFilterProxy(QSortFilterProxyModel):
+    """Фильтр по имени: все слова запроса — подстроки имени ("arrow left" -> arrow-left-circle)."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._words = []
+
+    def set_search_text(self, text):
+        self._words = text.lower().split()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._words:
+            return True
+        name = self.sourceModel().data(self.sourceModel().index(source_row, 0, source_parent), Qt.UserRole).lower()
+        return all(word in name for word in self._words)
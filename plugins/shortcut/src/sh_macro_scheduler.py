@@ -0,0 +1,235 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+from src.latency_histogram import LatencyHistogram
+
+# Последние миллисекунды до шага — активное ожидание: Condition.wait просыпается
+# с точностью таймера ОС (1 мс с timeBeginPeriod на Windows, ~0.1 мс на Linux)
+SPIN_MARGIN = 0.002
+# Корзины джиттера (мс): интересна субмиллисекундная часть
+JITTER_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50)
+
+REPEAT_MODES = ("once", "held")                  # "held" — повтор, пока кнопка удерживается
+ON_PRESS_MODES = ("ignore", "cancel", "restart")  # повторное нажатие во время выполнения
+
+
+class Macro:
+    """
+    Скомпилированный макрос: шаги — CompiledAction (sh_action_executor),
+    в том числе "delay" (args — секунды) и "key_down"/"key_up".
+    """
+    __slots__ = ("steps", "repeat", "interval", "on_press")
+
+    def __init__(self, steps, repeat="once", interval=0.1, on_press="ignore"):
+        self.steps = steps
+        self.repeat = repeat if repeat in REPEAT_MODES else "once"
+        self.interval = max(0.0, interval)
+        self.on_press = on_press if on_press in ON_PRESS_MODES else "ignore"
+
+
+class _MacroRun:
+    """Состояние одного запуска макроса."""
+    __slots__ = ("key", "macro", "index", "cycle_due", "token", "pressed", "cancelled", "released")
+
+    def __init__(self, key, macro):
+        self.key = key
+        self.macro = macro
+        self.index = 0          # следующий шаг
+        self.cycle_due = 0.0    # плановое время начала текущего повтора
+        self.token = 0          # меняется при каждом планировании: старые записи кучи пропускаются
+        self.pressed = []       # шаги key_down без парного key_up (отпускаются при отмене)
+        self.cancelled = False
+        self.released = False
+
+
+class MacroScheduler(threading.Thread):
+    """
+    Поток выполнения макросов.
+
+    Куча (время, шаг) по монотонным часам time.perf_counter(): задержки
+    отсчитываются от планового времени предыдущего шага, поэтому ошибка не
+    накапливается. Отклонение фактического запуска от планового — в гистограмму
+    jitter. Один запуск на кнопку: повторное нажатие не ставится в очередь,
+    а обрабатывается по Macro.on_press.
+    """
+    def __init__(self):
+        super().__init__(name="ShortcutMacroScheduler", daemon=True)
+        self._cond = threading.Condition()
+        self._heap = []             # (due, seq, run, token)
+        self._seq = itertools.count()
+        self._runs = {}             # key -> _MacroRun
+        self._running = True
+        self.jitter = LatencyHistogram("macro jitter", JITTER_BOUNDS_MS)
+        self.stats = {"started": 0, "ignored": 0, "cancelled": 0, "restarted": 0}
+
+    # --- API (любой поток) ---
+
+    def press(self, key, macro):
+        """Нажатие кнопки с макросом. Возвращает "started" / "ignored" / "cancelled" / "restarted"."""
+        with self._cond:
+            run = self._runs.get(key)
+            outcome = "started"
+            if run is not None and not run.cancelled:
+                if macro.on_press == "ignore":
+                    self.stats["ignored"] += 1
+                    return "ignored"
+                self._cancel_locked(run)
+                if macro.on_press == "cancel":
+                    self.stats["cancelled"] += 1
+                    return "cancelled"
+                outcome = "restarted"
+            run = _MacroRun(key, macro)
+            self._runs[key] = run
+            run.cycle_due = time.perf_counter()
+            self._schedule_locked(run, run.cycle_due)
+            self.stats[outcome] += 1
+            return outcome
+
+    def release(self, key):
+        """Кнопка отпущена: макрос "held" доигрывает текущий повтор и завершается."""
+        with self._cond:
+            run = self._runs.get(key)
+            if run is not None:
+                run.released = True
+
+    def cancel(self, key):
+        with self._cond:
+            run = self._runs.get(key)
+            if run is not None and not run.cancelled:
+                self._cancel_locked(run)
+                self.stats["cancelled"] += 1
+
+    def cancel_all(self):
+        with self._cond:
+            for run in list(self._runs.values()):
+                if not run.cancelled:
+                    self._cancel_locked(run)
+                    self.stats["cancelled"] += 1
+
+    def active_keys(self):
+        with self._cond:
+            return [key for key, run in self._runs.items() if not run.cancelled]
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self.is_alive():
+            self.join(timeout)
+
+    # --- Поток ---
+
+    def run(self):
+        _set_timer_resolution(True)
+        try:
+            while True:
+                with self._cond:
+                    entry = self._next_due_locked()
+                if entry is None:
+                    break
+                due, run = entry
+                while time.perf_counter() < due:
+                    time.sleep(0)
+                if not run.cancelled:
+                    self.jitter.record((time.perf_counter() - due) * 1000)
+                self._advance(run, due)
+        finally:
+            # Выход: ни одна клавиша не должна остаться нажатой
+            with self._cond:
+                runs = list(self._runs.values())
+                self._runs.clear()
+            for run in runs:
+                self._release_keys(run)
+            _set_timer_resolution(False)
+
+    def _next_due_locked(self):
+        """Ждет ближайший шаг; за SPIN_MARGIN до него возвращает (due, run)."""
+        while self._running:
+            if not self._heap:
+                self._cond.wait()
+                continue
+            due, _, run, token = self._heap[0]
+            if token != run.token:
+                heapq.heappop(self._heap)
+                continue
+            remaining = due - time.perf_counter()
+            if remaining > SPIN_MARGIN:
+                # Новый более ранний шаг разбудит через notify
+                self._cond.wait(remaining - SPIN_MARGIN)
+                continue
+            heapq.heappop(self._heap)
+            return due, run
+        return None
+
+    def _advance(self, run, due):
+        """Выполняет шаги до следующей задержки (или до конца макроса)."""
+        macro = run.macro
+        steps = macro.steps
+        while not run.cancelled and run.index < len(steps):
+            step = steps[run.index]
+            run.index += 1
+            if step.kind == "delay":
+                self._reschedule(run, due + step.args)
+                return
+            try:
+                step.run()
+            except Exception as e:
+                print(f"[ShortcutMacro] {run.key} step {run.index} ({step.kind}) error: {e}")
+            if step.kind == "key_down":
+                run.pressed.append(step)
+            elif step.kind == "key_up":
+                run.pressed = [down for down in run.pressed if down.args != step.args]
+
+        if not run.cancelled and macro.repeat == "held" and not run.released:
+            run.index = 0
+            run.cycle_due = max(run.cycle_due + macro.interval, due)
+            self._reschedule(run, run.cycle_due)
+            return
+        self._finish(run)
+
+    def _reschedule(self, run, due):
+        with self._cond:
+            if not run.cancelled:
+                # Опоздали больше задержки — дальше от текущего момента, без "догоняющей" пачки шагов
+                self._schedule_locked(run, max(due, time.perf_counter()))
+                return
+        self._finish(run)
+
+    def _finish(self, run):
+        self._release_keys(run)
+        with self._cond:
+            if self._runs.get(run.key) is run:
+                del self._runs[run.key]
+
+    @staticmethod
+    def _release_keys(run):
+        for step in reversed(run.pressed):
+            try:
+                step.release()
+            except Exception as e:
+                print(f"[ShortcutMacro] {run.key} key release error: {e}")
+        run.pressed = []
+
+    def _schedule_locked(self, run, due):
+        run.token += 1
+        heapq.heappush(self._heap, (due, next(self._seq), run, run.token))
+        self._cond.notify()
+
+    def _cancel_locked(self, run):
+        # Отмена выполняется в потоке планировщика (там же отпускаются клавиши)
+        run.cancelled = True
+        self._schedule_locked(run, time.perf_counter())
+
+
+def _set_timer_resolution(enabled):
+    """Windows: системный таймер 1 мс на время работы планировщика (иначе ~15.6 мс)."""
+    if os.name != "nt":
+        return
+    try:
+        import ctypes
+        winmm = ctypes.WinDLL("winmm")
+        (winmm.timeBeginPeriod if enabled else winmm.timeEndPeriod)(1)
+    except (OSError, AttributeError) as e:
+        print(f"[ShortcutMacro] Timer resolution not changed: {e}")
@@ -0,0 +1,206 @@
+import os
+from bisect import bisect_left
+from PySide6.QtCore import Qt, QSize, QAbstractItemModel, QModelIndex
+from PySide6.QtGui import QIcon, QImageReader, QPixmap
+
+# Категории дерева префабов (порядок отображения); тип действия -> категория
+PREFAB_CATEGORIES = (
+    ("program", "Application"),
+    ("shortcut", "Shortcut"),
+    ("system", "Action"),
+    ("macro", "Macro"),
+    ("other", "Other"),
+)
+_CATEGORY_ROWS = {key: row for row, (key, _) in enumerate(PREFAB_CATEGORIES)}
+_TYPE_ALIASES = {"action": "system"}
+PREFAB_ICON_SIZE = QSize(16, 16)
+
+
+def prefab_category(data):
+    """Ключ категории префаба по типу действия."""
+    action = data.get("action") if isinstance(data, dict) else None
+    act_type = action.get("type", "other") if isinstance(action, dict) else "other"
+    act_type = _TYPE_ALIASES.get(act_type, act_type)
+    return act_type if act_type in _CATEGORY_ROWS else "other"
+
+
+def _sort_key(name):
+    return (name.lower(), name)
+
+
+class PrefabTreeModel(QAbstractItemModel):
+    """
+    Дерево префабов: категории (верхний уровень) -> префабы по алфавиту.
+
+    Модель обновляется точечно по сигналам менеджера (prefab_saved / deleted /
+    renamed): индекс имя -> категория и отсортированные списки категорий дают
+    позицию строки бинарным поиском, представление получает одну вставку или
+    удаление вместо пересборки. Полный сброс — только prefabs_reset (откат batch()).
+    Иконка декодируется сразу в 16 px (QImageReader) при первой отрисовке строки
+    и запоминается только в памяти.
+    """
+    def __init__(self, manager, plugin_path, dpr=1.0, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.plugin_path = plugin_path
+        self.dpr = dpr or 1.0
+        self._entries = {}      # name -> (category row, icon_path)
+        self._keys = [[] for _ in PREFAB_CATEGORIES]    # [[(lower, name)]] по категориям
+        self._icons = {}        # name -> QIcon (None — иконки нет)
+
+        manager.prefab_saved.connect(self.on_prefab_saved)
+        manager.prefab_deleted.connect(self.on_prefab_deleted)
+        manager.prefab_renamed.connect(self.on_prefab_renamed)
+        manager.prefabs_reset.connect(self.reload)
+        self.reload()
+
+    # --- Индекс ---
+
+    def reload(self):
+        """Полная пересборка по manager.get_prefabs()."""
+        self.beginResetModel()
+        self._entries.clear()
+        self._icons.clear()
+        self._keys = [[] for _ in PREFAB_CATEGORIES]
+        for name, data in self.manager.get_prefabs().items():
+            cat_row = _CATEGORY_ROWS[prefab_category(data)]
+            self._entries[name] = (cat_row, data.get("icon_path") if isinstance(data, dict) else None)
+            self._keys[cat_row].append(_sort_key(name))
+        for keys in self._keys:
+            keys.sort()
+        self.endResetModel()
+
+    def contains(self, name):
+        """Есть ли префаб с таким именем (проверка уникальности при сохранении)."""
+        return name in self._entries
+
+    def index_of(self, name):
+        """QModelIndex префаба (для выделения после сохранения)."""
+        entry = self._entries.get(name)
+        if entry is None:
+            return QModelIndex()
+        cat_row = entry[0]
+        return self.createIndex(bisect_left(self._keys[cat_row], _sort_key(name)), 0, cat_row + 1)
+
+    def _insert(self, name, data):
+        cat_row = _CATEGORY_ROWS[prefab_category(data)]
+        key = _sort_key(name)
+        row = bisect_left(self._keys[cat_row], key)
+        self.beginInsertRows(self.index(cat_row, 0), row, row)
+        self._keys[cat_row].insert(row, key)
+        self._entries[name] = (cat_row, data.get("icon_path"))
+        self.endInsertRows()
+
+    def _remove(self, name):
+        cat_row, _ = self._entries[name]
+        row = bisect_left(self._keys[cat_row], _sort_key(name))
+        self.beginRemoveRows(self.index(cat_row, 0), row, row)
+        del self._keys[cat_row][row]
+        del self._entries[name]
+        self._icons.pop(name, None)
+        self.endRemoveRows()
+
+    # --- Сигналы менеджера ---
+
+    def on_prefab_saved(self, name):
+        data = self.manager.get_prefabs().get(name)
+        if not isinstance(data, dict):
+            return
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == _CATEGORY_ROWS[prefab_category(data)]:
+            # Перезапись в той же категории: строка на месте, меняется только иконка
+            self._entries[name] = (entry[0], data.get("icon_path"))
+            self._icons.pop(name, None)
+            index = self.index_of(name)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+            return
+        if entry is not None:
+            self._remove(name)
+        self._insert(name, data)
+
+    def on_prefab_deleted(self, name):
+        if name in self._entries:
+            self._remove(name)
+
+    def on_prefab_renamed(self, old_name, new_name):
+        if old_name in self._entries:
+            self._remove(old_name)
+        self.on_prefab_saved(new_name)
+
+    # --- QAbstractItemModel ---
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if column != 0 or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, 0, 0) if row < len(PREFAB_CATEGORIES) else QModelIndex()
+        if parent.internalId() != 0:
+            return QModelIndex()
+        cat_row = parent.row()
+        if row >= len(self._keys[cat_row]):
+            return QModelIndex()
+        # internalId строки префаба = номер категории + 1 (0 — сама категория)
+        return self.createIndex(row, 0, cat_row + 1)
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(PREFAB_CATEGORIES)
+        if parent.internalId() == 0:
+            return len(self._keys[parent.row()])
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.internalId() == 0:
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+
+    def prefab_name(self, index):
+        """Имя префаба строки или None (категория / пустой индекс)."""
+        if not index.isValid() or index.internalId() == 0:
+            return None
+        keys = self._keys[index.internalId() - 1]
+        return keys[index.row()][1] if index.row() < len(keys) else None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.internalId() == 0:
+            return PREFAB_CATEGORIES[index.row()][1] if role == Qt.DisplayRole else None
+        name = self.prefab_name(index)
+        if name is None:
+            return None
+        if role == Qt.DisplayRole:
+            return name
+        if role == Qt.UserRole:
+            return {"prefab_name": name}
+        if role == Qt.DecorationRole:
+            if name not in self._icons:
+                self._icons[name] = self._load_icon(self._entries[name][1])
+            return self._icons[name]
+        return None
+
+    def _load_icon(self, icon_path):
+        if not icon_path:
+            return None
+        reader = QImageReader(os.path.join(self.plugin_path, icon_path))
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and not size.isEmpty():
+            side = round(max(PREFAB_ICON_SIZE.width(), PREFAB_ICON_SIZE.height()) * self.dpr)
+            reader.setScaledSize(size.scaled(side, side, Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return None
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self.dpr)
+        return QIcon(pixmap)
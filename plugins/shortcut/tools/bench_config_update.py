@@ -0,0 +1,135 @@
+"""
+Бенчмарк обновления клиентского UI Shortcut по SHORTCUT_CONFIG_UPDATE.
+
+Сравнивает:
+    full — старый путь: clear_ui() + setup_buttons() + тени + обработчики на всех кнопках;
+    diff — текущий путь: handle_config_update() -> diff_configs() -> _apply_config_diff().
+
+Конфиг: 20 страниц по 12 кнопок, между обновлениями меняется одна кнопка.
+Работает offscreen на копии плагина во временной папке (рабочий конфиг не трогается).
+
+Запуск из корня проекта:
+    python plugins/shortcut/tools/bench_config_update.py [--pages 20] [--runs 20]
+"""
+import os
+import sys
+import copy
+import shutil
+import argparse
+import tempfile
+import statistics
+import importlib.util
+from time import perf_counter
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+plugin_src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+project_root = os.path.dirname(os.path.dirname(plugin_src))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PySide6.QtWidgets import QApplication
+from src.plugin_services import PluginServices
+
+
+class _SilentSound:
+    """Звук в бенчмарке не нужен: заглушка с интерфейсом ElSoundManager."""
+    config_map = {}
+
+    def play(self, name):
+        pass
+
+    def play_file(self, file_path):
+        pass
+
+    def set_enabled(self, enabled):
+        pass
+
+
+def make_config(base_config, pages):
+    """Размножает первую страницу рабочего конфига на pages страниц."""
+    template = next(iter(base_config.values()), {})
+    return {f"page_{i}": copy.deepcopy(template) for i in range(1, pages + 1)}
+
+
+def toggle_one_button(config, run):
+    """Меняет одну кнопку на середине конфига (имя — чтобы конфиги отличались)."""
+    new_config = copy.deepcopy(config)
+    page = new_config[f"page_{len(new_config) // 2}"]
+    btn = page.setdefault("butt_toolB_05", {})
+    btn["name"] = f"Bench {run}"
+    return new_config
+
+
+def load_plugin_class(plugin_path):
+    if plugin_path not in sys.path:
+        sys.path.insert(0, plugin_path)
+    spec = importlib.util.spec_from_file_location("bench_shortcut_cliento", os.path.join(plugin_path, "shortcut_cliento.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ShortcutClientPlugin
+
+
+def full_rebuild(plugin, new_config):
+    """Старое поведение _handle_config_updated (для сравнения): все страницы строятся сразу."""
+    plugin.manager.config = new_config
+    plugin.clear_ui()
+    plugin.setup_buttons()
+    for index in range(plugin.Button_stackedWidget.count()):
+        plugin._ensure_page_built(index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory(prefix="sh_bench_") as tmp:
+        plugin_path = os.path.join(tmp, "shortcut")
+        shutil.copytree(plugin_src, plugin_path, ignore=shutil.ignore_patterns("__pycache__", "tools", "ui_raw"))
+
+        from src.manager_save_load import ConfigManager
+        config_file = os.path.join(plugin_path, "config", "button_shortcut.json")
+        config = make_config(ConfigManager(config_file).load_config(), args.pages)
+        ConfigManager(config_file).save_config(config)
+
+        plugin_class = load_plugin_class(plugin_path)
+        services = PluginServices(project_root, sound=_SilentSound())
+        plugin = plugin_class(None, plugin_path, services=services)
+        plugin.resize(800, 600)
+        app.processEvents()
+
+        results = {"full": [], "diff": []}
+        for run in range(args.runs):
+            config = toggle_one_button(config, run)
+            start = perf_counter()
+            full_rebuild(plugin, config)
+            app.processEvents()
+            results["full"].append((perf_counter() - start) * 1000)
+
+        plugin.Button_stackedWidget.setCurrentIndex(args.pages - 1)
+        for run in range(args.runs):
+            config = toggle_one_button(config, run + args.runs)
+            start = perf_counter()
+            plugin.manager.handle_config_update(config)
+            app.processEvents()
+            results["diff"].append((perf_counter() - start) * 1000)
+
+        kept_page = plugin.Button_stackedWidget.currentIndex() == args.pages - 1
+
+        print(f"[Bench] {args.pages} pages x 12 buttons, 1 changed button, {args.runs} runs")
+        for name, samples in results.items():
+            print(f"[Bench] {name:>4}: median {statistics.median(samples):7.2f} ms, "
+                  f"max {max(samples):7.2f} ms")
+        speedup = statistics.median(results["full"]) / max(statistics.median(results["diff"]), 1e-6)
+        print(f"[Bench] speedup x{speedup:.1f}, current page kept: {kept_page}")
+
+        plugin.deleteLater()
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+import os
+import sys
+import math
+import time
+import zlib
+import random
+import threading
+import importlib
+try:
+    from .tn_audio_monitor import AudioPollMonitor
+except ImportError:
+    from tn_audio_monitor import AudioPollMonitor
+
+BACKEND_ENV = "TUNE_AUDIO_BACKEND"   # windows | pulse | fake — переопределяет выбор по платформе
+POLL_ENV = "TUNE_AUDIO_POLL"         # 1 — опрашивать все устройства (драйвер не присылает события)
+LEVELS_ENV = "TUNE_AUDIO_LEVELS"     # fake — синтетические уровни поверх любого бэкенда (индикаторы без звука)
+
+
+class AudioBackend:
+    """
+    Интерфейс аудиобэкенда Tune: устройства по имени (FriendlyName / description),
+    mute и громкость 0-100, подписка на изменения.
+
+    Колбэк подписки вызывается из потока бэкенда со статусом {'mute': bool, 'volume': int}
+    при любом изменении устройства — системном или через сам бэкенд. Опроса нет:
+    реализация сообщает об изменениях по событиям системы.
+    subscribe_devices() — то же для набора устройств (подключено/отключено, смена default).
+    Устройства без событий бэкенд передает в _poll(): один общий AudioPollMonitor.
+
+    Сессии приложений (микшер, см. tn_audio_mixer.py): list_sessions() — снимок
+    [{"id", "app", "pid", "volume", "mute"}], дальше subscribe_sessions(callback)
+    сообщает callback(event, session): "added" (полная запись), "changed"
+    (id + изменившиеся поля), "removed" (id). Без поддержки — пустой список.
+
+    get_levels(names) — пиковые уровни для индикаторов (опрашивает LevelStreamer):
+    {name: [peak 0.0-1.0 по каналам]}; без поддержки — пустой словарь.
+    """
+    name = "base"
+
+    def __init__(self):
+        self._subs_lock = threading.Lock()
+        self._subscribers = {}      # token -> (device_name, callback)
+        self._device_subscribers = {}   # token -> callback()
+        self._session_subscribers = {}  # token -> callback(event, session)
+        self._next_token = 0
+        self._monitor = None            # AudioPollMonitor (создается при первом _poll)
+        self._poll_all = os.environ.get(POLL_ENV, "") not in ("", "0")
+
+    # --- Устройства и статус (реализация бэкенда) ---
+
+    def list_devices(self, flow):
+        """Имена активных устройств: flow = "output" | "input"."""
+        raise NotImplementedError
+
+    def default_device(self, flow):
+        """Имя системного устройства по умолчанию или None."""
+        return None
+
+    def set_default_device(self, device_name):
+        raise NotImplementedError
+
+    def get_status(self, device_name):
+        """{'mute': bool, 'volume': int} или None, если устройства нет."""
+        raise NotImplementedError
+
+    def set_mute(self, device_name, mute):
+        raise NotImplementedError
+
+    def set_volume(self, device_name, volume):
+        raise NotImplementedError
+
+    def get_statuses(self, device_names):
+        """Статусы нескольких устройств за один заход: {name: status | None}."""
+        return {device_name: self.get_status(device_name) for device_name in device_names}
+
+    def get_levels(self, device_names):
+        """Пиковые уровни за один заход: {name: [peak, ...]}; нет устройства или поддержки — ключа нет."""
+        return {}
+
+    def close(self):
+        with self._subs_lock:
+            watched = {name for name, _ in self._subscribers.values()}
+            self._subscribers.clear()
+            self._device_subscribers.clear()
+            sessions_watched = bool(self._session_subscribers)
+            self._session_subscribers.clear()
+        if sessions_watched:
+            self._unwatch_sessions()
+        if self._monitor is not None:
+            self._monitor.stop()
+            self._monitor = None
+        for device_name in watched:
+            self._unwatch(device_name)
+
+    # --- Сессии приложений (реализация бэкенда) ---
+
+    def list_sessions(self):
+        """Снимок сессий воспроизведения: [{"id", "app", "pid", "volume", "mute"}]."""
+        return []
+
+    def set_session_volume(self, session_id, volume):
+        return False
+
+    def set_session_mute(self, session_id, mute):
+        return False
+
+    # --- Подписки ---
+
+    def subscribe(self, device_name, callback):
+        """Подписка на изменения устройства; возвращает токен для unsubscribe()."""
+        with self._subs_lock:
+            first = all(name != device_name for name, _ in self._subscribers.values())
+            self._next_token += 1
+            token = self._next_token
+            self._subscribers[token] = (device_name, callback)
+        if first:
+            if self._poll_all:
+                self._poll(device_name)
+            else:
+                self._watch(device_name)
+        return token
+
+    def unsubscribe(self, token):
+        with self._subs_lock:
+            entry = self._subscribers.pop(token, None)
+            last = entry is not None and all(name != entry[0] for name, _ in self._subscribers.values())
+        if last:
+            if self._monitor is not None:
+                self._monitor.remove(entry[0])
+            if not self._poll_all:
+                self._unwatch(entry[0])
+
+    def subscribe_devices(self, callback):
+        """Подписка на изменение набора устройств; callback() без аргументов."""
+        with self._subs_lock:
+            self._next_token += 1
+            self._device_subscribers[self._next_token] = callback
+            return self._next_token
+
+    def unsubscribe_devices(self, token):
+        with self._subs_lock:
+            self._device_subscribers.pop(token, None)
+
+    def subscribe_sessions(self, callback):
+        """Подписка на сессии приложений; callback(event, session) из потока бэкенда."""
+        with self._subs_lock:
+            first = not self._session_subscribers
+            self._next_token += 1
+            token = self._next_token
+            self._session_subscribers[token] = callback
+        if first:
+            self._watch_sessions()
+        return token
+
+    def unsubscribe_sessions(self, token):
+        with self._subs_lock:
+            removed = self._session_subscribers.pop(token, None) is not None
+            last = removed and not self._session_subscribers
+        if last:
+            self._unwatch_sessions()
+
+    def _watch_sessions(self):
+        """Первая подписка на сессии: включить уведомления о сессиях."""
+
+    def _unwatch_sessions(self):
+        """Последняя подписка на сессии снята."""
+
+    def _watch(self, device_name):
+        """Первая подписка на устройство: включить системные уведомления."""
+
+    def _unwatch(self, device_name):
+        """Последняя подписка снята: отключить уведомления."""
+
+    def _poll(self, device_name):
+        """Событий для устройства нет — опрашивать его общим потоком."""
+        with self._subs_lock:
+            if self._monitor is None:
+                self._monitor = AudioPollMonitor(self.get_statuses, self._notify_changes)
+            monitor = self._monitor
+        monitor.add(device_name)
+
+    def poke(self):
+        """Действие пользователя: опрос (если он идет) ненадолго ускоряется."""
+        if self._monitor is not None:
+            self._monitor.poke()
+
+    def _notify(self, device_name, status):
+        with self._subs_lock:
+            callbacks = [cb for name, cb in self._subscribers.values() if name == device_name]
+        for callback in callbacks:
+            try:
+                callback(dict(status))
+            except Exception as e:
+                print(f"[TnAudio] Subscriber error: {e}")
+
+    def _notify_changes(self, changes):
+        """Объединенное событие опроса: {name: status} изменившихся за тик устройств."""
+        for device_name, status in changes.items():
+            self._notify(device_name, status)
+
+    def _notify_sessions(self, event, session):
+        with self._subs_lock:
+            callbacks = list(self._session_subscribers.values())
+        for callback in callbacks:
+            try:
+                callback(event, dict(session))
+            except Exception as e:
+                print(f"[TnAudio] Session subscriber error: {e}")
+
+    def _notify_devices(self):
+        with self._subs_lock:
+            callbacks = list(self._device_subscribers.values())
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[TnAudio] Device subscriber error: {e}")
+
+
+class FakeLevelSource:
+    """
+    Синтетические пиковые уровни («музыка»: огибающая + шум, каналы слегка различаются)
+    для проверки индикаторов на Linux и без звуковой карты. Уровень масштабируется
+    громкостью устройства, mute — тишина.
+    """
+    CHANNELS = 2
+
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+
+    def get_levels(self, statuses):
+        """statuses: {name: {"mute", "volume"} | None} -> {name: [peak, ...]}."""
+        now = time.perf_counter()
+        levels = {}
+        for device_name, status in statuses.items():
+            if status is None:
+                continue
+            gain = 0.0 if status.get("mute") else status.get("volume", 0) / 100.0
+            phase = zlib.crc32(device_name.encode("utf-8")) % 628 / 100.0
+            envelope = 0.55 + 0.45 * math.sin(now * 1.7 + phase) * math.sin(now * 0.31 + phase)
+            levels[device_name] = [
+                gain * envelope * self._random.uniform(0.6, 1.0) for _ in range(self.CHANNELS)
+            ]
+        return levels
+
+
+class FakeAudioBackend(AudioBackend):
+    """
+    Устройства и сессии приложений в памяти: для Linux без PulseAudio и для тестов.
+    simulate_change() / simulate_session_change() — «системное» изменение (как ползунок в панели ОС).
+    """
+    name = "fake"
+
+    def __init__(self, outputs=("Fake Speakers",), inputs=("Fake Microphone",)):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._devices = {}      # name -> {"flow", "mute", "volume"}
+        self._defaults = {"output": None, "input": None}
+        self._sessions = {}     # id -> {"id", "app", "pid", "volume", "mute"}
+        self._next_session = 0
+        self._level_source = FakeLevelSource()
+        for name in outputs:
+            self.add_device(name, "output")
+        for name in inputs:
+            self.add_device(name, "input")
+
+    def add_device(self, device_name, flow="output", mute=False, volume=50):
+        with self._lock:
+            self._devices[device_name] = {"flow": flow, "mute": mute, "volume": volume}
+            if self._defaults[flow] is None:
+                self._defaults[flow] = device_name
+        self._notify_devices()
+
+    def remove_device(self, device_name):
+        with self._lock:
+            device = self._devices.pop(device_name, None)
+            if device and self._defaults[device["flow"]] == device_name:
+                self._defaults[device["flow"]] = next(
+                    (name for name, d in self._devices.items() if d["flow"] == device["flow"]), None)
+        if device:
+            self._notify_devices()
+
+    def list_devices(self, flow):
+        with self._lock:
+            names = [name for name, device in self._devices.items() if device["flow"] == flow]
+        default_name = self._defaults.get(flow)
+        if default_name in names:
+            names.remove(default_name)
+            names.insert(0, default_name)
+        return names
+
+    def default_device(self, flow):
+        return self._defaults.get(flow)
+
+    def set_default_device(self, device_name):
+        with self._lock:
+            device = self._devices.get(device_name)
+            if device is None:
+                return False
+            self._defaults[device["flow"]] = device_name
+        self._notify_devices()
+        return True
+
+    def get_status(self, device_name):
+        with self._lock:
+            device = self._devices.get(device_name)
+            return {"mute": device["mute"], "volume": device["volume"]} if device else None
+
+    def get_levels(self, device_names):
+        return self._level_source.get_levels(self.get_statuses(device_names))
+
+    def set_mute(self, device_name, mute):
+        return self.simulate_change(device_name, mute=bool(mute))
+
+    def set_volume(self, device_name, volume):
+        return self.simulate_change(device_name, volume=max(0, min(100, int(volume))))
+
+    def simulate_change(self, device_name, mute=None, volume=None):
+        with self._lock:
+            device = self._devices.get(device_name)
+            if device is None:
+                return False
+            before = (device["mute"], device["volume"])
+            if mute is not None:
+                device["mute"] = mute
+            if volume is not None:
+                device["volume"] = volume
+            status = {"mute": device["mute"], "volume": device["volume"]}
+        if (status["mute"], status["volume"]) != before:
+            self._notify(device_name, status)
+        return True
+
+    def add_session(self, app, pid=None, volume=100, mute=False):
+        """Приложение начало воспроизведение; возвращает id сессии."""
+        with self._lock:
+            self._next_session += 1
+            session_id = f"fake-{self._next_session}"
+            session = {"id": session_id, "app": app, "pid": pid or 1000 + self._next_session,
+                       "volume": volume, "mute": mute}
+            self._sessions[session_id] = session
+        self._notify_sessions("added", session)
+        return session_id
+
+    def remove_session(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session:
+            self._notify_sessions("removed", {"id": session_id})
+
+    def list_sessions(self):
+        with self._lock:
+            return [dict(session) for session in self._sessions.values()]
+
+    def set_session_volume(self, session_id, volume):
+        return self.simulate_session_change(session_id, volume=max(0, min(100, int(volume))))
+
+    def set_session_mute(self, session_id, mute):
+        return self.simulate_session_change(session_id, mute=bool(mute))
+
+    def simulate_session_change(self, session_id, mute=None, volume=None):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            changes = {}
+            if mute is not None and session["mute"] != mute:
+                changes["mute"] = session["mute"] = mute
+            if volume is not None and session["volume"] != volume:
+                changes["volume"] = session["volume"] = volume
+        if changes:
+            self._notify_sessions("changed", {"id": session_id, **changes})
+        return True
+
+
+class AudioBackendError(RuntimeError):
+    """Системный бэкенд недоступен там, где подмена на fake дала бы ложные ok:true (Windows)."""
+
+
+_BACKENDS = {
+    "windows": ("tn_audio_win", "WindowsAudioBackend"),
+    "pulse": ("tn_audio_pulse", "PulseAudioBackend"),
+}
+
+
+def _load_backend_class(module_name, class_name):
+    if __package__:
+        module = importlib.import_module(f".{module_name}", __package__)
+    else:
+        module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+def create_audio_backend(kind=None):
+    """
+    Бэкенд по имени (или TUNE_AUDIO_BACKEND); по умолчанию Windows — endpoint-колбэки,
+    иначе PulseAudio/PipeWire. FakeAudioBackend — только явно ("fake") или вне Windows,
+    когда PulseAudio нет (приложение работает без звука). На Windows недоступный
+    бэкенд — AudioBackendError: fake «выполнял» бы mute и громкость, не трогая систему.
+    """
+    kind = (kind or os.environ.get(BACKEND_ENV) or ("windows" if sys.platform == "win32" else "pulse")).lower()
+    if kind == "fake":
+        print("[TnAudio] Backend: fake (in-memory)")
+        return FakeAudioBackend()
+    if kind in _BACKENDS:
+        try:
+            backend = _load_backend_class(*_BACKENDS[kind])()
+            print(f"[TnAudio] Backend: {backend.name}")
+            return backend
+        except Exception as e:
+            error = f"Backend '{kind}' unavailable: {e}"
+    else:
+        error = f"Unknown backend '{kind}'"
+    if sys.platform == "win32":
+        print(f"[TnAudio] Error: {error}")
+        raise AudioBackendError(error)
+    print(f"[TnAudio] {error}")
+    print("[TnAudio] Backend: fake (in-memory)")
+    return FakeAudioBackend()
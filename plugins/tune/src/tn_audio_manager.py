@@ -1,134 +1,224 @@
 import os
-import time
-from PySide6.QtCore import QThread, Signal
-
-
-class AudioStatusListener(QThread):
-    """Универсальный поток для прослушивания изменения статуса аудиоустройства (mute и volume)."""
+import threading
+from PySide6.QtCore import QObject, Signal
+try:
+    from .tn_audio_backend import create_audio_backend, AudioBackendError, FakeLevelSource, LEVELS_ENV
+    from .tn_audio_mixer import TnAudioMixer
+except ImportError:
+    from tn_audio_backend import create_audio_backend, AudioBackendError, FakeLevelSource, LEVELS_ENV
+    from tn_audio_mixer import TnAudioMixer
+
+
+class AudioStatusSubscription(QObject):
+    """
+    Подписка на mute и громкость устройства.
+    Бэкенд сообщает об изменениях из своего потока; сигнал доставляет их в GUI-поток.
+    """
     status_changed = Signal(dict)  # {'mute': bool, 'volume': int}
 
-    def __init__(self, audio_manager, device_name, is_input=False, interval=1.0):
+    def __init__(self, backend, device_name):
         super().__init__()
-        self.audio_manager = audio_manager
+        self.backend = backend
         self.device_name = device_name
-        self.is_input = is_input
-        self.interval = interval
-        self.running = True
-        self._last_state = {'mute': None, 'volume': None}
-
-    def run(self):
-        import pythoncom
-        pythoncom.CoInitialize()
-        try:
-            while self.running:
-                if not self.device_name:
-                    time.sleep(self.interval)
-                    continue
-
-                # Получаем актуальные данные
-                if self.is_input:
-                    mute = self.audio_manager.is_mic_muted(self.device_name)
-                else:
-                    mute = self.audio_manager.is_sound_muted(self.device_name)
-                
-                volume = self.audio_manager.get_device_volume(self.device_name)
-                
-                current_state = {'mute': mute, 'volume': volume}
-                
-                if self._last_state['mute'] is None:
-                    self._last_state = current_state.copy()
-                elif current_state != self._last_state:
-                    self._last_state = current_state.copy()
-                    self.status_changed.emit(current_state)
-
-                time.sleep(self.interval)
-        finally:
-            pythoncom.CoUninitialize()
+        self._last_state = backend.get_status(device_name)
+        self._token = backend.subscribe(device_name, self._on_backend_status)
+
+    def _on_backend_status(self, status):
+        if status != self._last_state:
+            self._last_state = dict(status)
+            self.status_changed.emit(dict(status))
 
     def stop(self):
-        self.running = False
-        self.wait()
+        self.backend.unsubscribe(self._token)
 
 
-class TnAudioManager:
-    """Обертка над системным аудио-менеджером для Tune."""
+class AudioDeviceWatch(QObject):
+    """
+    Подписка на набор устройств (подключение/отключение, смена default).
+    Как и AudioStatusSubscription — сигнал переносит событие бэкенда в GUI-поток.
+    """
+    devices_changed = Signal()
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+        self._token = backend.subscribe_devices(self.devices_changed.emit)
 
-    def __init__(self):
+    def stop(self):
+        self.backend.unsubscribe_devices(self._token)
+
+
+class TnAudioManager:
+    """
+    Обертка над аудиобэкендом (src/tn_audio_backend.py) для Tune.
+    Статус устройств приходит событиями бэкенда, без опроса.
+    Списки устройств кэшируются: refresh_*() перечисляет заново, get_cached_*() — нет.
+    Изменения громкости/mute ускоряют опрос устройств без событий (backend.poke()).
+    Уровни для индикаторов — get_levels(); TUNE_AUDIO_LEVELS=fake — синтетические.
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._backend_lock = threading.Lock()   # создание / освобождение бэкенда (get_levels — из потока уровней)
+        self._closed = False
+        self._backend_error = None              # AudioBackendError: не пересоздавать до open()
         self._output_devices: list[str] = []
         self._input_devices: list[str] = []
-        self._mic_listener: AudioStatusListener | None = None
-        self._sound_listener: AudioStatusListener | None = None
+        self._mic_listener: AudioStatusSubscription | None = None
+        self._sound_listener: AudioStatusSubscription | None = None
+        self._device_watch: AudioDeviceWatch | None = None
+        self._mixer: TnAudioMixer | None = None
+        self._fake_levels = FakeLevelSource() if os.environ.get(LEVELS_ENV, "").lower() == "fake" else None
+
+    @property
+    def backend(self):
+        """
+        Бэкенд создается при первом обращении (и заново после close()).
+        Недоступен — AudioBackendError, та же ошибка до open() (без повторных попыток).
+        """
+        with self._backend_lock:
+            return self._ensure_backend()
+
+    def _ensure_backend(self):
+        """Под _backend_lock."""
+        if self._backend is None:
+            if self._backend_error is not None:
+                raise self._backend_error
+            try:
+                self._backend = create_audio_backend()
+            except AudioBackendError as e:
+                self._backend_error = e
+                raise
+        return self._backend
+
+    def open(self) -> bool:
+        """Создать бэкенд заново после close() (возврат приложения из фона). False — недоступен."""
+        with self._backend_lock:
+            self._closed = False
+            self._backend_error = None
+        return self.is_available()
+
+    def is_available(self) -> bool:
+        """Есть ли системный бэкенд (False — ошибка уже в логе, действия возвращают False)."""
+        try:
+            return self.backend is not None
+        except AudioBackendError:
+            return False
 
-    def __del__(self):
+    def close(self):
+        """Остановить подписки и освободить бэкенд (выгрузка плагина, уход в фон)."""
         self.stop_mic_listening()
         self.stop_sound_listening()
+        self.stop_device_watch()
+        self.stop_app_mixer()
+        with self._backend_lock:
+            self._closed = True
+            backend, self._backend = self._backend, None
+        if backend is not None:
+            backend.close()
 
     def start_mic_listening(self, device_name: str, callback) -> bool:
-        """Запустить прослушивание статуса микрофона."""
+        """Подписаться на статус микрофона."""
         self.stop_mic_listening()
-        if not device_name:
+        if not device_name or not self.is_available():
             return False
-            
-        self._mic_listener = AudioStatusListener(self, device_name, is_input=True)
+
+        self._mic_listener = AudioStatusSubscription(self.backend, device_name)
         self._mic_listener.status_changed.connect(callback)
-        self._mic_listener.start()
         return True
 
     def stop_mic_listening(self):
-        """Остановить прослушивание."""
+        """Снять подписку."""
         if self._mic_listener:
             self._mic_listener.stop()
             self._mic_listener = None
 
     def start_sound_listening(self, device_name: str, callback) -> bool:
-        """Запустить прослушивание статуса звука."""
+        """Подписаться на статус звука."""
         self.stop_sound_listening()
-        if not device_name:
+        if not device_name or not self.is_available():
             return False
-            
-        self._sound_listener = AudioStatusListener(self, device_name, is_input=False)
+
+        self._sound_listener = AudioStatusSubscription(self.backend, device_name)
         self._sound_listener.status_changed.connect(callback)
-        self._sound_listener.start()
         return True
 
     def stop_sound_listening(self):
-        """Остановить прослушивание."""
+        """Снять подписку."""
         if self._sound_listener:
             self._sound_listener.stop()
             self._sound_listener = None
 
-    def refresh_output_devices(self) -> list[str]:
-        """Получить список устройств вывода и залогировать их."""
-        devices: list[str] = []
-        default_name: str | None = None
+    def start_device_watch(self, callback) -> bool:
+        """Подписаться на изменение набора устройств (callback() в GUI-потоке)."""
+        self.stop_device_watch()
+        if not self.is_available():
+            return False
+        self._device_watch = AudioDeviceWatch(self.backend)
+        self._device_watch.devices_changed.connect(callback)
+        return True
 
+    def stop_device_watch(self):
+        """Снять подписку на набор устройств."""
+        if self._device_watch:
+            self._device_watch.stop()
+            self._device_watch = None
+
+    def start_app_mixer(self, callback) -> bool:
+        """Микшер приложений: callback(changed: dict, removed: list) в GUI-потоке."""
+        self.stop_app_mixer()
         try:
-            from libs.audio_manager import audioSwitch as switcher
-            devices_map = switcher.MyAudioUtilities.getAllDevices("output")
-            devices = list(devices_map.keys())
+            self._mixer = TnAudioMixer(self.backend)
+            self._mixer.apps_changed.connect(callback)
+            self._mixer.start()
+        except Exception as e:
+            print(f"[TuneBandito] App mixer error: {e}")
+            self._mixer = None
+            return False
+        return True
 
-            # Пытаемся определить текущее устройство по умолчанию
+    def stop_app_mixer(self):
+        if self._mixer:
+            self._mixer.stop()
+            self._mixer = None
+
+    def get_apps(self) -> dict:
+        """Приложения со статусом из реестра микшера (без обращения к системе)."""
+        return self._mixer.apps() if self._mixer else {}
+
+    def set_app_volume(self, app: str, volume: int) -> bool:
+        """Громкость приложения (всех его сессий), 0-100."""
+        return self._mixer.set_app_volume(app, volume) if self._mixer and app else False
+
+    def set_app_mute(self, app: str, mute: bool) -> bool:
+        return self._mixer.set_app_mute(app, mute) if self._mixer and app else False
+
+    def get_levels(self, device_names: list[str]) -> dict:
+        """
+        Пиковые уровни устройств {name: [peak, ...]} (одним заходом в бэкенд).
+        Вызывается из потока уровней: после close() бэкенд не создается заново (до open()).
+        """
+        device_names = [name for name in device_names if name]
+        with self._backend_lock:
+            if self._closed or not device_names:
+                return {}
             try:
-                import pythoncom
-                pythoncom.CoInitialize()
-                try:
-                    from pycaw.pycaw import AudioUtilities
-                    default_endpoint = AudioUtilities.GetSpeakers()
-                    if default_endpoint is not None:
-                        device_obj = AudioUtilities.CreateDevice(default_endpoint)
-                        default_name = device_obj.FriendlyName
-                finally:
-                    try:
-                        pythoncom.CoUninitialize()
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-
-            if default_name and default_name in devices:
-                devices.remove(default_name)
-                devices.insert(0, default_name)
+                backend = self._ensure_backend()
+            except AudioBackendError:
+                return {}
+        try:
+            if self._fake_levels is not None:
+                return self._fake_levels.get_levels(backend.get_statuses(device_names))
+            return backend.get_levels(device_names)
+        except Exception as e:
+            print(f"[Tn] Levels error: {e}")
+            return {}
 
+    def refresh_output_devices(self) -> list[str]:
+        """Получить список устройств вывода (устройство по умолчанию — первым)."""
+        devices: list[str] = []
+        try:
+            devices = self.backend.list_devices("output")
         except Exception as e:
             print(f"[TuneBandito] AudioManager error while listing outputs: {e}")
 
@@ -139,9 +229,7 @@ class TnAudioManager:
         """Получить список устройств ввода (микрофоны)."""
         devices: list[str] = []
         try:
-            from libs.audio_manager import audioSwitch as switcher
-            devices_map = switcher.MyAudioUtilities.getAllDevices("input")
-            devices = list(devices_map.keys())
+            devices = self.backend.list_devices("input")
         except Exception as e:
             print(f"[TuneBandito] AudioManager error while listing inputs: {e}")
 
@@ -163,33 +251,14 @@ class TnAudioManager:
             return False
 
         try:
-            import pythoncom
-            pythoncom.CoInitialize()
-            try:
-                from libs.audio_manager import audioSwitch as switcher
-                all_devices = switcher.MyAudioUtilities.getAllDevices("output")
-                device_id = all_devices.get(device_name)
-                if not device_id:
-                    print(f"[TuneBandito] Device '{device_name}' not found among active outputs.")
-                    return False
-
-                # Устанавливаем выбранное устройство по умолчанию для всех ролей
-                switcher.switchOutput(device_id, switcher.pc.ERole.eConsole)
-                switcher.switchOutput(device_id, switcher.pc.ERole.eMultimedia)
-                switcher.switchOutput(device_id, switcher.pc.ERole.eCommunications)
-                print(f"[TuneBandito] Default output device set to: {device_name}")
-                return True
-            except Exception as e:
-                print(f"[TuneBandito] Error while switching default output device: {e}")
+            if not self.backend.set_default_device(device_name):
+                print(f"[TuneBandito] Device '{device_name}' not found among active outputs.")
                 return False
-            finally:
-                try:
-                    pythoncom.CoUninitialize()
-                except Exception:
-                    pass
         except Exception as e:
-            print(f"[TuneBandito] Python COM initialization error: {e}")
+            print(f"[TuneBandito] Error while switching default output device: {e}")
             return False
+        print(f"[TuneBandito] Default output device set to: {device_name}")
+        return True
 
     def set_mute_mic(self, device_name: str, mute: bool) -> bool:
         """Включить/выключить звук для указанного микрофона."""
@@ -209,120 +278,47 @@ class TnAudioManager:
 
     def get_device_volume(self, device_name: str) -> int:
         """Получить текущий уровень громкости устройства (0-100)."""
-        return self._get_device_volume(device_name)
+        status = self._status(device_name)
+        return status["volume"] if status else 0
 
     def set_device_volume(self, device_name: str, volume: int) -> bool:
         """Установить уровень громкости устройства (0-100)."""
-        return self._set_device_volume(device_name, volume)
+        if not device_name:
+            return False
+        try:
+            return bool(self.backend.set_volume(device_name, int(volume)))
+        except Exception as e:
+            print(f"[Tn] Set volume error: {e}")
+        finally:
+            self._poke()
+        return False
 
     def _set_device_mute(self, device_name: str, mute: bool) -> bool:
         """Внутренний метод для установки mute на устройстве."""
         if not device_name:
             return False
         try:
-            import pythoncom
-            pythoncom.CoInitialize()
-            try:
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-                from comtypes import CLSCTX_ALL
-                devices = AudioUtilities.GetAllDevices()
-                for device in devices:
-                    if device.FriendlyName == device_name:
-                        target = getattr(device, "_dev", None)
-                        if target is None:
-                            target = getattr(device, "device", device)
-                            
-                        if hasattr(target, "Activate"):
-                            interface = target.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-                            volume = interface.QueryInterface(IAudioEndpointVolume)
-                            volume.SetMute(1 if mute else 0, None)
-                            return True
-            finally:
-                pythoncom.CoUninitialize()
+            return bool(self.backend.set_mute(device_name, mute))
         except Exception as e:
             print(f"[Tn] Mute device error: {e}")
+        finally:
+            self._poke()
         return False
 
+    def _poke(self):
+        """Ускорить опрос после изменения (бэкенда нет — нечего опрашивать)."""
+        if self._backend is not None:
+            self._backend.poke()
+
     def _is_device_muted(self, device_name: str) -> bool:
         """Внутренний метод для проверки mute на устройстве."""
-        if not device_name:
-            return False
-        try:
-            import pythoncom
-            pythoncom.CoInitialize()
-            try:
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-                from comtypes import CLSCTX_ALL
-                devices = AudioUtilities.GetAllDevices()
-                for device in devices:
-                    if device.FriendlyName == device_name:
-                        target = getattr(device, "_dev", None)
-                        if target is None:
-                            target = getattr(device, "device", device)
-                            
-                        if hasattr(target, "Activate"):
-                            interface = target.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-                            volume = interface.QueryInterface(IAudioEndpointVolume)
-                            return bool(volume.GetMute())
-            finally:
-                pythoncom.CoUninitialize()
-        except Exception:
-            pass
-        return False
+        status = self._status(device_name)
+        return status["mute"] if status else False
 
-    def _get_device_volume(self, device_name: str) -> int:
-        """Внутренний метод для получения громкости (0-100)."""
+    def _status(self, device_name):
         if not device_name:
-            return 0
+            return None
         try:
-            import pythoncom
-            pythoncom.CoInitialize()
-            try:
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-                from comtypes import CLSCTX_ALL
-                devices = AudioUtilities.GetAllDevices()
-                for device in devices:
-                    if device.FriendlyName == device_name:
-                        target = getattr(device, "_dev", None)
-                        if target is None:
-                            target = getattr(device, "device", device)
-                            
-                        if hasattr(target, "Activate"):
-                            interface = target.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-                            volume_interface = interface.QueryInterface(IAudioEndpointVolume)
-                            current_volume = volume_interface.GetMasterVolumeLevelScalar()
-                            return int(round(current_volume * 100))
-            finally:
-                pythoncom.CoUninitialize()
+            return self.backend.get_status(device_name)
         except Exception:
-            pass
-        return 0
-
-    def _set_device_volume(self, device_name: str, volume: int) -> bool:
-        """Внутренний метод для установки громкости (0-100)."""
-        if not device_name:
-            return False
-        try:
-            import pythoncom
-            pythoncom.CoInitialize()
-            try:
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-                from comtypes import CLSCTX_ALL
-                devices = AudioUtilities.GetAllDevices()
-                for device in devices:
-                    if device.FriendlyName == device_name:
-                        target = getattr(device, "_dev", None)
-                        if target is None:
-                            target = getattr(device, "device", device)
-                            
-                        if hasattr(target, "Activate"):
-                            interface = target.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-                            volume_interface = interface.QueryInterface(IAudioEndpointVolume)
-                            volume_interface.SetMasterVolumeLevelScalar(volume / 100.0, None)
-                            return True
-            finally:
-                pythoncom.CoUninitialize()
-        except Exception as e:
-            print(f"[Tn] Set volume error: {e}")
-        return False
-
+            return None
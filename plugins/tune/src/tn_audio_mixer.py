@@ -0,0 +1,119 @@
+from PySide6.QtCore import QObject, Signal, QTimer
+
+FLUSH_MS = 50   # изменения сессий за это время уходят одним событием apps_changed
+
+
+class TnAudioMixer(QObject):
+    """
+    Микшер приложений: громкость и mute по имени процесса (как AudioController
+    из libs/audio_manager), поверх сессий аудиобэкенда.
+
+    Реестр сессий заполняется одним list_sessions() при start(), дальше
+    обновляется только событиями бэкенда (создана / изменена / завершена) —
+    без повторного перебора сессий. Несколько сессий одного процесса
+    (браузер, игра) — одно приложение: громкость — максимальная из сессий,
+    mute — если заглушены все; установка применяется ко всем сессиям.
+    """
+    apps_changed = Signal(dict, list)   # {app: {"volume", "mute", "sessions"}} изменившиеся, [app] исчезнувшие
+    _session_event = Signal(str, dict)  # поток бэкенда -> GUI-поток
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+        self._sessions = {}       # id -> {"id", "app", "pid", "volume", "mute"}
+        self._reported = {}       # app -> статус, о котором уже сообщили
+        self._dirty = set()
+        self._token = None
+        self.stats = {"scans": 0, "events": 0}
+        self._session_event.connect(self._on_session_event)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_MS)
+        self._flush_timer.timeout.connect(self._flush)
+
+    def start(self):
+        if self._token is not None:
+            return
+        # Сначала подписка, потом снимок: сессия, созданная между ними, не теряется
+        self._token = self.backend.subscribe_sessions(self._session_event.emit)
+        for session in self.backend.list_sessions():
+            self._sessions[session["id"]] = dict(session)
+        self.stats["scans"] += 1
+        self._reported = self.apps()
+
+    def stop(self):
+        if self._token is None:
+            return
+        self.backend.unsubscribe_sessions(self._token)
+        self._token = None
+        self._flush_timer.stop()
+        self._sessions.clear()
+        self._reported.clear()
+        self._dirty.clear()
+
+    def apps(self):
+        """Все приложения со статусом: {app: {"volume", "mute", "sessions"}}."""
+        names = {session["app"] for session in self._sessions.values()}
+        return {app: self._app_status(app) for app in sorted(names)}
+
+    def set_app_volume(self, app, volume):
+        return self._apply(app, self.backend.set_session_volume, max(0, min(100, int(volume))))
+
+    def set_app_mute(self, app, mute):
+        return self._apply(app, self.backend.set_session_mute, bool(mute))
+
+    def _apply(self, app, setter, value):
+        session_ids = [sid for sid, session in self._sessions.items() if session["app"] == app]
+        ok = False
+        for session_id in session_ids:
+            try:
+                ok = bool(setter(session_id, value)) or ok
+            except Exception as e:
+                print(f"[TnMixer] {app}: {e}")
+        return ok
+
+    def _app_status(self, app):
+        sessions = [session for session in self._sessions.values() if session["app"] == app]
+        if not sessions:
+            return None
+        return {
+            "volume": max(session["volume"] for session in sessions),
+            "mute": all(session["mute"] for session in sessions),
+            "sessions": len(sessions),
+        }
+
+    def _on_session_event(self, event, session):
+        if self._token is None:
+            return
+        self.stats["events"] += 1
+        session_id = session.get("id")
+        if event == "removed":
+            previous = self._sessions.pop(session_id, None)
+            if previous is None:
+                return
+            self._dirty.add(previous["app"])
+        else:
+            previous = self._sessions.get(session_id)
+            if previous is None and event != "added":
+                return   # изменение сессии, о создании которой не сообщали
+            merged = dict(previous or {})
+            merged.update(session)
+            self._sessions[session_id] = merged
+            self._dirty.add(merged["app"])
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self):
+        dirty, self._dirty = self._dirty, set()
+        changed = {}
+        removed = []
+        for app in sorted(dirty):
+            status = self._app_status(app)
+            if status is None:
+                if self._reported.pop(app, None) is not None:
+                    removed.append(app)
+            elif status != self._reported.get(app):
+                self._reported[app] = status
+                changed[app] = status
+        if changed or removed:
+            self.apps_changed.emit(changed, removed)
@@ -0,0 +1,116 @@
+import threading
+import time
+
+FAST_INTERVAL = 0.1     # с: сразу после действия пользователя
+IDLE_INTERVAL = 2.0     # с: в простое
+BOOST_SECONDS = 3.0     # сколько держать быстрый опрос после poke() или замеченного изменения
+BACKOFF = 1.5           # рост интервала за тик без изменений
+
+
+class AudioPollMonitor:
+    """
+    Один поток опроса для устройств, о которых бэкенд не получает событий
+    (колбэк не зарегистрировался, событийный поток PulseAudio упал,
+    TUNE_AUDIO_POLL=1).
+
+    За тик — один батч sample(names) -> {name: status} (на Windows — один заход
+    в COM-поток на все устройства) и одно объединенное событие
+    on_changes({name: status}) только с изменившимися устройствами.
+
+    Интервал адаптивный: poke() (действие пользователя) и замеченное изменение —
+    FAST_INTERVAL на BOOST_SECONDS, дальше растет в BACKOFF раз до IDLE_INTERVAL.
+    """
+
+    def __init__(self, sample, on_changes, fast=FAST_INTERVAL, idle=IDLE_INTERVAL, boost=BOOST_SECONDS):
+        self._sample = sample
+        self._on_changes = on_changes
+        self.fast = fast
+        self.idle = idle
+        self.boost = boost
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._names = set()
+        self._last = {}             # name -> статус последнего тика
+        self._interval = idle
+        self._boost_until = 0.0
+        self._stopped = False
+        self._thread = None
+        self.stats = {"ticks": 0, "samples": 0, "changes": 0}
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def names(self):
+        with self._lock:
+            return set(self._names)
+
+    def add(self, device_name):
+        with self._lock:
+            if self._stopped:
+                return
+            self._names.add(device_name)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="TnAudioPoll", daemon=True)
+                self._thread.start()
+        self._wake.set()   # исходный статус — без ожидания тика
+
+    def remove(self, device_name):
+        with self._lock:
+            self._names.discard(device_name)
+            self._last.pop(device_name, None)
+
+    def poke(self):
+        """Пользователь что-то изменил: ближайшие BOOST_SECONDS опрашиваем часто."""
+        self._boost_until = time.monotonic() + self.boost
+        self._interval = self.fast
+        self._wake.set()
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            with self._lock:
+                if self._stopped:
+                    return
+                names = sorted(self._names)
+            if names:
+                self._tick(names)
+
+    def _tick(self, names):
+        try:
+            statuses = self._sample(names)
+        except Exception as e:
+            print(f"[TnAudio] Poll: {e}")
+            statuses = {}
+        changes = {}
+        with self._lock:
+            for device_name, status in statuses.items():
+                if status is None or device_name not in self._names:
+                    continue
+                if status != self._last.get(device_name):
+                    self._last[device_name] = dict(status)
+                    changes[device_name] = dict(status)
+        self.stats["ticks"] += 1
+        self.stats["samples"] += len(names)
+
+        now = time.monotonic()
+        if changes:
+            self.stats["changes"] += len(changes)
+            self._boost_until = max(self._boost_until, now + self.boost)
+            try:
+                self._on_changes(changes)
+            except Exception as e:
+                print(f"[TnAudio] Poll subscriber error: {e}")
+        if now < self._boost_until:
+            self._interval = self.fast
+        else:
+            self._interval = min(self.idle, self._interval * BACKOFF)
@@ -0,0 +1,270 @@
+import threading
+try:
+    from .tn_audio_backend import AudioBackend
+except ImportError:
+    from tn_audio_backend import AudioBackend
+
+_FACILITIES = {"output": "sink", "input": "source"}
+
+
+class PulseAudioBackend(AudioBackend):
+    """
+    PulseAudio (и PipeWire через pipewire-pulse) через pulsectl.
+
+    Два соединения: командное (под блокировкой) и событийное — поток ждет
+    subscribe-события sink/source и проверяет только изменившееся устройство.
+    Имя устройства — description (как FriendlyName в Windows); мониторы sink'ов
+    в список микрофонов не входят. Событийное соединение оборвалось — отслеживаемые
+    устройства переходят в общий опрос (AudioPollMonitor).
+    Сессии приложений — sink-input'ы: реестр по событиям new/change/remove.
+    Уровней для индикаторов нет: пик в PulseAudio — отдельный поток записи с монитора
+    (get_peak_sample) на каждый замер; проверка индикаторов — TUNE_AUDIO_LEVELS=fake.
+    """
+    name = "pulse"
+
+    def __init__(self):
+        super().__init__()
+        import pulsectl
+        self._pulsectl = pulsectl
+        self._pulse = pulsectl.Pulse("el-tune")
+        self._events = pulsectl.Pulse("el-tune-events")
+        self._lock = threading.Lock()
+        self._indexes = {}          # name -> (facility, index)
+        self._watched_names = set()
+        self._watched = {}          # (facility, index) -> name (пересчитывается при смене набора устройств)
+        self._last = {}             # name -> статус, о котором уже сообщили
+        self._changed = set()
+        self._session_events = []   # (тип события, индекс sink-input) из колбэка
+        self._sessions_watched = False
+        self._session_info = {}     # id -> {"id", "app", "pid", "volume", "mute"}
+        self._closed = False
+        self._events_alive = True
+        self._thread = threading.Thread(target=self._listen, name="TnAudioPulse", daemon=True)
+        self._thread.start()
+
+    # --- Событийный поток ---
+
+    def _listen(self):
+        self._events.event_mask_set("sink", "source", "server", "sink_input")
+        self._events.event_callback_set(self._on_event)
+        while not self._closed:
+            try:
+                self._events.event_listen()
+            except Exception as e:
+                print(f"[TnAudio] Pulse event loop: {e}")
+                if not self._closed:
+                    self._fall_back_to_polling()
+                break
+            changed, self._changed = self._changed, set()
+            session_events, self._session_events = self._session_events, []
+            if self._sessions_watched:
+                for event_type, index in session_events:
+                    self._on_session_event(event_type, index)
+            if None in changed:
+                self._reindex()
+                self._notify_devices()
+                names = set(self._watched_names)
+            else:
+                names = {self._watched[key] for key in changed if key in self._watched}
+            for device_name in names:
+                status = self.get_status(device_name)
+                if status is not None and status != self._last.get(device_name):
+                    self._last[device_name] = status
+                    self._notify(device_name, status)
+
+    def _on_event(self, event):
+        # Внутри колбэка pulsectl запрещает вызовы — запоминаем и выходим из event_listen()
+        if event.facility == "sink_input":
+            self._session_events.append(("remove" if event.t == "remove" else "update", event.index))
+        elif event.t == "change" and event.facility in ("sink", "source"):
+            self._changed.add(("sink" if event.facility == "sink" else "source", event.index))
+        else:
+            self._changed.add(None)   # устройство добавлено/удалено, смена default
+        raise self._pulsectl.PulseLoopStop
+
+    def _session(self, sink_input):
+        props = sink_input.proplist
+        try:
+            pid = int(props.get("application.process.id") or 0)
+        except ValueError:
+            pid = 0
+        return {
+            "id": str(sink_input.index),
+            "app": props.get("application.process.binary") or props.get("application.name") or sink_input.name,
+            "pid": pid,
+            "volume": int(round(self._pulse.volume_get_all_chans(sink_input) * 100)),
+            "mute": bool(sink_input.mute),
+        }
+
+    def _on_session_event(self, event_type, index):
+        session_id = str(index)
+        if event_type == "remove":
+            if self._session_info.pop(session_id, None) is not None:
+                self._notify_sessions("removed", {"id": session_id})
+            return
+        with self._lock:
+            try:
+                info = self._session(self._pulse.sink_input_info(index))
+            except self._pulsectl.PulseIndexError:
+                return
+        previous = self._session_info.get(session_id)
+        self._session_info[session_id] = info
+        if previous is None:
+            self._notify_sessions("added", info)
+            return
+        changes = {key: info[key] for key in ("volume", "mute") if previous[key] != info[key]}
+        if changes:
+            self._notify_sessions("changed", {"id": session_id, **changes})
+
+    def _fall_back_to_polling(self):
+        with self._lock:
+            self._events_alive = False
+            names = set(self._watched_names)
+        for device_name in names:
+            self._poll(device_name)
+
+    def _reindex(self):
+        with self._lock:
+            self._indexes.clear()
+            watched = {}
+            for device_name in self._watched_names:
+                if self._find(device_name) is not None:
+                    watched[self._indexes[device_name]] = device_name
+            self._watched = watched
+
+    # --- Поиск устройства ---
+
+    def _objects(self, facility):
+        if facility == "sink":
+            return self._pulse.sink_list()
+        return [source for source in self._pulse.source_list() if not source.monitor_of_sink_name]
+
+    def _find(self, device_name):
+        """Объект sink/source по имени; индекс кэшируется, при промахе — перечисление."""
+        entry = self._indexes.get(device_name)
+        if entry is not None:
+            facility, index = entry
+            try:
+                getter = self._pulse.sink_info if facility == "sink" else self._pulse.source_info
+                return getter(index)
+            except self._pulsectl.PulseIndexError:
+                self._indexes.pop(device_name, None)
+        for facility in _FACILITIES.values():
+            for obj in self._objects(facility):
+                self._indexes[obj.description] = (facility, obj.index)
+                if obj.description == device_name:
+                    return obj
+        return None
+
+    # --- AudioBackend ---
+
+    def list_devices(self, flow):
+        facility = _FACILITIES[flow]
+        with self._lock:
+            objects = self._objects(facility)
+            for obj in objects:
+                self._indexes[obj.description] = (facility, obj.index)
+            names = [obj.description for obj in objects]
+        default_name = self.default_device(flow)
+        if default_name in names:
+            names.remove(default_name)
+            names.insert(0, default_name)
+        return names
+
+    def default_device(self, flow):
+        with self._lock:
+            info = self._pulse.server_info()
+            default = info.default_sink_name if flow == "output" else info.default_source_name
+            return next((obj.description for obj in self._objects(_FACILITIES[flow]) if obj.name == default), None)
+
+    def set_default_device(self, device_name):
+        with self._lock:
+            obj = self._find(device_name)
+            if obj is None:
+                return False
+            self._pulse.default_set(obj)
+            return True
+
+    def _status(self, device_name):
+        obj = self._find(device_name)
+        if obj is None:
+            return None
+        return {"mute": bool(obj.mute), "volume": int(round(self._pulse.volume_get_all_chans(obj) * 100))}
+
+    def get_status(self, device_name):
+        with self._lock:
+            return self._status(device_name)
+
+    def get_statuses(self, device_names):
+        """Тик опроса — одна блокировка командного соединения на все устройства."""
+        with self._lock:
+            return {device_name: self._status(device_name) for device_name in device_names}
+
+    def set_mute(self, device_name, mute):
+        with self._lock:
+            obj = self._find(device_name)
+            if obj is None:
+                return False
+            self._pulse.mute(obj, bool(mute))
+            return True
+
+    def set_volume(self, device_name, volume):
+        with self._lock:
+            obj = self._find(device_name)
+            if obj is None:
+                return False
+            self._pulse.volume_set_all_chans(obj, max(0, min(100, volume)) / 100.0)
+            return True
+
+    def list_sessions(self):
+        with self._lock:
+            sessions = [self._session(sink_input) for sink_input in self._pulse.sink_input_list()]
+        self._session_info = {session["id"]: session for session in sessions}
+        return [dict(session) for session in sessions]
+
+    def _set_session(self, session_id, action):
+        with self._lock:
+            try:
+                sink_input = self._pulse.sink_input_info(int(session_id))
+            except (self._pulsectl.PulseIndexError, ValueError):
+                return False
+            action(sink_input)
+            return True
+
+    def set_session_volume(self, session_id, volume):
+        level = max(0, min(100, volume)) / 100.0
+        return self._set_session(session_id, lambda obj: self._pulse.volume_set_all_chans(obj, level))
+
+    def set_session_mute(self, session_id, mute):
+        return self._set_session(session_id, lambda obj: self._pulse.mute(obj, bool(mute)))
+
+    def _watch_sessions(self):
+        self._sessions_watched = True
+
+    def _unwatch_sessions(self):
+        self._sessions_watched = False
+        self._session_info = {}
+
+    def _watch(self, device_name):
+        with self._lock:
+            self._watched_names.add(device_name)
+            if self._find(device_name) is not None:
+                self._watched[self._indexes[device_name]] = device_name
+            events_alive = self._events_alive
+        if not events_alive:
+            self._poll(device_name)
+
+    def _unwatch(self, device_name):
+        with self._lock:
+            self._watched_names.discard(device_name)
+            self._watched = {key: name for key, name in self._watched.items() if name != device_name}
+            self._last.pop(device_name, None)
+
+    def close(self):
+        super().close()
+        self._closed = True
+        self._events.event_listen_stop()
+        self._thread.join(timeout=2.0)
+        self._events.close()
+        with self._lock:
+            self._pulse.close()
@@ -0,0 +1,535 @@
+import queue
+import threading
+from concurrent.futures import Future
+from ctypes import HRESULT, POINTER, c_float, c_uint
+
+import comtypes
+from comtypes import CLSCTX_ALL, COMMETHOD, GUID, IUnknown
+from pycaw.pycaw import (AudioUtilities, AudioSession, IAudioEndpointVolume, IAudioSessionControl2,
+                         EDataFlow, ERole, DEVICE_STATE)
+from pycaw.constants import AudioSessionState
+from pycaw.callbacks import (AudioEndpointVolumeCallback, MMNotificationClient,
+                             AudioSessionNotification, AudioSessionEvents)
+try:
+    from .tn_audio_backend import AudioBackend
+except ImportError:
+    from tn_audio_backend import AudioBackend
+
+CALL_TIMEOUT = 5.0   # с: дольше COM-поток не отвечает — считаем вызов неудачным
+_FLOWS = {"output": EDataFlow.eRender.value, "input": EDataFlow.eCapture.value}
+
+
+class IAudioMeterInformation(IUnknown):
+    """Пиковый индикатор устройства. В pycaw объявлен только GetPeakValue — без пиков по каналам."""
+    _iid_ = GUID("{C02216F6-8C67-4B5B-9D00-D008E73E0064}")
+    _methods_ = (
+        COMMETHOD([], HRESULT, "GetPeakValue", (["out"], POINTER(c_float), "pfPeak")),
+        COMMETHOD([], HRESULT, "GetMeteringChannelCount", (["out"], POINTER(c_uint), "pnChannelCount")),
+        COMMETHOD([], HRESULT, "GetChannelsPeakValues",
+                  (["in"], c_uint, "u32ChannelCount"), (["in"], POINTER(c_float), "afPeakValues")),
+    )
+
+
+class _VolumeEvents(AudioEndpointVolumeCallback):
+    """IAudioEndpointVolumeCallback: Windows сообщает mute/громкость устройства сам."""
+    def __init__(self, backend, device_name):
+        super().__init__()
+        self.backend = backend
+        self.device_name = device_name
+
+    def on_notify(self, new_volume, new_mute, event_context, channels, channel_volumes):
+        self.backend._notify(self.device_name, {"mute": bool(new_mute), "volume": int(round(new_volume * 100))})
+
+
+class _DeviceEvents(MMNotificationClient):
+    """
+    IMMNotificationClient: топология устройств изменилась — реестр сбрасывается в COM-потоке.
+    Смена устройства по умолчанию интерфейсы не меняет (default не кэшируется) —
+    только уведомляет подписчиков набора устройств.
+    """
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def on_device_added(self, added_device_id):
+        self.backend._post(self.backend._on_topology_changed)
+
+    def on_device_removed(self, removed_device_id):
+        self.backend._post(self.backend._on_topology_changed)
+
+    def on_device_state_changed(self, device_id, new_state, new_state_id):
+        self.backend._post(self.backend._on_topology_changed)
+
+    def on_default_device_changed(self, flow, flow_id, role, role_id, default_device_id):
+        # Приходит для каждой роли (console/multimedia/communications) — достаточно одной
+        if role_id == ERole.eMultimedia.value:
+            self.backend._post(self.backend._on_default_changed, flow_id)
+
+
+class _SessionCreated(AudioSessionNotification):
+    """IAudioSessionNotification: приложение открыло новую сессию на устройстве вывода."""
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def on_session_created(self, new_session):
+        self.backend._post(self.backend._add_session, new_session)
+
+
+class _SessionEvents(AudioSessionEvents):
+    """IAudioSessionEvents одной сессии: громкость/mute и завершение."""
+    def __init__(self, backend, session_id):
+        super().__init__()
+        self.backend = backend
+        self.session_id = session_id
+
+    def on_simple_volume_changed(self, new_volume, new_mute, event_context):
+        self.backend._post(self.backend._on_session_volume, self.session_id,
+                           int(round(new_volume * 100)), bool(new_mute))
+
+    def on_state_changed(self, new_state, new_state_id):
+        if new_state_id == AudioSessionState.Expired:
+            self.backend._post(self.backend._remove_session, self.session_id)
+
+    def on_session_disconnected(self, disconnect_reason, disconnect_reason_id):
+        self.backend._post(self.backend._remove_session, self.session_id)
+
+
+class EndpointRegistry:
+    """
+    Реестр устройств COM-потока: имя -> id -> IAudioEndpointVolume / IAudioMeterInformation.
+
+    Перечисление (с чтением FriendlyName из property store) — при первом
+    обращении и после смены топологии; Activate — один раз на устройство.
+    Mute, громкость и пики — вызовы закэшированных интерфейсов.
+    Используется только из COM-потока.
+    """
+    def __init__(self, enumerator):
+        self.enumerator = enumerator
+        self._ids = {}              # flow -> {name: device id}
+        self._endpoints = {}        # name -> IAudioEndpointVolume
+        self._meters = {}           # name -> (IAudioMeterInformation, число каналов)
+        self.stats = {"hits": 0, "activations": 0, "enumerations": 0, "invalidations": 0}
+
+    def device_ids(self, flow):
+        ids = self._ids.get(flow)
+        if ids is None:
+            ids = {}
+            collection = self.enumerator.EnumAudioEndpoints(_FLOWS[flow], DEVICE_STATE.ACTIVE.value)
+            for i in range(collection.GetCount()):
+                device = AudioUtilities.CreateDevice(collection.Item(i))
+                ids[device.FriendlyName] = device.id
+            self._ids[flow] = ids
+            self.stats["enumerations"] += 1
+        return ids
+
+    def device_id(self, device_name):
+        for flow in _FLOWS:
+            device_id = self.device_ids(flow).get(device_name)
+            if device_id:
+                return device_id
+        return None
+
+    def endpoint(self, device_name):
+        """IAudioEndpointVolume устройства или None (устройства нет среди активных)."""
+        endpoint = self._endpoints.get(device_name)
+        if endpoint is not None:
+            self.stats["hits"] += 1
+            return endpoint
+        device_id = self.device_id(device_name)
+        if device_id is None:
+            return None
+        device = self.enumerator.GetDevice(device_id)
+        interface = device.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+        endpoint = interface.QueryInterface(IAudioEndpointVolume)
+        self._endpoints[device_name] = endpoint
+        self.stats["activations"] += 1
+        return endpoint
+
+    def meter(self, device_name):
+        """(IAudioMeterInformation, число каналов) устройства или None."""
+        entry = self._meters.get(device_name)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return entry
+        device_id = self.device_id(device_name)
+        if device_id is None:
+            return None
+        device = self.enumerator.GetDevice(device_id)
+        meter = device.Activate(IAudioMeterInformation._iid_, CLSCTX_ALL, None).QueryInterface(IAudioMeterInformation)
+        entry = (meter, meter.GetMeteringChannelCount())
+        self._meters[device_name] = entry
+        self.stats["activations"] += 1
+        return entry
+
+    def default_name(self, flow):
+        try:
+            device = self.enumerator.GetDefaultAudioEndpoint(_FLOWS[flow], ERole.eMultimedia.value)
+        except Exception:
+            return None
+        device_id = device.GetId()
+        return next((name for name, i in self.device_ids(flow).items() if i == device_id), None)
+
+    def invalidate(self):
+        self._ids.clear()
+        self._endpoints.clear()
+        self._meters.clear()
+        self.stats["invalidations"] += 1
+
+
+class WindowsAudioBackend(AudioBackend):
+    """
+    Core Audio через pycaw.
+
+    Все COM-вызовы — в одном потоке (MTA, COM инициализируется один раз), вызовы
+    из других потоков ставятся в очередь. Имя -> id устройства и интерфейсы
+    IAudioEndpointVolume кэшируются в EndpointRegistry: поиск по имени — словарь,
+    без GetAllDevices() на каждый запрос. Изменения mute/громкости приходят колбэком
+    IAudioEndpointVolumeCallback, изменение набора устройств — IMMNotificationClient.
+    Сессии приложений — реестр IAudioSessionManager2 устройства вывода по умолчанию:
+    перечисляются один раз, дальше IAudioSessionNotification (создана) и
+    IAudioSessionEvents (громкость, завершена); смена default — реестр строится заново.
+    Пики для индикаторов — IAudioMeterInformation по каналам, один заход на тик.
+    """
+    name = "windows"
+
+    def __init__(self):
+        super().__init__()
+        self._calls = queue.Queue()
+        self._registry = None       # EndpointRegistry (создается в COM-потоке)
+        self._volume_events = {}    # name -> (IAudioEndpointVolume, _VolumeEvents)
+        self._enumerator = None
+        self._device_events = None
+        self._session_manager = None    # IAudioSessionManager2 (пока есть подписка на сессии)
+        self._session_created = None
+        self._sessions = {}             # id -> (AudioSession, _SessionEvents, info)
+        started = Future()
+        self._thread = threading.Thread(target=self._run, args=(started,), name="TnAudioCOM", daemon=True)
+        self._thread.start()
+        started.result(timeout=CALL_TIMEOUT)   # ошибка инициализации COM -> исключение в create_audio_backend
+
+    # --- COM-поток ---
+
+    def _run(self, started):
+        comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+        try:
+            try:
+                self._enumerator = AudioUtilities.GetDeviceEnumerator()
+                self._registry = EndpointRegistry(self._enumerator)
+                self._device_events = _DeviceEvents(self)
+                self._enumerator.RegisterEndpointNotificationCallback(self._device_events)
+            except Exception as e:
+                started.set_exception(e)
+                return
+            started.set_result(True)
+
+            while True:
+                item = self._calls.get()
+                if item is None:
+                    break
+                fn, args, future = item
+                try:
+                    result = fn(*args)
+                except Exception as e:
+                    if future is None:
+                        print(f"[TnAudio] {fn.__name__}: {e}")
+                    else:
+                        future.set_exception(e)
+                    continue
+                if future is not None:
+                    future.set_result(result)
+
+            for device_name in list(self._volume_events):
+                self._unregister(device_name)
+            self._stop_sessions()
+            try:
+                self._enumerator.UnregisterEndpointNotificationCallback(self._device_events)
+            except Exception:
+                pass
+            self._registry.invalidate()
+            self._enumerator = None
+        finally:
+            comtypes.CoUninitialize()
+
+    def _call(self, fn, *args, default=None):
+        """Выполнить fn в COM-потоке и дождаться результата."""
+        if threading.current_thread() is self._thread:
+            return fn(*args)
+        if not self._thread.is_alive():
+            return default
+        future = Future()
+        self._calls.put((fn, args, future))
+        try:
+            return future.result(timeout=CALL_TIMEOUT)
+        except Exception as e:
+            print(f"[TnAudio] {fn.__name__}: {e}")
+            return default
+
+    def _post(self, fn, *args):
+        """Без ожидания (из колбэков Windows: блокировать их нельзя)."""
+        self._calls.put((fn, args, None))
+
+    def _on_topology_changed(self):
+        self._registry.invalidate()
+        # Подписки переносятся на новые интерфейсы (устройство могли переподключить)
+        for device_name in list(self._volume_events):
+            self._unregister(device_name)
+            self._register(device_name)
+        self._notify_devices()
+
+    def _on_default_changed(self, flow_id):
+        # Сессии принадлежат устройству: новое устройство вывода по умолчанию — новый реестр
+        if flow_id == EDataFlow.eRender.value and self._session_manager is not None:
+            self._stop_sessions()
+            self._start_sessions()
+        self._notify_devices()
+
+    # --- Сессии приложений (COM-поток) ---
+
+    def _start_sessions(self):
+        if self._session_manager is not None:
+            return
+        manager = AudioUtilities.GetAudioSessionManager()
+        if manager is None:
+            return
+        self._session_created = _SessionCreated(self)
+        manager.RegisterSessionNotification(self._session_created)
+        self._session_manager = manager
+        # Перечисление обязательно: без него Windows не присылает OnSessionCreated
+        enumerator = manager.GetSessionEnumerator()
+        for i in range(enumerator.GetCount()):
+            control = enumerator.GetSession(i)
+            if control is not None:
+                self._add_session(AudioSession(control.QueryInterface(IAudioSessionControl2)))
+
+    def _stop_sessions(self):
+        for session_id in list(self._sessions):
+            self._remove_session(session_id)
+        if self._session_manager is not None:
+            try:
+                self._session_manager.UnregisterSessionNotification(self._session_created)
+            except Exception:
+                pass
+        self._session_manager = None
+        self._session_created = None
+
+    def _add_session(self, session):
+        try:
+            if session.State == AudioSessionState.Expired:
+                return
+            process = session.Process
+            if process is None:
+                return   # системные звуки (pid 0)
+            session_id = session.InstanceIdentifier
+            if session_id in self._sessions:
+                return
+            volume = session.SimpleAudioVolume
+            info = {
+                "id": session_id,
+                "app": process.name(),
+                "pid": session.ProcessId,
+                "volume": int(round(volume.GetMasterVolume() * 100)),
+                "mute": bool(volume.GetMute()),
+            }
+            events = _SessionEvents(self, session_id)
+            session.register_notification(events)
+        except Exception as e:
+            # Процесс успел завершиться / сессия уже закрыта
+            print(f"[TnAudio] Session skipped: {e}")
+            return
+        self._sessions[session_id] = (session, events, info)
+        self._notify_sessions("added", info)
+
+    def _remove_session(self, session_id):
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return
+        try:
+            entry[0].unregister_notification()
+        except Exception:
+            pass
+        self._notify_sessions("removed", {"id": session_id})
+
+    def _on_session_volume(self, session_id, volume, mute):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return
+        info = entry[2]
+        changes = {key: value for key, value in (("volume", volume), ("mute", mute)) if info[key] != value}
+        if changes:
+            info.update(changes)
+            self._notify_sessions("changed", {"id": session_id, **changes})
+
+    def _list_sessions(self):
+        self._start_sessions()
+        return [dict(info) for _, _, info in self._sessions.values()]
+
+    def _set_session(self, session_id, action):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return False
+        action(entry[0].SimpleAudioVolume)
+        return True
+
+    def _with_endpoint(self, device_name, action, default=None):
+        """action(endpoint); интерфейс устарел (устройство отключено до уведомления) — одна повторная попытка."""
+        for attempt in range(2):
+            endpoint = self._registry.endpoint(device_name)
+            if endpoint is None:
+                return default
+            try:
+                return action(endpoint)
+            except comtypes.COMError:
+                if attempt:
+                    raise
+                self._registry.invalidate()
+        return default
+
+    def _register(self, device_name):
+        endpoint = self._registry.endpoint(device_name)
+        if endpoint is None:
+            self._volume_events[device_name] = (None, None)   # появится — _on_topology_changed подпишет
+            return
+        events = _VolumeEvents(self, device_name)
+        try:
+            endpoint.RegisterControlChangeNotify(events)
+        except Exception as e:
+            # Драйвер не поддерживает уведомления — устройство уходит в общий опрос
+            print(f"[TnAudio] '{device_name}': no volume events ({e}), polling")
+            self._volume_events[device_name] = (None, None)
+            self._poll(device_name)
+            return
+        self._volume_events[device_name] = (endpoint, events)
+
+    def _unregister(self, device_name):
+        endpoint, events = self._volume_events.pop(device_name, (None, None))
+        if endpoint is not None:
+            try:
+                endpoint.UnregisterControlChangeNotify(events)
+            except Exception:
+                pass
+
+    def _list(self, flow):
+        names = list(self._registry.device_ids(flow))
+        default_name = self._registry.default_name(flow)
+        if default_name in names:
+            names.remove(default_name)
+            names.insert(0, default_name)
+        return names
+
+    def _status(self, device_name):
+        return self._with_endpoint(device_name, lambda endpoint: {
+            "mute": bool(endpoint.GetMute()),
+            "volume": int(round(endpoint.GetMasterVolumeLevelScalar() * 100)),
+        })
+
+    def _statuses(self, device_names):
+        statuses = {}
+        for device_name in device_names:
+            try:
+                statuses[device_name] = self._status(device_name)
+            except comtypes.COMError:
+                statuses[device_name] = None
+        return statuses
+
+    def _peaks(self, device_name):
+        entry = self._registry.meter(device_name)
+        if entry is None:
+            return None
+        meter, channels = entry
+        if channels <= 1:
+            return [meter.GetPeakValue()]
+        peaks = (c_float * channels)()
+        meter.GetChannelsPeakValues(channels, peaks)
+        return list(peaks)
+
+    def _levels(self, device_names):
+        levels = {}
+        for device_name in device_names:
+            try:
+                peaks = self._peaks(device_name)
+            except comtypes.COMError:
+                # Устройство отключено до уведомления — интерфейсы получим заново на следующем тике
+                self._registry.invalidate()
+                continue
+            if peaks is not None:
+                levels[device_name] = peaks
+        return levels
+
+    def _set_mute(self, device_name, mute):
+        return self._with_endpoint(device_name, lambda endpoint: endpoint.SetMute(1 if mute else 0, None) or True, False)
+
+    def _set_volume(self, device_name, volume):
+        level = max(0, min(100, volume)) / 100.0
+        return self._with_endpoint(device_name, lambda endpoint: endpoint.SetMasterVolumeLevelScalar(level, None) or True, False)
+
+    def _set_default(self, device_name):
+        from libs.audio_manager import policyconfig as pc
+        device_id = self._registry.device_ids("output").get(device_name)
+        if not device_id:
+            return False
+        policy_config = comtypes.CoCreateInstance(pc.CLSID_PolicyConfigClient, pc.IPolicyConfig, CLSCTX_ALL)
+        for role in (pc.ERole.eConsole, pc.ERole.eMultimedia, pc.ERole.eCommunications):
+            policy_config.SetDefaultEndpoint(device_id, role)
+        return True
+
+    # --- AudioBackend ---
+
+    def list_devices(self, flow):
+        return self._call(self._list, flow, default=[])
+
+    def default_device(self, flow):
+        return self._call(self._registry.default_name, flow)
+
+    def set_default_device(self, device_name):
+        return self._call(self._set_default, device_name, default=False)
+
+    def get_status(self, device_name):
+        return self._call(self._status, device_name)
+
+    def get_statuses(self, device_names):
+        """Все устройства тика опроса — один заход в COM-поток."""
+        return self._call(self._statuses, list(device_names), default={})
+
+    def get_levels(self, device_names):
+        """Пики всех индикаторов тика — один заход в COM-поток."""
+        return self._call(self._levels, list(device_names), default={})
+
+    def set_mute(self, device_name, mute):
+        return self._call(self._set_mute, device_name, mute, default=False)
+
+    def set_volume(self, device_name, volume):
+        return self._call(self._set_volume, device_name, volume, default=False)
+
+    def list_sessions(self):
+        return self._call(self._list_sessions, default=[])
+
+    def set_session_volume(self, session_id, volume):
+        level = max(0, min(100, volume)) / 100.0
+        return self._call(self._set_session, session_id,
+                          lambda simple: simple.SetMasterVolume(level, None), default=False)
+
+    def set_session_mute(self, session_id, mute):
+        return self._call(self._set_session, session_id,
+                          lambda simple: simple.SetMute(1 if mute else 0, None), default=False)
+
+    def _watch_sessions(self):
+        self._call(self._start_sessions)
+
+    def _unwatch_sessions(self):
+        self._call(self._stop_sessions)
+
+    def _watch(self, device_name):
+        self._call(self._register, device_name)
+
+    def _unwatch(self, device_name):
+        self._call(self._unregister, device_name)
+
+    def registry_stats(self):
+        """Счетчики реестра (для бенчмарка / диагностики)."""
+        return self._call(lambda: dict(self._registry.stats), default={})
+
+    def close(self):
+        super().close()
+        self._calls.put(None)
+        self._thread.join(timeout=CALL_TIMEOUT)
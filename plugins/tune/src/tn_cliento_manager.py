@@ -1,35 +1,84 @@
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, QTimer
 import os
+import math
+import time
 try:
     from .tn_cliento_service import TuneClientoService
+    from .tn_volume_stream import VolumeStreamer, DEFAULT_RATE_HZ
+    from .tn_level_stream import LEVELS_COMMAND, LEVELS_SUBSCRIBE_COMMAND, unpack_levels
 except (ImportError, ValueError):
     from tn_cliento_service import TuneClientoService
+    from tn_volume_stream import VolumeStreamer, DEFAULT_RATE_HZ
+    from tn_level_stream import LEVELS_COMMAND, LEVELS_SUBSCRIBE_COMMAND, unpack_levels
+
+SAVE_DELAY_MS = 1000  # патчи идут сериями (громкость) — конфиг на диск пишется после паузы
+ACTION_TIMEOUT_MS = 3000  # нет TUNE_ACTION_RESULT — оптимистичное состояние откатывается
+# Кнопки, результат которых показывается сразу: id -> ключ конфига (TUNE_ACTION)
+OPTIMISTIC_ACTIONS = {
+    "mic_mute_toolB": "input_devices_muted",
+    "sound_mute_toolB": "output_devices_muted",
+    "audiD_01_toolB": "selected_device",
+    "audiD_02_toolB": "selected_device",
+    "bt_audiD_toolB": "selected_device",
+}
 
 class TuneClientoManager(QObject):
-    """Уровень бизнес-логики для плагина Tune."""
+    """
+    Уровень бизнес-логики для плагина Tune.
+
+    self.config — конфиг сервера (на диск пишется только он). Сигналы отдают
+    view_config(): поверх него — ожидаемые значения действий, на которые сервер
+    еще не ответил (send_action).
+    """
     
     config_updated = Signal(dict)
+    config_patched = Signal(dict, list)  # (конфиг, изменившиеся ключи) — после TUNE_CONFIG_PATCH
     style_updated = Signal(str)
+    levels_received = Signal(list)       # [0-255] по LEVEL_CHANNELS — кадр TUNE_LEVELS
 
-    def __init__(self, socket_client, plugin_path):
+    def __init__(self, socket_client, plugin_path, styles=None):
         super().__init__()
         self.socket_client = socket_client
         self.plugin_path = plugin_path
+        self.styles = styles  # общий StyleRegistry клиента (может быть None)
         self.service = TuneClientoService()
         self.config = {}
         self.config_path = os.path.join(self.plugin_path, "config", "config_tune.json")
+        # Ревизия конфига сервера: патч применяется, только если base совпадает с нашей
+        self._session = None
+        self._rev = None
+        self._full_requested = False
+        self._streamers = {}  # (slider_id, app) -> VolumeStreamer
+        self._levels_enabled = False  # Tune на экране — сервер шлет уровни
+        self._actions = {}            # request_id -> действие без ответа (порядок отправки)
+        self._next_action = 0
+        self._action_timer = QTimer(self)
+        self._action_timer.setSingleShot(True)
+        self._action_timer.timeout.connect(self._expire_actions)
+
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self._save_config)
         
         # Подписка на сообщения от сервера
         if self.socket_client:
             self.socket_client.message_received.connect(self.on_server_message)
+            self.socket_client.connected.connect(self._on_connected)
+            self.socket_client.disconnected.connect(self._on_disconnected)
 
     def load_initial_data(self):
         """Загрузка начальных данных при запуске."""
         style_path = os.path.join(self.plugin_path, "config", "style_tune_material.json")
-        style_data = self.service.load_json_config(style_path)
-        if style_data:
-            css = self.service.json_to_css(style_data)
-            self.style_updated.emit(css)
+        if self.styles is not None:
+            css = self.styles.css(style_path, skip=())
+            if css:
+                self.style_updated.emit(css)
+        else:
+            style_data = self.service.load_json_config(style_path)
+            if style_data:
+                css = self.service.json_to_css(style_data)
+                self.style_updated.emit(css)
 
         # Первичная загрузка конфига плагина
         config_data = self.service.load_json_config(self.config_path)
@@ -37,26 +86,201 @@ class TuneClientoManager(QObject):
             self.config = config_data
             self.config_updated.emit(config_data)
 
+        # Конфиг на диске мог устареть, пока клиент был отключен
+        if self.socket_client and self.socket_client.is_connected():
+            self.request_full_config()
+
     def on_server_message(self, message):
         """Обработка входящих сообщений от сервера."""
         command = message.get("command")
         payload = message.get("data")
 
+        # Уровни — бинарный кадр без JSON-данных
+        if command == LEVELS_COMMAND:
+            levels = unpack_levels(message.get("binary"))
+            if levels is not None and self._levels_enabled:
+                self.levels_received.emit(levels)
+            return
+
         if not payload:
             return
 
         if command == "TUNE_CONFIG_UPDATE":
             self._handle_config_update(payload)
+        elif command == "TUNE_CONFIG_PATCH":
+            self._handle_config_patch(payload)
+        elif command == "TUNE_ACTION_RESULT":
+            self._handle_action_result(payload)
+        elif command == "TUNE_VOLUME_ACK":
+            streamer = self._streamers.get((payload.get("slider"), payload.get("app")))
+            if streamer is not None:
+                streamer.on_ack(payload)
+
+    def _on_connected(self):
+        """Новое соединение: прежний запрос (если был) мог потеряться вместе со старым."""
+        self._full_requested = False
+        self.request_full_config()
+        if self._levels_enabled:
+            self.socket_client.send_command(LEVELS_SUBSCRIBE_COMMAND, {"on": True})
+
+    def _on_disconnected(self):
+        """Ответы на отправленные действия не придут: откат к конфигу сервера."""
+        self._rollback_actions(list(self._actions), "disconnected")
+
+    def set_levels_enabled(self, enabled):
+        """Tune показан / скрыт: подписка на кадры уровней (TUNE_LEVELS_SUBSCRIBE)."""
+        enabled = bool(enabled)
+        if enabled == self._levels_enabled:
+            return
+        self._levels_enabled = enabled
+        if self.socket_client and self.socket_client.is_connected():
+            self.socket_client.send_command(LEVELS_SUBSCRIBE_COMMAND, {"on": enabled})
+
+    def request_full_config(self):
+        """Запросить полный конфиг (TUNE_CONFIG_REQUEST); повторно — только после ответа."""
+        if not self.socket_client or self._full_requested:
+            return
+        self._full_requested = True
+        self.socket_client.send_command("TUNE_CONFIG_REQUEST", {})
 
     def _handle_config_update(self, new_config):
         """Обновление локального конфига и уведомление UI."""
         if not isinstance(new_config, dict):
             return
 
+        new_config = dict(new_config)
+        self._session = new_config.pop("config_session", None)
+        self._rev = new_config.pop("config_rev", None)
+        self._full_requested = False
+
         self.config = new_config
         # Сохраняем актуальный конфиг на диск для клиента
+        self._save_timer.stop()
+        self._save_config()
+        self.config_updated.emit(self.view_config())
+
+    def _handle_config_patch(self, patch):
+        """Применить только изменившиеся поля; пропущен патч или сервер перезапущен — полный запрос."""
+        if not isinstance(patch, dict):
+            return
+        if patch.get("session") != self._session or patch.get("base") != self._rev:
+            self.request_full_config()
+            return
+
+        changes = patch.get("changes") or {}
+        removed = [key for key in patch.get("removed") or [] if key in self.config]
+        self.config.update(changes)
+        for key in removed:
+            del self.config[key]
+        self._rev = patch.get("rev")
+
+        self._save_timer.start()
+        self.config_patched.emit(self.view_config(), list(changes) + removed)
+
+    def view_config(self):
+        """Конфиг для UI: конфиг сервера + ожидаемые значения действий без ответа."""
+        view = dict(self.config)
+        for action in self._actions.values():
+            if action["value"] is not None:
+                view[action["key"]] = action["value"]
+        return view
+
+    # --- Оптимистичные действия ---
+
+    def send_action(self, button_id):
+        """
+        Mute и выбор устройства: ожидаемое состояние показывается сразу, на сервер
+        уходит TUNE_ACTION с request_id. TUNE_ACTION_RESULT сверяет его с итогом
+        сервера; отказ, нет ответа ACTION_TIMEOUT_MS или обрыв связи — откат.
+        Остальные кнопки — обычный PLUGIN_BUTTON_PRESS.
+        """
+        key = OPTIMISTIC_ACTIONS.get(button_id)
+        if key is None or not self.socket_client or not self.socket_client.is_connected():
+            self.send_button_press(button_id)
+            return
+
+        value = self._expected_value(button_id, key)
+        self._next_action += 1
+        request_id = self._next_action
+        sent = time.perf_counter()
+        payload = {"request_id": request_id, "button": button_id, "t": sent * 1000}
+        if isinstance(value, bool):
+            payload["mute"] = value
+        self._actions[request_id] = {"button": button_id, "key": key, "value": value, "sent": sent}
+        if value is not None:
+            self.config_patched.emit(self.view_config(), [key])
+        self.socket_client.send_command("TUNE_ACTION", payload)
+        self._schedule_action_timeout()
+
+    def _expected_value(self, button_id, key):
+        """Что покажет сервер после действия; None — не угадать (устройство недоступно)."""
+        view = self.view_config()
+        if key != "selected_device":
+            return not view.get(key, False)
+        if button_id == "bt_audiD_toolB":
+            device_name = view.get("selected_bt_device")
+        else:
+            devices = view.get("output_devices") or []
+            index = 0 if button_id == "audiD_01_toolB" else 1
+            device_name = devices[index] if index < len(devices) else None
+        # Недоступное устройство сервер не выберет — показывать нечего
+        return device_name if device_name and device_name in (view.get("active_devices") or []) else None
+
+    def _handle_action_result(self, result):
+        """Итог сервера: его значение становится основным, расхождение — откат в UI."""
+        action = self._actions.pop(result.get("request_id"), None)
+        if action is None:
+            return   # уже откатили по таймауту
+        # Патч с этими изменениями пришел раньше ответа; state — то же значение для сверки
+        state = result.get("state") or {}
+        self.config.update(state)
+        if state:
+            self._save_timer.start()
+
+        rtt_ms = (time.perf_counter() - action["sent"]) * 1000
+        status = "ok" if result.get("ok") else "rejected"
+        if action["value"] is not None and self.config.get(action["key"]) != action["value"]:
+            status += ", rolled back"
+        try:
+            apply_ms = float(result.get("apply_ms") or 0.0)
+        except (TypeError, ValueError):
+            apply_ms = 0.0
+        print(f"[Tn] Action {action['button']} #{result.get('request_id')}: {status}, "
+              f"tap->reply {rtt_ms:.1f} ms (server {apply_ms:.2f} ms)")
+        self.config_patched.emit(self.view_config(), list(dict.fromkeys([action["key"], *state])))
+        self._schedule_action_timeout()
+
+    def _expire_actions(self):
+        deadline = time.perf_counter() - ACTION_TIMEOUT_MS / 1000
+        expired = [request_id for request_id, action in self._actions.items() if action["sent"] <= deadline]
+        if expired:
+            self._rollback_actions(expired, f"no reply in {ACTION_TIMEOUT_MS} ms")
+            self.request_full_config()
+        self._schedule_action_timeout()
+
+    def _rollback_actions(self, request_ids, reason):
+        keys = []
+        for request_id in request_ids:
+            action = self._actions.pop(request_id, None)
+            if action is None:
+                continue
+            keys.append(action["key"])
+            print(f"[Tn] Action {action['button']} #{request_id}: {reason}, rolled back")
+        if keys:
+            self.config_patched.emit(self.view_config(), list(dict.fromkeys(keys)))
+        if not self._actions:
+            self._action_timer.stop()
+
+    def _schedule_action_timeout(self):
+        if not self._actions:
+            self._action_timer.stop()
+            return
+        oldest = next(iter(self._actions.values()))["sent"]
+        remaining_ms = ACTION_TIMEOUT_MS - (time.perf_counter() - oldest) * 1000
+        self._action_timer.start(max(0, math.ceil(remaining_ms)))
+
+    def _save_config(self):
         self.service.save_json_config(self.config_path, self.config)
-        self.config_updated.emit(self.config)
 
     def send_button_press(self, button_id):
         """Отправка команды нажатия кнопки на сервер."""
@@ -73,11 +297,28 @@ class TuneClientoManager(QObject):
                 }
                 self.socket_client.send_message(data)
 
-    def send_volume_change(self, slider_id, value):
-        """
-        Отправка изменения уровня громкости на сервер.
-        Используется составной ID (id|value), так как текущая реализация Core 
-        может терять payload при широковещательной рассылке или определенных событиях.
-        """
-        composite_id = f"{slider_id}|{value}"
-        self.send_button_press(composite_id)
+    def stream_volume(self, slider_id, value, app=None):
+        """Громкость во время перетаскивания: TUNE_VOLUME не чаще volume_stream_hz, последнее значение — всегда."""
+        self._streamer(slider_id, app).push(value)
+
+    def send_volume_change(self, slider_id, value, app=None):
+        """Итоговое значение громкости (слайдер отпущен / клик по шкале): сервер применяет и сохраняет конфиг."""
+        self._streamer(slider_id, app).finish(value)
+
+    def send_app_mute(self, app, mute):
+        """Mute приложения в микшере (громкость — stream_volume со слайдером other_volume_slider)."""
+        if self.socket_client and app:
+            self.socket_client.send_command("TUNE_APP_MUTE", {"app": app, "mute": bool(mute)})
+
+    def _streamer(self, slider_id, app=None):
+        streamer = self._streamers.get((slider_id, app))
+        if streamer is None:
+            extra = {"app": app} if app else None
+            streamer = VolumeStreamer(slider_id, self._send_volume, parent=self, extra=extra)
+            self._streamers[(slider_id, app)] = streamer
+        streamer.set_rate(self.config.get("volume_stream_hz", DEFAULT_RATE_HZ))
+        return streamer
+
+    def _send_volume(self, payload):
+        if self.socket_client:
+            self.socket_client.send_command("TUNE_VOLUME", payload)
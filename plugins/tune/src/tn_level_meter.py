@@ -0,0 +1,92 @@
+from PySide6.QtCore import Property, QTimer
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QWidget
+
+PEAK_HOLD_MS = 1000     # метка пика держится, потом опускается к текущему уровню
+PEAK_MARK_PX = 2
+
+
+class TnLevelMeter(QWidget):
+    """
+    Вертикальный индикатор уровня (0-255 из кадра TUNE_LEVELS) с меткой пика.
+
+    Рисуется сам (paintEvent: две заливки), без stylesheet на каждый кадр;
+    перерисовка — только если изменилась высота столбика или метки в пикселях.
+    Цвета — свойства barColor / peakColor / trackColor (в стиле: qproperty-barColor).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._level = 0
+        self._peak = 0
+        self._bar_color = QColor("#03DAC6")
+        self._peak_color = QColor("#FFFFFF")
+        self._track_color = QColor("#383838")
+        self._peak_timer = QTimer(self)
+        self._peak_timer.setSingleShot(True)
+        self._peak_timer.setInterval(PEAK_HOLD_MS)
+        self._peak_timer.timeout.connect(self._drop_peak)
+
+    def level(self):
+        return self._level
+
+    def setLevel(self, level):
+        level = max(0, min(255, int(level)))
+        before = (self._px(self._level), self._px(self._peak))
+        self._level = level
+        if level >= self._peak:
+            self._peak = level
+            self._peak_timer.start()
+        if (self._px(self._level), self._px(self._peak)) != before:
+            self.update()
+
+    def reset(self):
+        self._peak_timer.stop()
+        self._level = self._peak = 0
+        self.update()
+
+    def _drop_peak(self):
+        if self._px(self._peak) != self._px(self._level):
+            self._peak = self._level
+            self.update()
+        else:
+            self._peak = self._level
+
+    def _px(self, level):
+        return level * self.height() // 255
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = self.rect()
+        painter.fillRect(rect, self._track_color)
+        height = self._px(self._level)
+        if height:
+            painter.fillRect(0, rect.height() - height, rect.width(), height, self._bar_color)
+        peak = self._px(self._peak)
+        if peak > height:
+            painter.fillRect(0, rect.height() - peak, rect.width(), min(PEAK_MARK_PX, peak), self._peak_color)
+
+    def _get_bar_color(self):
+        return self._bar_color
+
+    def _set_bar_color(self, color):
+        self._bar_color = QColor(color)
+        self.update()
+
+    def _get_peak_color(self):
+        return self._peak_color
+
+    def _set_peak_color(self, color):
+        self._peak_color = QColor(color)
+        self.update()
+
+    def _get_track_color(self):
+        return self._track_color
+
+    def _set_track_color(self, color):
+        self._track_color = QColor(color)
+        self.update()
+
+    barColor = Property(QColor, _get_bar_color, _set_bar_color)
+    peakColor = Property(QColor, _get_peak_color, _set_peak_color)
+    trackColor = Property(QColor, _get_track_color, _set_track_color)
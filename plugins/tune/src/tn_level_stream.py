@@ -0,0 +1,183 @@
+import math
+import threading
+import time
+
+LEVELS_COMMAND = "TUNE_LEVELS"                      # бинарный кадр сервер -> клиент
+LEVELS_SUBSCRIBE_COMMAND = "TUNE_LEVELS_SUBSCRIBE"  # {"on": bool}: клиент показывает / скрыл Tune
+LEVEL_CHANNELS = ("sound_l", "sound_r", "mic")      # порядок байтов уровня в кадре
+DB_FLOOR = -60.0        # дБ: ниже — пустой индикатор
+
+DEFAULT_RATE_HZ = 20    # config_tune.json: "levels_hz"
+DEFAULT_MAX_KBPS = 16   # "levels_max_kbps": на всех клиентов вместе
+DEFAULT_CPU_SHARE = 0.05    # "levels_cpu_share": доля времени потока уровней на тик (выборка + отправка)
+COST_SMOOTHING = 0.2    # вес нового тика в скользящей стоимости
+
+
+def peak_to_level(peak):
+    """Пиковая амплитуда 0.0-1.0 -> байт 0-255 по шкале дБ (DB_FLOOR..0)."""
+    if not peak or peak <= 0:
+        return 0
+    db = 20.0 * math.log10(min(1.0, peak))
+    return max(0, min(255, int(round((db - DB_FLOOR) / -DB_FLOOR * 255))))
+
+
+def pack_levels(levels):
+    """Данные кадра TUNE_LEVELS: по байту на канал LEVEL_CHANNELS."""
+    return bytes(max(0, min(255, int(level))) for level in levels)
+
+
+def unpack_levels(payload):
+    """Байты кадра -> [0-255] по LEVEL_CHANNELS; неверная длина -> None."""
+    payload = bytes(payload or b"")
+    if len(payload) != len(LEVEL_CHANNELS):
+        return None
+    return list(payload)
+
+
+class LevelStreamer:
+    """
+    Индикаторы уровня Tune: выборка пиков с фиксированной частотой и рассылка
+    бинарных кадров (src/binary_frame.py) только подписанным клиентам.
+
+    sample() -> [peak 0.0-1.0] по LEVEL_CHANNELS; send(client_id, payload) -> размер
+    кадра в байтах (0 — клиента нет, подписка снимается). Уровень квантуется в байт
+    по дБ, кадр без изменений (тишина, пауза) не отправляется.
+
+    Выборка и отправка идут в своем потоке (TnLevels), не в GUI: sample и send должны
+    быть потокобезопасны. Бюджеты: интервал тика — не меньше 1 / rate_hz, не меньше
+    времени, при котором все клиенты вместе укладываются в max_kbps, и не меньше
+    стоимости тика / cpu_share. Нет подписчиков — поток завершается.
+    """
+
+    def __init__(self, sample, send, rate_hz=DEFAULT_RATE_HZ, max_kbps=DEFAULT_MAX_KBPS,
+                 cpu_share=DEFAULT_CPU_SHARE):
+        self._sample = sample
+        self._send = send
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._clients = set()
+        self._last = None               # уровни последнего отправленного кадра
+        self._frame_bytes = 0           # размер последнего кадра (для бюджета трафика)
+        self._cost = 0.0                # с: скользящая стоимость тика
+        self._stats = None
+        self._thread = None
+        self.configure(rate_hz, max_kbps, cpu_share)
+
+    def configure(self, rate_hz=DEFAULT_RATE_HZ, max_kbps=DEFAULT_MAX_KBPS, cpu_share=DEFAULT_CPU_SHARE):
+        self.rate_hz = _positive(rate_hz, DEFAULT_RATE_HZ)
+        self.max_kbps = _positive(max_kbps, DEFAULT_MAX_KBPS)
+        self.cpu_share = min(1.0, _positive(cpu_share, DEFAULT_CPU_SHARE))
+
+    def clients(self):
+        with self._lock:
+            return set(self._clients)
+
+    def subscribe(self, client_id):
+        if not client_id:
+            return
+        with self._lock:
+            self._clients.add(client_id)
+            self._last = None   # новый клиент получает текущие уровни сразу
+            if self._stats is None:
+                self._stats = {"started": time.perf_counter(), "ticks": 0, "frames": 0, "bytes": 0, "cost": 0.0}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="TnLevels", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def unsubscribe(self, client_id):
+        with self._lock:
+            self._clients.discard(client_id)
+            empty = not self._clients
+        if empty:
+            self.stop()
+
+    def stop(self):
+        """
+        Tune скрыт или клиентов не осталось: поток завершается после текущего тика
+        (без ожидания — выборка может висеть на вызове бэкенда), итог — в лог.
+        """
+        with self._lock:
+            self._clients.clear()
+            self._last = None
+            stats, self._stats = self._stats, None
+        self._wake.set()
+        if stats and stats["ticks"]:
+            print(f"[Tn] {_summary(stats)}")
+
+    def interval(self):
+        """с: текущий интервал тика с учетом бюджетов."""
+        interval = 1.0 / self.rate_hz
+        clients = len(self._clients)
+        if self._frame_bytes and clients:
+            interval = max(interval, self._frame_bytes * 8 * clients / (self.max_kbps * 1000))
+        return max(interval, self._cost / self.cpu_share)
+
+    def summary(self):
+        with self._lock:
+            return _summary(self._stats)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                clients = set(self._clients)
+                if not clients:
+                    self._thread = None
+                    return
+            self._tick(clients)
+            self._wake.wait(self.interval())
+            self._wake.clear()
+
+    def _tick(self, clients):
+        started = time.perf_counter()
+        try:
+            levels = [peak_to_level(peak) for peak in self._sample()]
+        except Exception as e:
+            print(f"[Tn] Levels sample: {e}")
+            levels = None
+        frames = sent = 0
+        if levels is not None and levels != self._last:
+            payload = pack_levels(levels)
+            for client_id in clients:
+                size = self._send(client_id, payload)
+                if not size:
+                    with self._lock:
+                        self._clients.discard(client_id)   # клиент отключился
+                    continue
+                self._frame_bytes = size
+                frames += 1
+                sent += size
+            self._last = levels
+        cost = time.perf_counter() - started
+        with self._lock:
+            stats = self._stats
+            if stats is None:
+                return  # остановлен во время тика
+            self._cost = cost if not stats["ticks"] else self._cost + COST_SMOOTHING * (cost - self._cost)
+            stats["ticks"] += 1
+            stats["frames"] += frames
+            stats["bytes"] += sent
+            stats["cost"] += cost
+            if not self._clients:
+                self._stats = None
+            else:
+                stats = None
+        if stats:
+            print(f"[Tn] {_summary(stats)}")   # все клиенты отключились
+
+
+def _summary(stats):
+    if not stats or not stats["ticks"]:
+        return "Levels: no ticks"
+    elapsed = max(1e-6, time.perf_counter() - stats["started"])
+    return (f"Levels: {stats['ticks']} ticks ({stats['ticks'] / elapsed:.1f} Hz), "
+            f"{stats['frames']} frames, {stats['bytes'] * 8 / elapsed / 1000:.2f} kbps, "
+            f"tick mean {stats['cost'] / stats['ticks'] * 1000:.2f} ms")
+
+
+def _positive(value, default):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
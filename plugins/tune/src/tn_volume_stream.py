@@ -0,0 +1,111 @@
+import math
+import time
+from PySide6.QtCore import QObject, QTimer
+
+DEFAULT_RATE_HZ = 30   # config_tune.json: "volume_stream_hz"
+
+
+class VolumeStreamer(QObject):
+    """
+    Громкость одного слайдера во время перетаскивания.
+
+    Значения уходят не чаще rate_hz в секунду; последнее значение серии
+    отправляется всегда (trailing edge): интервал еще не прошел — по таймеру.
+    finish() — отпускание слайдера: сразу отправляет итог с end=True
+    (сервер сохраняет конфиг только по нему).
+
+    Сообщение: {"slider", "value", "seq", "end", "t"} (+ extra, например {"app"}), где t — time.perf_counter()
+    клиента в мс. На итог сервер отвечает TUNE_VOLUME_ACK с тем же t и временем применения
+    apply_ms (промежуточные шаги без ответа) — on_ack() пишет в лог задержку перетаскивания.
+    """
+
+    def __init__(self, slider_id, send, rate_hz=DEFAULT_RATE_HZ, parent=None, extra=None):
+        super().__init__(parent)
+        self.slider_id = slider_id
+        self.extra = dict(extra or {})
+        self._send = send                # send(payload: dict)
+        self._seq = 0
+        self._pending = None
+        self._last_value = None
+        self._last_sent_at = 0.0
+        self._last_end = True            # предыдущее сообщение было итоговым -> следующее начинает перетаскивание
+        self._end_seq = None             # seq итогового сообщения текущего перетаскивания
+        self._stats = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+        self.set_rate(rate_hz)
+
+    def set_rate(self, rate_hz):
+        try:
+            rate_hz = float(rate_hz)
+        except (TypeError, ValueError):
+            rate_hz = DEFAULT_RATE_HZ
+        self._interval = 1.0 / max(1.0, rate_hz)
+
+    def push(self, value):
+        """Промежуточное значение (слайдер еще зажат)."""
+        self._pending = value
+        remaining = self._interval - (time.perf_counter() - self._last_sent_at)
+        if remaining <= 0:
+            self._timer.stop()
+            self._flush()
+        elif not self._timer.isActive():
+            self._timer.start(math.ceil(remaining * 1000))
+
+    def finish(self, value):
+        """Итоговое значение: отправляется сразу, промежуточное в ожидании отбрасывается."""
+        self._timer.stop()
+        self._pending = None
+        self._emit(value, end=True)
+
+    def on_ack(self, ack):
+        """Ответ на итог перетаскивания (TUNE_VOLUME_ACK с его seq)."""
+        if self._stats is None or self._end_seq is None or ack.get("seq") != self._end_seq:
+            return
+        try:
+            rtt_ms = time.perf_counter() * 1000 - float(ack["t"])
+            apply_ms = float(ack.get("apply_ms") or 0.0)
+        except (KeyError, TypeError, ValueError):
+            return
+        self._end_seq = None
+        self._stats["rtt"] = rtt_ms
+        self._stats["apply"] = apply_ms
+        print(f"[Tn] {self.summary()}")
+
+    def summary(self):
+        """Задержки последнего перетаскивания. drag -> change ≈ (rtt + apply) / 2: сеть туда — половина rtt."""
+        stats = self._stats
+        if not stats or stats["rtt"] is None:
+            return f"Volume stream {self.slider_id}: no ack"
+        rtt, apply_ms = stats["rtt"], stats["apply"]
+        return (f"Volume stream {self.slider_id}: {stats['sent']} sent, "
+                f"release->ack {rtt:.1f} ms, apply {apply_ms:.2f} ms, drag->change ~{(rtt + apply_ms) / 2:.1f} ms")
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        value, self._pending = self._pending, None
+        if value != self._last_value:
+            self._emit(value, end=False)
+
+    def _emit(self, value, end):
+        now = time.perf_counter()
+        if self._last_end:
+            self._end_seq = None
+            self._stats = {"sent": 0, "rtt": None, "apply": 0.0}
+        self._seq += 1
+        self._last_value = value
+        self._last_sent_at = now
+        self._last_end = end
+        self._stats["sent"] += 1
+        if end:
+            self._end_seq = self._seq
+        self._send({
+            **self.extra,
+            "slider": self.slider_id,
+            "value": int(value),
+            "seq": self._seq,
+            "end": end,
+            "t": now * 1000,
+        })
@@ -0,0 +1,107 @@
+"""
+Бенчмарк вызовов громкости/mute Tune (вызовов в секунду).
+
+Сравнивает:
+    legacy   — старый путь TnAudioManager (до реестра): на каждый вызов CoInitialize,
+               AudioUtilities.GetAllDevices(), поиск по FriendlyName, Activate
+               нового IAudioEndpointVolume, CoUninitialize. Только Windows;
+    registry — текущий путь: TnAudioManager -> бэкенд -> закэшированный интерфейс
+               (EndpointRegistry в COM-потоке на Windows).
+
+Громкость устройства после замера восстанавливается.
+
+Запуск из корня проекта:
+    python plugins/tune/tools/bench_audio_calls.py [--device "Speakers"] [--seconds 2] [--backend fake]
+"""
+import os
+import sys
+import argparse
+from time import perf_counter
+
+plugin_src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+project_root = os.path.dirname(os.path.dirname(plugin_src))
+for path in (project_root, os.path.join(plugin_src, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from tn_audio_backend import create_audio_backend
+from tn_audio_manager import TnAudioManager
+
+
+def legacy_call(device_name, action):
+    """Тело старых _get_device_volume / _set_device_volume / _is_device_muted."""
+    import pythoncom
+    from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+    from comtypes import CLSCTX_ALL
+    pythoncom.CoInitialize()
+    try:
+        for device in AudioUtilities.GetAllDevices():
+            if device.FriendlyName == device_name:
+                target = getattr(device, "_dev", None)
+                if target is None:
+                    target = getattr(device, "device", device)
+                interface = target.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+                return action(interface.QueryInterface(IAudioEndpointVolume))
+    finally:
+        pythoncom.CoUninitialize()
+    return None
+
+
+def measure(fn, seconds):
+    """Вызовов в секунду (не меньше 10 вызовов)."""
+    calls = 0
+    start = perf_counter()
+    while True:
+        fn(calls)
+        calls += 1
+        elapsed = perf_counter() - start
+        if elapsed >= seconds and calls >= 10:
+            return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", default=None, help="имя устройства вывода (по умолчанию — системное)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="длительность каждого замера")
+    parser.add_argument("--backend", default=None, help="windows | pulse | fake (по умолчанию — по платформе)")
+    args = parser.parse_args()
+
+    manager = TnAudioManager(create_audio_backend(args.backend))
+    devices = manager.refresh_output_devices()
+    device_name = args.device or (devices[0] if devices else None)
+    if not device_name:
+        print("[Bench] No output devices")
+        return
+    initial_volume = manager.get_device_volume(device_name)
+
+    cases = {
+        "get_volume": (lambda i: manager.get_device_volume(device_name),
+                       lambda endpoint: endpoint.GetMasterVolumeLevelScalar()),
+        "set_volume": (lambda i: manager.set_device_volume(device_name, initial_volume ^ (i & 1)),
+                       lambda endpoint: endpoint.SetMasterVolumeLevelScalar(initial_volume / 100.0, None)),
+        "is_muted": (lambda i: manager.is_sound_muted(device_name),
+                     lambda endpoint: endpoint.GetMute()),
+    }
+    legacy = sys.platform == "win32" and manager.backend.name == "windows"
+
+    print(f"[Bench] Backend: {manager.backend.name}, device: {device_name}, {args.seconds:.1f} s per case")
+    try:
+        for name, (registry_fn, legacy_action) in cases.items():
+            registry_rate = measure(registry_fn, args.seconds)
+            line = f"[Bench] {name:>10}: registry {registry_rate:9.0f}/s"
+            if legacy:
+                legacy_rate = measure(lambda i: legacy_call(device_name, legacy_action), args.seconds)
+                line += f", legacy {legacy_rate:7.0f}/s, speedup x{registry_rate / max(legacy_rate, 1e-9):.0f}"
+            print(line)
+        if not legacy:
+            print("[Bench] legacy path skipped (needs Windows and the windows backend)")
+        stats = getattr(manager.backend, "registry_stats", None)
+        if stats:
+            print(f"[Bench] registry: {stats()}")
+    finally:
+        manager.set_device_volume(device_name, initial_volume)
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,34 @@
 import os
+import copy
 import json
+import time
+import secrets
 import importlib.util
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QWidget, QToolButton
 try:
     from .src.tn_audio_manager import TnAudioManager
+    from .src.tn_level_stream import LevelStreamer, LEVELS_COMMAND, LEVELS_SUBSCRIBE_COMMAND
 except (ImportError, SystemError, ValueError):
     # Фоллбек на прямой импорт, если пакетная структура отличается
     from src.tn_audio_manager import TnAudioManager
-
-class TuneBanditoPlugin(QWidget):
+    from src.tn_level_stream import LevelStreamer, LEVELS_COMMAND, LEVELS_SUBSCRIBE_COMMAND
+from src.latency_histogram import LatencyHistogram
+from src.plugin_interface import ElPlugin
+
+DEVICES_DEBOUNCE_MS = 150
+VOLUME_STREAM_IDLE_MS = 1000  # TUNE_VOLUME без end (клиент отключился посреди перетаскивания) — сохраняем сами
+VOLUME_SLIDERS = {"sound_volume_slider": "sound", "mic_volume_slider": "mic", "other_volume_slider": "app"}
+# TUNE_ACTION: кнопка клиента -> ключ конфига, значение которого возвращается в TUNE_ACTION_RESULT
+CLIENT_ACTIONS = {
+    "mic_mute_toolB": "input_devices_muted",
+    "sound_mute_toolB": "output_devices_muted",
+    "audiD_01_toolB": "selected_device",
+    "audiD_02_toolB": "selected_device",
+    "bt_audiD_toolB": "selected_device",
+}
+
+class TuneBanditoPlugin(QWidget, ElPlugin):
     """Серверная логика плагина Tune."""
 
     def __init__(self, plugin_path, core=None):
@@ -17,6 +37,29 @@ class TuneBanditoPlugin(QWidget):
         self.core = core
         self.config_path = os.path.join(self.plugin_path, "config", "config_tune.json")
         self.audio_manager = TnAudioManager()
+        self._listeners_paused = False
+        # Что уже разослано клиентам: дальше уходят только изменившиеся поля (TUNE_CONFIG_PATCH)
+        self._config_session = secrets.token_hex(4)
+        self._config_rev = 0
+        self._sent_payload = None
+        # Подключение устройства — серия событий (added, state, default): перечисляем один раз
+        self._devices_timer = QTimer(self)
+        self._devices_timer.setSingleShot(True)
+        self._devices_timer.setInterval(DEVICES_DEBOUNCE_MS)
+        self._devices_timer.timeout.connect(self._on_devices_changed)
+        # Громкость с клиента во время перетаскивания: применяется сразу, на диск — по end
+        self._volume_streams = set()        # dev_type, для которых идет перетаскивание
+        self._volume_seq = {}               # (client_id, slider) -> последний примененный seq
+        self._config_dirty = False
+        self._stream_timer = QTimer(self)
+        self._stream_timer.setSingleShot(True)
+        self._stream_timer.setInterval(VOLUME_STREAM_IDLE_MS)
+        self._stream_timer.timeout.connect(self._finish_volume_streams)
+        self.volume_latency = LatencyHistogram("volume recv->apply")
+        self.action_latency = LatencyHistogram("action recv->reply")
+        # Индикаторы уровня: кадры только клиентам, у которых Tune на экране
+        self.levels = LevelStreamer(self._sample_levels, self._send_levels)
+        self._level_devices = (None, None)  # (вывод, микрофон) для потока уровней; пишется только в GUI-потоке
         
         # Изолированный импорт UI
         self.ui = self._load_ui()
@@ -26,9 +69,84 @@ class TuneBanditoPlugin(QWidget):
         self._apply_styles()
         self._connect_signals()
         self._log_output_devices_on_start()
+        self.audio_manager.start_device_watch(self._devices_timer.start)
+        self.audio_manager.start_app_mixer(self._on_apps_changed)
         # Отправляем актуальный конфиг клиентам при загрузке плагина
         self.broadcast_update()
 
+    # --- Жизненный цикл (см. src/plugin_interface.py) ---
+
+    def on_activate(self):
+        """Слот снова виден: перезапуск слушателей и досинхронизация пропущенных изменений."""
+        if not self._listeners_paused:
+            return
+        self._listeners_paused = False
+
+        # Пока слот был скрыт, набор устройств и приложений мог измениться
+        self.audio_manager.start_app_mixer(self._on_apps_changed)
+        self._on_devices_changed()
+        self.audio_manager.start_device_watch(self._devices_timer.start)
+
+        sound_device = self._current_output_device()
+        if sound_device:
+            self._on_sound_status_changed_external({
+                'mute': self.audio_manager.is_sound_muted(sound_device),
+                'volume': self.audio_manager.get_device_volume(sound_device)
+            })
+            self.audio_manager.start_sound_listening(sound_device, self._on_sound_status_changed_external)
+
+        mic_device = self._current_mic_device()
+        if mic_device:
+            self._on_mic_status_changed_external({
+                'mute': self.audio_manager.is_mic_muted(mic_device),
+                'volume': self.audio_manager.get_device_volume(mic_device)
+            })
+            self.audio_manager.start_mic_listening(mic_device, self._on_mic_status_changed_external)
+        print("[Tn] Status listeners resumed")
+
+    def on_deactivate(self):
+        """Слот скрыт: снимаем подписки на статус устройств (UI не обновляется), поток уровней — стоп."""
+        self.levels.stop()
+        if self._listeners_paused:
+            return
+        self._listeners_paused = True
+        self.audio_manager.stop_mic_listening()
+        self.audio_manager.stop_sound_listening()
+        self.audio_manager.stop_device_watch()
+        self.audio_manager.stop_app_mixer()
+        self._devices_timer.stop()
+        print("[Tn] Status listeners paused")
+
+    def on_suspend(self):
+        """Выгрузка плагина или уход приложения в фон."""
+        self.on_deactivate()
+        self._finish_volume_streams()
+        for histogram in (self.volume_latency, self.action_latency):
+            if histogram.count:
+                print(f"[Tn] {histogram.summary()}")
+        # Поток бэкенда и системные подписки освобождаются; on_resume создает бэкенд заново
+        self.audio_manager.close()
+
+    def on_resume(self):
+        """Возврат из фона: новый бэкенд; слушатели перезапустит on_activate (если слот активен)."""
+        self.audio_manager.open()
+
+    def _current_output_device(self):
+        """Имя устройства вывода, за которым следит плагин."""
+        device_name = self.config.get("selected_device")
+        if not device_name:
+            out_devices = self.audio_manager.get_cached_output_devices()
+            device_name = out_devices[0] if out_devices else None
+        return device_name
+
+    def _current_mic_device(self):
+        """Имя микрофона, за которым следит плагин."""
+        mic_name = self.config.get("selected_mic")
+        if not mic_name:
+            combo = getattr(self.ui, "mic_01_comboB", None)
+            mic_name = combo.currentText() if combo else None
+        return mic_name
+
     def _apply_styles(self):
         """Загрузка и применение стилей из JSON."""
         style_path = os.path.join(self.plugin_path, "config", "style_tune_material.json")
@@ -89,6 +207,27 @@ class TuneBanditoPlugin(QWidget):
         except Exception as e:
             print(f"[Tn] Audio devices init: {e}")
 
+    def _on_devices_changed(self):
+        """Набор устройств изменился (событие бэкенда): единственное место, где списки перечисляются заново."""
+        out_devices = self.audio_manager.refresh_output_devices()
+        in_devices = self.audio_manager.refresh_input_devices()
+        self._populate_output_device_combos(out_devices)
+        self._populate_bluetooth_combo(out_devices)
+
+        mic_combo = getattr(self.ui, "mic_01_comboB", None)
+        if in_devices and in_devices != self.config.get("input_devices"):
+            self.config["input_devices"] = in_devices
+            if mic_combo is not None:
+                mic_combo.blockSignals(True)
+                mic_combo.clear()
+                mic_combo.addItems(in_devices)
+                saved_mic = self.config.get("selected_mic")
+                if saved_mic in in_devices:
+                    mic_combo.setCurrentText(saved_mic)
+                mic_combo.blockSignals(False)
+            self._write_config_to_disk()
+        self.broadcast_update()
+
     def _populate_output_device_combos(self, devices: list[str]):
         """Заполнить основные комбобоксы списка аудиовыходов."""
         combo_names = ["audiD_01_comboB", "audiD_02_comboB"]
@@ -182,7 +321,7 @@ class TuneBanditoPlugin(QWidget):
         if not changed:
             return
 
-        self._write_config_to_disk()
+        self._write_config_unless_streaming()
 
         btn = getattr(self.ui, "test_mute_toolB", None)
         if btn and is_muted is not None:
@@ -207,7 +346,7 @@ class TuneBanditoPlugin(QWidget):
         if not changed:
             return
 
-        self._write_config_to_disk()
+        self._write_config_unless_streaming()
 
         btn = getattr(self.ui, "test_mute_sound_toolB", None)
         if btn and is_muted is not None:
@@ -233,9 +372,17 @@ class TuneBanditoPlugin(QWidget):
 
     def _write_config_to_disk(self):
         """Служебный метод: сохранить конфиг на диск без broadcast."""
+        self._config_dirty = False
         with open(self.config_path, 'w', encoding='utf-8') as f:
             json.dump(self.config, f, indent=4, ensure_ascii=False)
 
+    def _write_config_unless_streaming(self):
+        """Во время перетаскивания громкости запись откладывается до его конца."""
+        if self._volume_streams:
+            self._config_dirty = True
+        else:
+            self._write_config_to_disk()
+
     def _connect_signals(self):
         """Подключение сигналов интерфейса."""
         # Кнопка сохранения
@@ -296,16 +443,20 @@ class TuneBanditoPlugin(QWidget):
 
     def _toggle_mic_mute(self):
         """Переключить состояние мута выбранного микрофона."""
+        return self._set_mic_mute(None)
+
+    def _set_mic_mute(self, mute):
+        """Mute выбранного микрофона (None — переключить); True — состояние применено."""
         mic_name = self.config.get("selected_mic")
         if not mic_name:
             combo = getattr(self.ui, "mic_01_comboB", None)
             mic_name = combo.currentText() if combo else None
         
         if not mic_name:
-            return
+            return False
 
         is_muted = self.audio_manager.is_mic_muted(mic_name)
-        new_state = not is_muted
+        new_state = not is_muted if mute is None else bool(mute)
         if self.audio_manager.set_mute_mic(mic_name, new_state):
             # Сохраняем состояние в конфиг
             self.config["input_devices_muted"] = new_state
@@ -318,6 +469,8 @@ class TuneBanditoPlugin(QWidget):
             
             # Рассылаем обновление всем клиентам
             self.broadcast_update()
+            return True
+        return False
 
     def _on_output_combo_changed(self, slot_index: int, index: int):
         """Гарантировать, что в двух основных комбобоксах не выбрано одно и то же устройство."""
@@ -371,14 +524,14 @@ class TuneBanditoPlugin(QWidget):
             self.config["selected_mic"] = mic_combo.currentText()
 
     def _apply_selected_device_to_system(self):
-        """Применить выбранное в конфиге устройство как системное по умолчанию."""
+        """Применить выбранное в конфиге устройство как системное по умолчанию; True — переключено."""
         if not isinstance(getattr(self, "config", None), dict):
-            return
+            return False
 
         selected = self.config.get("selected_device") or ""
         if not selected:
             print("[Tn] No selected_device")
-            return
+            return False
 
         ok = self.audio_manager.set_default_output_device(selected)
         if ok:
@@ -396,6 +549,7 @@ class TuneBanditoPlugin(QWidget):
             self.audio_manager.start_sound_listening(selected, self._on_sound_status_changed_external)
         else:
             print(f"[Tn] Failed: {selected}")
+        return ok
 
     def handle_button_press(self, btn_id, payload=None):
         """Обязательный метод для обработки событий от клиента (PLUGIN_BUTTON_PRESS)."""
@@ -439,8 +593,8 @@ class TuneBanditoPlugin(QWidget):
         elif btn_id in ["sound_mute_toolB", "test_mute_sound_toolB"]:
             self._toggle_sound_mute()
 
-    def _set_volume_from_client(self, dev_type: str, value: int):
-        """Применить новое значение громкости с клиента."""
+    def _set_volume_from_client(self, dev_type: str, value: int, persist: bool = True):
+        """Применить новое значение громкости с клиента (persist=False — шаг перетаскивания, без записи на диск)."""
         if value is None: 
             return
         
@@ -466,23 +620,90 @@ class TuneBanditoPlugin(QWidget):
             devices = cfg["get_devs"]()
             device_name = devices[0] if devices else None
         
-        if device_name and self.audio_manager.set_device_volume(device_name, value):
+        if not device_name:
+            return
+        if not persist:
+            # До set_device_volume: колбэк статуса бэкенда может прийти синхронно
+            self._volume_streams.add(dev_type)
+            self._stream_timer.start()
+        if self.audio_manager.set_device_volume(device_name, value):
             self.config[cfg["vol_key"]] = value
-            self._write_config_to_disk()
-            self.broadcast_update()
+        if persist:
+            self._volume_streams.discard(dev_type)
+            if not self._volume_streams:
+                self._stream_timer.stop()
+            self._write_config_unless_streaming()
+        self.broadcast_update()
+
+    def _on_volume_stream(self, payload, client_id):
+        """
+        TUNE_VOLUME {"slider", "value", "seq", "end", "t"}: шаг перетаскивания
+        применяется сразу, конфиг сохраняется по end. На end отправителю уходит
+        TUNE_VOLUME_ACK с его t (задержку считает клиент) и apply_ms; шаги без ответа.
+        """
+        received = time.perf_counter()
+        slider = payload.get("slider")
+        dev_type = VOLUME_SLIDERS.get(slider)
+        try:
+            value = max(0, min(100, int(payload.get("value"))))
+            seq = int(payload.get("seq", 0))
+        except (TypeError, ValueError):
+            return
+        if dev_type is None:
+            return
+        end = bool(payload.get("end"))
+
+        # Устаревший шаг (обогнан более новым) не откатывает громкость назад
+        app = payload.get("app")
+        key = (client_id, slider, app)
+        if seq <= self._volume_seq.get(key, 0):
+            return
+        if end:
+            self._volume_seq.pop(key, None)
+        else:
+            self._volume_seq[key] = seq
+
+        if dev_type == "app":
+            # Громкость приложения хранит сама система — в конфиг не пишется
+            self.audio_manager.set_app_volume(app, value)
+        else:
+            self._set_volume_from_client(dev_type, value, persist=end)
+        apply_ms = (time.perf_counter() - received) * 1000
+        self.volume_latency.record(apply_ms)
+        if end and client_id and self.core and self.core.com:
+            self.core.com.send_to(client_id, "TUNE_VOLUME_ACK", {
+                "slider": slider, "app": app, "seq": seq, "t": payload.get("t"), "apply_ms": round(apply_ms, 3),
+            })
+
+    def _on_apps_changed(self, changed: dict, removed: list):
+        """Микшер: сессии приложений изменились — уходит патч с ключом "apps"."""
+        self.broadcast_update()
+
+    def _finish_volume_streams(self):
+        """Перетаскивание не завершилось сообщением end — сохраняем то, что применено."""
+        self._stream_timer.stop()
+        self._volume_seq.clear()
+        if not self._volume_streams and not self._config_dirty:
+            return
+        self._volume_streams.clear()
+        self._write_config_to_disk()
 
     def _toggle_sound_mute(self):
         """Переключить состояние мута выбранного устройства вывода."""
+        return self._set_sound_mute(None)
+
+    def _set_sound_mute(self, mute):
+        """Mute выбранного устройства вывода (None — переключить); True — состояние применено."""
         device_name = self.config.get("selected_device")
         if not device_name:
             out_devices = self.audio_manager.get_cached_output_devices()
             device_name = out_devices[0] if out_devices else None
         
         if not device_name:
-            return
+            return False
 
         is_muted = self.audio_manager.is_sound_muted(device_name)
-        new_state = not is_muted
+        new_state = not is_muted if mute is None else bool(mute)
         if self.audio_manager.set_mute_sound(device_name, new_state):
             self.config["output_devices_muted"] = new_state
             self._write_config_to_disk()
@@ -492,27 +713,26 @@ class TuneBanditoPlugin(QWidget):
                 btn.setText("Muted" if new_state else "Sound")
             
             self.broadcast_update()
+            return True
+        return False
 
     def _select_bt_device(self):
         """Выбрать сохраненное BT устройство, применить и разослать."""
         if not isinstance(getattr(self, "config", None), dict):
-            return
+            return False
             
         selected = self.config.get("selected_bt_device")
         if not selected:
             print("[Tn] No BT device selected in config")
-            return
+            return False
             
-        # Проверка доступности устройства перед переключением
-        active_devices = self.audio_manager.refresh_output_devices()
+        # Проверка доступности устройства перед переключением (кэш обновляется по событиям бэкенда)
+        active_devices = self.audio_manager.get_cached_output_devices()
         if selected not in active_devices:
             print(f"[Tn] BT Device '{selected}' is offline. Switching cancelled.")
-            return
+            return False
 
-        self.config["selected_device"] = selected
-        self._write_config_to_disk()
-        self._apply_selected_device_to_system()
-        self.broadcast_update()
+        return self._switch_output_device(selected)
 
     def _select_device_by_index(self, index: int):
         """Выбрать устройство по индексу в config['output_devices'], применить и разослать."""
@@ -522,29 +742,170 @@ class TuneBanditoPlugin(QWidget):
         devices = self.config.get("output_devices") or []
         if not devices or index < 0 or index >= len(devices):
             print(f"[Tn] No device @{index}")
-            return
+            return False
 
         selected = devices[index]
         
-        # Проверка доступности устройства перед переключением
-        active_devices = self.audio_manager.refresh_output_devices()
+        # Проверка доступности устройства перед переключением (кэш обновляется по событиям бэкенда)
+        active_devices = self.audio_manager.get_cached_output_devices()
         if selected not in active_devices:
             print(f"[Tn] Device '{selected}' is offline. Switching cancelled.")
-            return
+            return False
+
+        return self._switch_output_device(selected)
 
+    def _switch_output_device(self, selected):
+        """Сделать selected устройством вывода; система не переключилась — выбор в конфиге прежний."""
+        previous = self.config.get("selected_device")
         self.config["selected_device"] = selected
+        if not self._apply_selected_device_to_system():
+            self.config["selected_device"] = previous
+            return False
         self._write_config_to_disk()
-        self._apply_selected_device_to_system()
         self.broadcast_update()
+        return True
+
+    def handle_client_command(self, command, payload, client_id):
+        """
+        TUNE_VOLUME — громкость со слайдера клиента (см. _on_volume_stream);
+        TUNE_APP_MUTE {"app", "mute"} — mute приложения из микшера;
+        TUNE_LEVELS_SUBSCRIBE {"on"} — клиент показал / скрыл Tune (кадры уровней);
+        TUNE_ACTION {"request_id", "button", "mute"?, "t"} — mute / выбор устройства,
+        который клиент уже показал (см. _on_action);
+        TUNE_CONFIG_REQUEST — клиенту нужен полный конфиг (подключился или пропустил патч).
+        """
+        if command == "TUNE_VOLUME" and isinstance(payload, dict):
+            self._on_volume_stream(payload, client_id)
+            return
+        if command == "TUNE_ACTION" and isinstance(payload, dict):
+            self._on_action(payload, client_id)
+            return
+        if command == LEVELS_SUBSCRIBE_COMMAND and isinstance(payload, dict):
+            self._on_levels_subscribe(client_id, bool(payload.get("on")))
+            return
+        if command == "TUNE_APP_MUTE" and isinstance(payload, dict):
+            self.audio_manager.set_app_mute(payload.get("app"), bool(payload.get("mute")))
+            return
+        if command != "TUNE_CONFIG_REQUEST" or not client_id:
+            return
+        if not self.core or not self.core.com:
+            return
+        if self._sent_payload is None:
+            self.broadcast_update()
+            return
+        self.core.com.send_to(client_id, "TUNE_CONFIG_UPDATE", self._full_update())
+
+    def _on_action(self, payload, client_id):
+        """
+        Действие, которое клиент уже применил у себя (оптимистично). Выполняется как
+        PLUGIN_BUTTON_PRESS, но mute — явное целевое значение, а не переключение
+        (двойной тап не расходится с клиентом). Изменения уходят всем обычным патчем,
+        затем отправителю — TUNE_ACTION_RESULT {"request_id", "ok", "state", "t", "apply_ms"}:
+        state — итоговое значение ключа на сервере, по нему клиент сверяется или откатывается.
+        """
+        started = time.perf_counter()
+        button = payload.get("button")
+        key = CLIENT_ACTIONS.get(button)
+        ok = False
+        if key is not None:
+            try:
+                if button == "mic_mute_toolB":
+                    ok = self._set_mic_mute(payload.get("mute"))
+                elif button == "sound_mute_toolB":
+                    ok = self._set_sound_mute(payload.get("mute"))
+                elif button == "bt_audiD_toolB":
+                    ok = self._select_bt_device()
+                else:
+                    ok = self._select_device_by_index(0 if button == "audiD_01_toolB" else 1)
+            except Exception as e:
+                print(f"[Tn] Action {button}: {e}")
+        apply_ms = (time.perf_counter() - started) * 1000
+        self.action_latency.record(apply_ms)
+        if not self.core or not self.core.com or not client_id:
+            return
+        self.core.com.send_to(client_id, "TUNE_ACTION_RESULT", {
+            "request_id": payload.get("request_id"),
+            "ok": bool(ok),
+            "state": {key: self.config.get(key)} if key else {},
+            "t": payload.get("t"),
+            "apply_ms": round(apply_ms, 3),
+        })
+
+    def _on_levels_subscribe(self, client_id, on):
+        if not on:
+            self.levels.unsubscribe(client_id)
+            return
+        if not self.core or not self.core.com or not client_id:
+            return
+        self._refresh_level_devices()
+        self.levels.configure(
+            self.config.get("levels_hz"),
+            self.config.get("levels_max_kbps"),
+            self.config.get("levels_cpu_share"),
+        )
+        self.levels.subscribe(client_id)
+
+    def _refresh_level_devices(self):
+        """Устройства индикаторов: конфиг и комбобокс читаются здесь, в GUI-потоке."""
+        self._level_devices = (self._current_output_device(), self._current_mic_device())
+
+    def _sample_levels(self):
+        """
+        Пики в порядке LEVEL_CHANNELS: вывод L/R (моно — в оба), микрофон — максимум каналов.
+        Вызывается из потока LevelStreamer, не из GUI: устройства — из _level_devices.
+        """
+        sound_device, mic_device = self._level_devices
+        levels = self.audio_manager.get_levels([sound_device, mic_device])
+        sound = levels.get(sound_device) or [0.0]
+        mic = levels.get(mic_device) or [0.0]
+        return [sound[0], sound[1] if len(sound) > 1 else sound[0], max(mic)]
+
+    def _send_levels(self, client_id, payload):
+        return self.core.com.send_binary(client_id, LEVELS_COMMAND, None, payload)
+
+    def _client_payload(self):
+        """Конфиг для клиента + активные устройства и приложения микшера (из кэшей, без перечисления)."""
+        payload = copy.deepcopy(self.config)
+        payload["active_devices"] = self.audio_manager.get_cached_output_devices()
+        payload["apps"] = self.audio_manager.get_apps()
+        return payload
+
+    def _full_update(self):
+        """Полный конфиг последней ревизии с метками для проверки патчей на клиенте."""
+        full = copy.deepcopy(self._sent_payload)
+        full["config_session"] = self._config_session
+        full["config_rev"] = self._config_rev
+        return full
 
     def broadcast_update(self):
-        """Рассылка обновлений всем подключенным клиентам через Core."""
+        """
+        Рассылка обновлений всем подключенным клиентам через Core.
+        Первый раз — полный TUNE_CONFIG_UPDATE, дальше — TUNE_CONFIG_PATCH только
+        с изменившимися полями; ничего не изменилось — ничего не отправляется.
+        """
+        self._refresh_level_devices()   # все изменения устройств проходят через рассылку
         if not self.core or not self.core.com:
             return
         try:
-            # Добавляем список реально активных устройств в payload для клиента
-            payload = self.config.copy()
-            payload["active_devices"] = self.audio_manager.refresh_output_devices()
-            self.core.com.broadcast("TUNE_CONFIG_UPDATE", payload)
+            payload = self._client_payload()
+            sent = self._sent_payload
+            self._sent_payload = payload
+            if sent is None:
+                self._config_rev += 1
+                self.core.com.broadcast("TUNE_CONFIG_UPDATE", self._full_update())
+                return
+
+            changes = {key: value for key, value in payload.items() if key not in sent or sent[key] != value}
+            removed = [key for key in sent if key not in payload]
+            if not changes and not removed:
+                return
+            self._config_rev += 1
+            self.core.com.broadcast("TUNE_CONFIG_PATCH", {
+                "session": self._config_session,
+                "base": self._config_rev - 1,
+                "rev": self._config_rev,
+                "changes": changes,
+                "removed": removed,
+            })
         except Exception as e:
             print(f"[Tn] Broadcast: {e}")
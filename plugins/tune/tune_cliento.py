@@ -3,8 +3,10 @@ from PySide6.QtWidgets import QWidget
 from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve
 try:
     from src.tn_cliento_manager import TuneClientoManager
+    from src.tn_level_meter import TnLevelMeter
 except (ImportError, ValueError):
     from .src.tn_cliento_manager import TuneClientoManager
+    from .src.tn_level_meter import TnLevelMeter
 
 # Импорт UI
 try:
@@ -12,100 +14,161 @@ try:
 except ImportError:
     from .resources.ui_done.ui_tune_cliento import Ui_tune_cliento
 
+# Ключ конфига -> метод, обновляющий зависящие от него виджеты
+CONFIG_APPLIERS = {
+    "output_devices": "_apply_devices",
+    "active_devices": "_apply_devices",
+    "selected_device": "_apply_devices",
+    "selected_bt_device": "_apply_devices",
+    "selected_mic": "_apply_mic_line",
+    "input_devices_muted": "_apply_mic_mute",
+    "output_devices_muted": "_apply_sound_mute",
+    "output_devices_volume": "_apply_sound_volume",
+    "input_devices_volume": "_apply_mic_volume",
+    "apps": "_apply_app_strip",
+}
+
+# Индикаторы уровня в порядке LEVEL_CHANNELS кадра TUNE_LEVELS (src/tn_level_stream.py)
+LEVEL_METERS = ("sound_level_01_pBar", "sound_level_02_pBar", "mic_level_pBar")
+
 
 class TuneClientoPlugin(QWidget, Ui_tune_cliento):
     """Виджет управления звуком с применением стилей и анимаций."""
 
-    def __init__(self, socket_client, plugin_path):
+    def __init__(self, socket_client, plugin_path, services=None):
         super().__init__()
         self.plugin_path = plugin_path
         self.setupUi(self)
+        # Микшер приложений — колонка "other": выбранное приложение (на клиенте) и статусы с сервера
+        self._apps = {}
+        self._selected_app = None
+        # Индикаторы рисуются сами — до применения стилей, чтобы получить qproperty-цвета
+        self._level_meters = self._install_level_meters()
         
-        # Инициализация менеджера
-        self.manager = TuneClientoManager(socket_client, plugin_path)
+        # Инициализация менеджера (стили — через общий реестр клиента, если он передан)
+        styles = services.styles if services is not None else None
+        self.manager = TuneClientoManager(socket_client, plugin_path, styles=styles)
         self.manager.style_updated.connect(self.apply_style)
         self.manager.config_updated.connect(self.apply_config)
+        self.manager.config_patched.connect(self.apply_config_patch)
+        self.manager.levels_received.connect(self._apply_levels)
         
         # Загрузка начальных данных и стилей
         self.manager.load_initial_data()
         
         # Установка фильтра событий для анимаций кнопок
         self.install_event_filter_on_buttons()
+        # Нажатие на подпись колонки "other" — следующее приложение
+        if hasattr(self, "other_lable"):
+            self.other_lable.installEventFilter(self)
+
+        # Подключение слайдеров: во время перетаскивания громкость идет потоком
+        # (VolumeStreamer, ~30 Гц), отпускание — итоговое значение
+        for slider_id in ("sound_volume_slider", "mic_volume_slider", "other_volume_slider"):
+            slider = getattr(self, slider_id, None)
+            if slider is None:
+                continue
+            slider.valueChanged.connect(lambda value, s=slider_id: self._on_slider_value_changed(s, value))
+            slider.sliderReleased.connect(lambda s=slider_id: self._on_slider_released(s))
+
+    # --- Жизненный цикл (см. src/plugin_interface.py) ---
+
+    def on_activate(self):
+        """Tune на экране: сервер начинает слать уровни."""
+        self.manager.set_levels_enabled(True)
+
+    def on_deactivate(self):
+        """Tune скрыт: поток уровней останавливается, индикаторы гаснут."""
+        self.manager.set_levels_enabled(False)
+        for meter in self._level_meters:
+            if meter is not None:
+                meter.reset()
+
+    def on_suspend(self):
+        self.on_deactivate()
+
+    def _install_level_meters(self):
+        """QProgressBar уровней из .ui -> TnLevelMeter (тот же objectName, размеры и место в layout)."""
+        meters = []
+        for bar_name in LEVEL_METERS:
+            bar = getattr(self, bar_name, None)
+            layout = bar.parentWidget().layout() if bar is not None else None
+            if layout is None:
+                meters.append(None)
+                continue
+            meter = TnLevelMeter(bar.parentWidget())
+            meter.setObjectName(bar_name)
+            meter.setSizePolicy(bar.sizePolicy())
+            meter.setMinimumSize(bar.minimumSize())
+            meter.setMaximumSize(bar.maximumSize())
+            layout.replaceWidget(bar, meter)
+            bar.hide()
+            bar.deleteLater()
+            setattr(self, bar_name, meter)
+            meters.append(meter)
+        return meters
+
+    def _apply_levels(self, levels):
+        for meter, level in zip(self._level_meters, levels):
+            if meter is not None:
+                meter.setLevel(level)
 
-        # Подключение слайдеров
-        if hasattr(self, "sound_volume_slider"):
-            # Используем sliderMoved для мгновенного отклика (если сервер справится)
-            # или оставляем sliderReleased для надежности
-            self.sound_volume_slider.sliderReleased.connect(self._on_sound_slider_released)
-        if hasattr(self, "mic_volume_slider"):
-            self.mic_volume_slider.sliderReleased.connect(self._on_mic_slider_released)
+    def _slider_app(self, slider_id):
+        """Слайдер "other" управляет выбранным приложением; без приложения — не отправляется."""
+        if slider_id != "other_volume_slider":
+            return None, True
+        return self._selected_app, self._selected_app is not None
 
-    def _on_sound_slider_released(self):
-        """Отправка нового значения громкости звука на сервер."""
-        val = self.sound_volume_slider.value()
-        self.manager.send_volume_change("sound_volume_slider", val)
+    def _on_slider_value_changed(self, slider_id, value):
+        """Перетаскивание — поток значений; клик по шкале или клавиши — сразу итог."""
+        app, enabled = self._slider_app(slider_id)
+        if not enabled:
+            return
+        if getattr(self, slider_id).isSliderDown():
+            self.manager.stream_volume(slider_id, value, app=app)
+        else:
+            self.manager.send_volume_change(slider_id, value, app=app)
 
-    def _on_mic_slider_released(self):
-        """Отправка нового значения громкости микрофона на сервер."""
-        val = self.mic_volume_slider.value()
-        self.manager.send_volume_change("mic_volume_slider", val)
+    def _on_slider_released(self, slider_id):
+        """Отправка итогового значения громкости на сервер."""
+        app, enabled = self._slider_app(slider_id)
+        if enabled:
+            self.manager.send_volume_change(slider_id, getattr(self, slider_id).value(), app=app)
 
     def apply_style(self, css):
         """Применение CSS стиля к виджету."""
         self.setStyleSheet(css)
 
     def apply_config(self, config: dict):
-        """Применение конфигурации аудиоустройств к UI."""
+        """Применение конфигурации аудиоустройств к UI (полный конфиг)."""
+        for applier in set(CONFIG_APPLIERS.values()):
+            getattr(self, applier)(config)
+
+    def apply_config_patch(self, config: dict, keys: list):
+        """Патч с сервера: обновляются только виджеты изменившихся ключей."""
+        appliers = {CONFIG_APPLIERS[key] for key in keys if key in CONFIG_APPLIERS}
+        for applier in appliers:
+            getattr(self, applier)(config)
+
+    @staticmethod
+    def _set_dynamic_property(widget, name, value):
+        """Dynamic property для CSS; перерисовка стиля — только если значение изменилось."""
+        if widget.property(name) == value:
+            return
+        widget.setProperty(name, value)
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+        widget.update()
+
+    def _apply_devices(self, config: dict):
+        """Строки устройств вывода: имена, доступность и подсветка выбранного."""
         devices = config.get("output_devices") or []
         active_devices = config.get("active_devices") or []
 
         first = devices[0] if len(devices) > 0 else ""
         second = devices[1] if len(devices) > 1 else ""
         bt_device = config.get("selected_bt_device") or ""
-
-        self.audiD_01_lineE.setText(first)
-        self.audiD_02_lineE.setText(second)
-        self.bt_audiD_lineE.setText(bt_device)
-        self.mic_01_lineE.setText(config.get("selected_mic") or "")
-
-        # Обновление кнопки мута микрофона на клиенте
-        is_mic_muted = config.get("input_devices_muted", False)
-        mic_mute_btn = getattr(self, "mic_mute_toolB", None)
-        if mic_mute_btn:
-            mic_mute_btn.blockSignals(True)
-            mic_mute_btn.setChecked(is_mic_muted)
-            mic_mute_btn.setText("Muted" if is_mic_muted else "Mute")
-            mic_mute_btn.setProperty("isMuted", is_mic_muted)
-            mic_mute_btn.style().unpolish(mic_mute_btn)
-            mic_mute_btn.style().polish(mic_mute_btn)
-            mic_mute_btn.update()
-            mic_mute_btn.blockSignals(False)
-
-        # Обновление кнопки мута звука на клиенте
-        is_sound_muted = config.get("output_devices_muted", False)
-        sound_mute_btn = getattr(self, "sound_mute_toolB", None)
-        if sound_mute_btn:
-            sound_mute_btn.blockSignals(True)
-            sound_mute_btn.setChecked(is_sound_muted)
-            sound_mute_btn.setText("Muted" if is_sound_muted else "Sound")
-            sound_mute_btn.setProperty("isMuted", is_sound_muted)
-            sound_mute_btn.style().unpolish(sound_mute_btn)
-            sound_mute_btn.style().polish(sound_mute_btn)
-            sound_mute_btn.update()
-            sound_mute_btn.blockSignals(False)
-
-        # Обновление слайдеров громкости
-        sound_vol = config.get("output_devices_volume")
-        if sound_vol is not None and hasattr(self, "sound_volume_slider"):
-            self.sound_volume_slider.blockSignals(True)
-            self.sound_volume_slider.setValue(int(sound_vol))
-            self.sound_volume_slider.blockSignals(False)
-
-        mic_vol = config.get("input_devices_volume")
-        if mic_vol is not None and hasattr(self, "mic_volume_slider"):
-            self.mic_volume_slider.blockSignals(True)
-            self.mic_volume_slider.setValue(int(mic_vol))
-            self.mic_volume_slider.blockSignals(False)
+        selected = config.get("selected_device") or ""
 
         # Блокировка недоступных устройств
         # (Кортеж: Поле ввода, Кнопка переключения, Название устройства)
@@ -115,34 +178,97 @@ class TuneClientoPlugin(QWidget, Ui_tune_cliento):
             (self.bt_audiD_lineE, self.bt_audiD_toolB, bt_device)
         ]
 
+        # Подсвечивается первая строка с выбранным устройством
+        highlighted = next((lineE for lineE, _, name in device_widgets if selected and name == selected), None)
+
         for lineE, toolB, name in device_widgets:
+            if lineE.text() != name:
+                lineE.setText(name)
             # Устройство активно, если его имя есть в списке active_devices
             is_active = name in active_devices if name else False
             lineE.setEnabled(is_active)
             if toolB:
                 toolB.setEnabled(is_active)
+            self._set_dynamic_property(lineE, "selectedDevice", lineE is highlighted)
 
-        # Подсветка текущего выбранного устройства через dynamic property + stylesheet
-        selected = config.get("selected_device") or ""
+    def _apply_mic_line(self, config: dict):
+        mic_name = config.get("selected_mic") or ""
+        if self.mic_01_lineE.text() != mic_name:
+            self.mic_01_lineE.setText(mic_name)
+
+    def _apply_mute_button(self, button, is_muted, unmuted_text):
+        if button is None:
+            return
+        button.blockSignals(True)
+        button.setChecked(is_muted)
+        button.setText("Muted" if is_muted else unmuted_text)
+        button.blockSignals(False)
+        self._set_dynamic_property(button, "isMuted", is_muted)
+
+    def _apply_mic_mute(self, config: dict):
+        """Кнопка мута микрофона на клиенте."""
+        is_mic_muted = config.get("input_devices_muted", False)
+        self._apply_mute_button(getattr(self, "mic_mute_toolB", None), is_mic_muted, "Mute")
+
+    def _apply_sound_mute(self, config: dict):
+        """Кнопка мута звука на клиенте."""
+        is_sound_muted = config.get("output_devices_muted", False)
+        self._apply_mute_button(getattr(self, "sound_mute_toolB", None), is_sound_muted, "Sound")
+
+    def _apply_slider(self, slider_name, value):
+        slider = getattr(self, slider_name, None)
+        # Пока слайдер зажат, эхо сервера (в том числе запоздалое) не двигает его под пальцем
+        if value is None or slider is None or slider.isSliderDown():
+            return
+        slider.blockSignals(True)
+        slider.setValue(int(value))
+        slider.blockSignals(False)
 
-        # Сбрасываем флаг выбранного устройства
-        for lineE in (self.audiD_01_lineE, self.audiD_02_lineE, self.bt_audiD_lineE):
-            lineE.setProperty("selectedDevice", False)
-
-        # Помечаем активную строку
-        if selected:
-            if selected == first:
-                self.audiD_01_lineE.setProperty("selectedDevice", True)
-            elif selected == second:
-                self.audiD_02_lineE.setProperty("selectedDevice", True)
-            elif selected == bt_device:
-                self.bt_audiD_lineE.setProperty("selectedDevice", True)
-
-        # Обновляем стили для применения CSS по dynamic property
-        for lineE in (self.audiD_01_lineE, self.audiD_02_lineE, self.bt_audiD_lineE, self.mic_01_lineE):
-            lineE.style().unpolish(lineE)
-            lineE.style().polish(lineE)
-            lineE.update()
+    def _apply_sound_volume(self, config: dict):
+        self._apply_slider("sound_volume_slider", config.get("output_devices_volume"))
+
+    def _apply_mic_volume(self, config: dict):
+        self._apply_slider("mic_volume_slider", config.get("input_devices_volume"))
+
+    def _apply_app_strip(self, config: dict):
+        """Колонка "other": имя, громкость и mute выбранного приложения."""
+        self._apps = config.get("apps") or {}
+        if self._selected_app not in self._apps:
+            self._selected_app = next(iter(self._apps), None)
+        self._show_selected_app()
+
+    def _select_next_app(self):
+        apps = list(self._apps)
+        if not apps:
+            return
+        index = apps.index(self._selected_app) + 1 if self._selected_app in apps else 0
+        self._selected_app = apps[index % len(apps)]
+        self._show_selected_app()
+
+    def _show_selected_app(self):
+        app = self._selected_app
+        status = self._apps.get(app) or {}
+        label = getattr(self, "other_lable", None)
+        if label is not None:
+            # "chrome.exe" -> "chrome": в подпись 85 px помещается только короткое имя
+            text = os.path.splitext(app)[0] if app else "—"
+            if label.text() != text:
+                label.setText(text)
+            label.setToolTip(app or "")
+        slider = getattr(self, "other_volume_slider", None)
+        if slider is not None:
+            slider.setEnabled(app is not None)
+        self._apply_slider("other_volume_slider", status.get("volume"))
+        mute_btn = getattr(self, "other_mute_toolB", None)
+        if mute_btn is not None:
+            mute_btn.setEnabled(app is not None)
+            self._apply_mute_button(mute_btn, bool(status.get("mute")), "Mute")
+
+    def _toggle_app_mute(self):
+        app = self._selected_app
+        if app is None:
+            return
+        self.manager.send_app_mute(app, not (self._apps.get(app) or {}).get("mute", False))
 
     def install_event_filter_on_buttons(self):
         """Установка фильтра событий на все кнопки для анимации."""
@@ -159,11 +285,19 @@ class TuneClientoPlugin(QWidget, Ui_tune_cliento):
             # Игнорируем слайдеры в общем фильтре нажатий кнопок
             if isinstance(obj, QSlider):
                 return super().eventFilter(obj, event)
-                
+            if obj is getattr(self, "other_lable", None):
+                self._select_next_app()
+                return super().eventFilter(obj, event)
+
             self.animate_click(obj)
-            # Отправка команды через менеджер, если у объекта есть имя (ID)
+            # Mute приложения — своя команда (серверу нужно имя приложения)
+            if obj is getattr(self, "other_mute_toolB", None):
+                self._toggle_app_mute()
+                return super().eventFilter(obj, event)
+            # Отправка через менеджер, если у объекта есть имя (ID): mute и выбор
+            # устройства показываются сразу и сверяются с ответом сервера
             if obj.objectName():
-                self.manager.send_button_press(obj.objectName())
+                self.manager.send_action(obj.objectName())
         return super().eventFilter(obj, event)
 
     def animate_click(self, widget):
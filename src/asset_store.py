@@ -0,0 +1,173 @@
+"""
+Контентно-адресуемое хранилище ресурсов (иконки, звуки) общее для всех плагинов.
+
+    assets/blobs/<md5[:2]>/<md5><.ext>   — уникальные файлы (blob), имя = хэш содержимого
+    assets/index/<owner>.json            — индекс владельца (плагин или "cliento"):
+                                           {путь относительно папки владельца: blob}
+
+Одинаковый файл в нескольких плагинах хранится и скачивается один раз.
+Для кода, который читает ресурсы по пути, файл в папке плагина материализуется
+жесткой ссылкой на blob (копия — если ФС не поддерживает ссылки).
+Плагины, знающие про хранилище, берут путь через resolve().
+"""
+import os
+import json
+import shutil
+import hashlib
+
+ASSET_DIR_NAME = "assets"
+
+
+def blob_name(digest, path):
+    """Имя blob: md5 + расширение исходника (нужно Qt для определения формата)."""
+    return digest + os.path.splitext(path)[1].lower()
+
+
+class AssetStore:
+    def __init__(self, root):
+        self.root = root
+        self.blobs_dir = os.path.join(root, "blobs")
+        self.index_dir = os.path.join(root, "index")
+        self._indexes = {}  # owner -> {rel_path: blob}
+
+    # --- Blobs ---
+
+    def blob_path(self, blob):
+        return os.path.join(self.blobs_dir, blob[:2], blob)
+
+    def has(self, blob):
+        return bool(blob) and os.path.exists(self.blob_path(blob))
+
+    def put_bytes(self, data, name_hint):
+        """Сохраняет данные как blob (если такого еще нет). Возвращает имя blob."""
+        blob = blob_name(hashlib.md5(data).hexdigest(), name_hint)
+        path = self.blob_path(blob)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return blob
+
+    def put_file(self, path):
+        """Сохраняет файл как blob. Возвращает имя blob или None."""
+        try:
+            with open(path, "rb") as f:
+                return self.put_bytes(f.read(), path)
+        except OSError as e:
+            print(f"[AssetStore] Cannot read '{path}': {e}")
+            return None
+
+    def materialize(self, blob, dest_path):
+        """
+        Кладет blob по обычному пути (жесткая ссылка, иначе копия).
+        Файл заменяется атомарно, открытые читатели старого файла не ломаются.
+        """
+        src = self.blob_path(blob)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        tmp_path = dest_path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dest_path)
+
+    # --- Индексы владельцев ---
+
+    def index(self, owner):
+        """Индекс владельца {rel_path: blob} (читается с диска один раз)."""
+        index = self._indexes.get(owner)
+        if index is None:
+            index = self._read_index(os.path.join(self.index_dir, f"{owner}.json"))
+            self._indexes[owner] = index
+        return index
+
+    def lookup(self, owner, rel_path):
+        return self.index(owner).get(_norm(rel_path))
+
+    def bind(self, owner, rel_path, blob, save=True):
+        """Привязывает путь владельца к blob."""
+        index = self.index(owner)
+        rel_path = _norm(rel_path)
+        if index.get(rel_path) != blob:
+            index[rel_path] = blob
+            if save:
+                self.save_index(owner)
+
+    def unbind(self, owner, rel_path, save=True):
+        if self.index(owner).pop(_norm(rel_path), None) is not None and save:
+            self.save_index(owner)
+
+    def resolve(self, owner, rel_path, owner_root):
+        """Абсолютный путь ресурса: blob из индекса, иначе файл в папке владельца."""
+        blob = self.lookup(owner, rel_path)
+        if blob:
+            path = self.blob_path(blob)
+            if os.path.exists(path):
+                return path
+        return os.path.join(owner_root, rel_path)
+
+    def save_index(self, owner):
+        path = os.path.join(self.index_dir, f"{owner}.json")
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index(owner), f, indent=1, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[AssetStore] Index write error ({owner}): {e}")
+
+    # --- Сборка мусора ---
+
+    def collect_garbage(self):
+        """
+        Удаляет blob'ы, на которые не ссылается ни один индекс.
+        Возвращает (число удаленных файлов, освобождено байт).
+        """
+        referenced = set()
+        if os.path.isdir(self.index_dir):
+            for file_name in os.listdir(self.index_dir):
+                if file_name.endswith(".json"):
+                    owner = file_name[:-len(".json")]
+                    referenced.update(self.index(owner).values())
+
+        removed, freed = 0, 0
+        if not os.path.isdir(self.blobs_dir):
+            return removed, freed
+        for bucket in os.listdir(self.blobs_dir):
+            bucket_dir = os.path.join(self.blobs_dir, bucket)
+            if not os.path.isdir(bucket_dir):
+                continue
+            for blob in os.listdir(bucket_dir):
+                if blob in referenced:
+                    continue
+                path = os.path.join(bucket_dir, blob)
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+                    freed += size
+                except OSError as e:
+                    print(f"[AssetStore] GC cannot remove {blob}: {e}")
+            if not os.listdir(bucket_dir):
+                os.rmdir(bucket_dir)
+        if removed:
+            print(f"[AssetStore] GC: removed {removed} blobs ({freed / 1024:.1f} KB)")
+        return removed, freed
+
+    @staticmethod
+    def _read_index(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+
+def _norm(rel_path):
+    return rel_path.replace("\\", "/")
@@ -0,0 +1,48 @@
+"""
+Бинарные кадры WebSocket (сервер <-> клиент).
+
+Файлы (иконки и т.п.) передаются без base64 и без JSON-обертки:
+
+    b"ELB1" | uint32 BE: длина заголовка | заголовок JSON (utf-8) | данные
+
+Заголовок — обычное сообщение протокола {"command": ..., "data": {...}},
+поэтому на клиенте кадр превращается в тот же dict, что и текстовое
+сообщение, плюс ключ "binary" с сырыми данными.
+"""
+import json
+import struct
+
+FRAME_MAGIC = b"ELB1"
+_HEADER_LEN = struct.Struct(">I")
+_PREFIX_SIZE = len(FRAME_MAGIC) + _HEADER_LEN.size
+
+
+def pack_frame(command: str, data: dict = None, payload: bytes = b"") -> bytes:
+    """Собирает кадр из команды, JSON-данных и бинарной части."""
+    header = json.dumps({"command": command, "data": data or {}}).encode("utf-8")
+    return FRAME_MAGIC + _HEADER_LEN.pack(len(header)) + header + bytes(payload)
+
+
+def unpack_frame(frame: bytes) -> dict:
+    """
+    Разбирает кадр в сообщение {"command", "data", "binary"}.
+    Некорректный кадр -> ValueError.
+    """
+    frame = bytes(frame)
+    if len(frame) < _PREFIX_SIZE or not frame.startswith(FRAME_MAGIC):
+        raise ValueError("not an ELB1 frame")
+    (header_len,) = _HEADER_LEN.unpack_from(frame, len(FRAME_MAGIC))
+    header_end = _PREFIX_SIZE + header_len
+    if header_end > len(frame):
+        raise ValueError("truncated frame header")
+    try:
+        header = json.loads(frame[_PREFIX_SIZE:header_end].decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"bad frame header: {e}")
+    if not isinstance(header, dict):
+        raise ValueError("bad frame header")
+    return {
+        "command": header.get("command"),
+        "data": header.get("data") or {},
+        "binary": frame[header_end:],
+    }
@@ -0,0 +1,58 @@
+"""
+Гистограмма задержек (мс) с логарифмическими корзинами.
+
+Память постоянная (счетчики корзин), запись — O(число корзин), поэтому
+подходит для горячих путей: нажатия кнопок, тики планировщика, ответы сети.
+Перцентили приблизительные — верхняя граница корзины.
+"""
+import threading
+
+DEFAULT_BOUNDS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LatencyHistogram:
+    def __init__(self, name, bounds_ms=DEFAULT_BOUNDS_MS):
+        self.name = name
+        self.bounds_ms = tuple(bounds_ms)
+        self._lock = threading.Lock()  # пишут рабочие потоки, читает GUI
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.bounds_ms) + 1)  # последняя — "больше максимума"
+            self.count = 0
+            self.total_ms = 0.0
+            self.max_ms = 0.0
+
+    def record(self, value_ms):
+        with self._lock:
+            index = len(self.bounds_ms)
+            for i, bound in enumerate(self.bounds_ms):
+                if value_ms <= bound:
+                    index = i
+                    break
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += value_ms
+            self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, fraction):
+        """Верхняя граница корзины, в которую попадает перцентиль (max — для хвоста)."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            threshold = fraction * self.count
+            seen = 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= threshold:
+                    return self.bounds_ms[i] if i < len(self.bounds_ms) else self.max_ms
+            return self.max_ms
+
+    def summary(self):
+        """Короткая строка для лога."""
+        if not self.count:
+            return f"{self.name}: no samples"
+        mean = self.total_ms / self.count
+        return (f"{self.name}: n={self.count}, mean {mean:.2f} ms, p50 <={self.percentile(0.5):g} ms, "
+                f"p95 <={self.percentile(0.95):g} ms, max {self.max_ms:.2f} ms")
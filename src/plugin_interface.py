@@ -0,0 +1,80 @@
+"""
+Интерфейс жизненного цикла плагинов (сервер и клиент).
+
+Ядро (ElCore) и клиент (CliMainWindow) кэшируют экземпляры плагинов, поэтому
+скрытый плагин продолжает жить. Чтобы он не тратил CPU, ядро вызывает хуки:
+
+    on_activate()   — слот стал активным/видимым (в т.ч. сразу после создания
+                      и после on_resume).
+    on_deactivate() — слот скрыт, экземпляр остается в кэше.
+                      Остановить таймеры, потоки опроса, анимации.
+    on_suspend()    — экземпляр выгружается (вытеснение из кэша, замена плагина в слоте,
+                      выход из приложения) или приложение уходит в фон
+                      (is_background_state). Освободить все ресурсы: потоки, бэкенды.
+    on_resume()     — приложение вернулось из фона, экземпляр не пересоздавался:
+                      снова запустить то, что остановил on_suspend.
+
+    save_ui_state() / restore_ui_state(state) — состояние UI между пересозданиями
+                      экземпляра (см. el_cliento/cl_plugin_cache.py).
+
+Только сервер (ElCore), для всех загруженных плагинов:
+
+    handle_client_command(command, payload, client_id) — команда клиента.
+    handle_client_disconnected(client_id) — клиент отключился: его незавершенные
+                      действия (например, зажатые кнопки) уже не получат продолжения.
+
+Все хуки необязательны: наследование от ElPlugin не требуется, ядро вызывает
+их через call_plugin_hook() только если метод есть у экземпляра.
+"""
+from PySide6.QtCore import Qt
+
+
+class ElPlugin:
+    """
+    Миксин с пустыми реализациями хуков.
+    Использование: class MyPlugin(QWidget, ElPlugin).
+    """
+
+    def on_activate(self):
+        pass
+
+    def on_deactivate(self):
+        pass
+
+    def on_suspend(self):
+        pass
+
+    def on_resume(self):
+        pass
+
+    def save_ui_state(self):
+        return None
+
+    def restore_ui_state(self, state):
+        pass
+
+
+def is_background_state(state):
+    """
+    Qt.ApplicationState из QGuiApplication.applicationStateChanged: приложение
+    в фоне (плагинам — on_suspend). Inactive (окно без фокуса) фоном не считается.
+    """
+    return state in (Qt.ApplicationState.ApplicationSuspended, Qt.ApplicationState.ApplicationHidden)
+
+
+def call_plugin_hook(instance, hook_name, *args):
+    """
+    Безопасный вызов хука плагина.
+    Ошибка в плагине логируется и не ломает переключение слотов.
+    Возвращает результат хука или None.
+    """
+    if instance is None:
+        return None
+    hook = getattr(instance, hook_name, None)
+    if not callable(hook):
+        return None
+    try:
+        return hook(*args)
+    except Exception as e:
+        print(f"[Plugin] {type(instance).__name__}.{hook_name} error: {e}")
+        return None
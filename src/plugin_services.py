@@ -0,0 +1,104 @@
+import os
+import copy
+
+try:
+    from .manager_save_load import ConfigManager
+    from .asset_store import AssetStore, ASSET_DIR_NAME
+except ImportError:
+    from src.manager_save_load import ConfigManager
+    from src.asset_store import AssetStore, ASSET_DIR_NAME
+
+
+class ConfigStore:
+    """
+    Общий кэш JSON-конфигов приложения.
+    Файл перечитывается только если изменился его mtime, поэтому плагины могут
+    вызывать load() сколько угодно раз без лишнего I/O.
+    """
+    def __init__(self):
+        self._cache = {}  # path -> (mtime, data)
+
+    def read(self, path) -> dict:
+        """Закэшированный конфиг без копирования — только для чтения."""
+        path = os.path.abspath(path)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self._cache.pop(path, None)
+            return {}
+
+        cached = self._cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        data = ConfigManager(path).load_config()
+        self._cache[path] = (mtime, data)
+        return data
+
+    def load(self, path) -> dict:
+        """Возвращает копию конфига (изменения не портят общий кэш)."""
+        return copy.deepcopy(self.read(path))
+
+    def get(self, path, key, default=None):
+        """Читает одно значение без копирования всего конфига."""
+        value = self.read(path).get(key, default)
+        return copy.deepcopy(value)
+
+
+class StyleRegistry:
+    """
+    Реестр стилей (JSON Material -> CSS).
+    Готовый CSS кэшируется по (path, mtime, skip), JSON парсится один раз на файл.
+    """
+    def __init__(self, config_store=None):
+        self._store = config_store or ConfigStore()
+        self._css_cache = {}  # (path, skip) -> (mtime, css)
+
+    def load(self, path) -> dict:
+        """Сырые данные стиля (копия)."""
+        return self._store.load(path)
+
+    def get(self, path, key, default=None):
+        return self._store.get(path, key, default)
+
+    def css(self, path, skip=("__", "animation")) -> str:
+        """
+        CSS-строка для setStyleSheet.
+        Селекторы, начинающиеся с префиксов из skip, пропускаются (метаданные, анимации).
+        """
+        path = os.path.abspath(path)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return ""
+
+        key = (path, tuple(skip))
+        cached = self._css_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        css = ""
+        for selector, props in self._store.read(path).items():
+            if selector.startswith(tuple(skip)) or not isinstance(props, dict):
+                continue
+            props_str = "; ".join([f"{k}: {v}" for k, v in props.items()])
+            css += f"{selector} {{ {props_str} }} \n"
+
+        self._css_cache[key] = (mtime, css)
+        return css
+
+
+class PluginServices:
+    """
+    Контейнер общих сервисов, который клиент передает плагинам при создании:
+        plugin_class(socket_client, plugin_path, services=services)
+
+    sound   — общий ElSoundManager (звуки уже загружены, конфиг звуков прочитан)
+    styles  — StyleRegistry (кэш стилей)
+    assets  — AssetStore (общее хранилище иконок/звуков, см. src/asset_store.py)
+    """
+    def __init__(self, project_root, sound=None, styles=None, assets=None):
+        self.project_root = project_root
+        self.sound = sound
+        self.styles = styles or StyleRegistry()
+        self.assets = assets or AssetStore(os.path.join(project_root, ASSET_DIR_NAME))
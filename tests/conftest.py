@@ -0,0 +1,48 @@
+"""
+Общие настройки тестов: Qt без дисплея, пути к src плагинов.
+
+Модули плагинов импортируются так же, как при запуске плагина
+(try: from .x / except ImportError: from x), поэтому папки src
+плагинов добавляются в sys.path.
+"""
+import os
+import sys
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (
+    ROOT,
+    os.path.join(ROOT, "plugins", "shortcut", "src"),
+    os.path.join(ROOT, "plugins", "tune", "src"),
+):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """Один QCoreApplication на сессию (таймеры и queued-сигналы)."""
+    from PySide6.QtCore import QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def qwait(qapp):
+    """
+    qwait(ms) — крутит цикл событий ms миллисекунд.
+    qwait(ms, until=predicate) — до выполнения условия; возвращает его последнее значение.
+    """
+    def wait(ms, until=None):
+        deadline = time.perf_counter() + ms / 1000.0
+        while True:
+            qapp.processEvents()
+            if until is not None and until():
+                return True
+            if time.perf_counter() >= deadline:
+                return until() if until is not None else None
+            time.sleep(0.002)
+    return wait
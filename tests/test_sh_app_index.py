@@ -0,0 +1,98 @@
+import os
+import json
+
+from sh_app_index import AppIndex
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+def _bump_mtime(path, step_ns=10_000_000):
+    """Явный сдвиг mtime папки: не зависеть от разрешения часов ФС."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + step_ns))
+
+
+def _names(apps):
+    return [name for name, _ in apps]
+
+
+def _make_tree(root):
+    _touch(os.path.join(root, "Zed.lnk"))
+    _touch(os.path.join(root, "readme.txt"))
+    _touch(os.path.join(root, "Vendor", "Alpha.lnk"))
+    _touch(os.path.join(root, "Vendor", "Tools", "beta.LNK"))
+    _touch(os.path.join(root, "Other", "Gamma.lnk"))
+
+
+def test_first_scan_walks_tree(tmp_path):
+    root = str(tmp_path / "menu")
+    _make_tree(root)
+    index_path = str(tmp_path / "app_index.json")
+
+    index = AppIndex(index_path, roots=[root])
+    apps = index.scan()
+
+    assert _names(apps) == ["Alpha", "beta", "Gamma", "Zed"]
+    assert dict(apps)["Alpha"] == os.path.join(root, "Vendor", "Alpha.lnk")
+    assert index.stats == {"dirs": 4, "rescanned": 4}
+    with open(index_path, encoding="utf-8") as f:
+        assert len(json.load(f)["dirs"]) == 4
+
+    # Новый экземпляр показывает сохраненный индекс без обхода диска
+    assert AppIndex(index_path, roots=[root]).cached_apps() == apps
+
+
+def test_rescan_lists_only_changed_dirs(tmp_path, monkeypatch):
+    root = str(tmp_path / "menu")
+    _make_tree(root)
+    index_path = str(tmp_path / "app_index.json")
+    AppIndex(index_path, roots=[root]).scan()
+
+    index = AppIndex(index_path, roots=[root])
+    listed = []
+    list_dir = index._list_dir
+    monkeypatch.setattr(index, "_list_dir", lambda path, mtime: listed.append(path) or list_dir(path, mtime))
+
+    assert _names(index.scan()) == ["Alpha", "beta", "Gamma", "Zed"]
+    assert listed == []
+    assert index.stats == {"dirs": 4, "rescanned": 0}
+
+    tools = os.path.join(root, "Vendor", "Tools")
+    _touch(os.path.join(tools, "Delta.lnk"))
+    _bump_mtime(tools)
+    apps = index.scan()
+
+    assert listed == [tools]
+    assert index.stats == {"dirs": 4, "rescanned": 1}
+    assert _names(apps) == ["Alpha", "beta", "Delta", "Gamma", "Zed"]
+
+
+def test_rescan_drops_removed_files_and_dirs(tmp_path):
+    root = str(tmp_path / "menu")
+    _make_tree(root)
+    index_path = str(tmp_path / "app_index.json")
+    index = AppIndex(index_path, roots=[root])
+    index.scan()
+
+    os.remove(os.path.join(root, "Zed.lnk"))
+    other = os.path.join(root, "Other")
+    os.remove(os.path.join(other, "Gamma.lnk"))
+    os.rmdir(other)
+    _bump_mtime(root)
+    apps = index.scan()
+
+    assert _names(apps) == ["Alpha", "beta"]
+    assert index.stats == {"dirs": 3, "rescanned": 1}
+    with open(index_path, encoding="utf-8") as f:
+        saved = json.load(f)["dirs"]
+    assert other not in saved
+    assert AppIndex(index_path, roots=[root]).cached_apps() == apps
+
+
+def test_missing_root_is_skipped(tmp_path):
+    index = AppIndex(str(tmp_path / "app_index.json"), roots=[str(tmp_path / "absent")])
+    assert index.scan() == []
+    assert index.stats == {"dirs": 0, "rescanned": 0}
@@ -0,0 +1,34 @@
+import os
+
+from sh_icon_library import thumbnail_key, prune_thumbnails
+
+
+def _write(path, data=b"x"):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_thumbnail_key_follows_file_and_size(tmp_path):
+    icon = str(tmp_path / "a.png")
+    key = thumbnail_key(icon, 1, 48)
+    assert thumbnail_key(icon, 1, 48) == key
+    assert thumbnail_key(icon, 2, 48) != key
+    assert thumbnail_key(icon, 1, 96) != key
+
+
+def test_prune_keeps_only_current_listing(tmp_path):
+    thumbs = tmp_path / "thumbs"
+    thumbs.mkdir()
+    kept = thumbnail_key(str(tmp_path / "a.png"), 2, 48)
+    edited = thumbnail_key(str(tmp_path / "a.png"), 1, 48)      # прежний mtime
+    deleted = thumbnail_key(str(tmp_path / "gone.png"), 1, 48)
+    for key in (kept, edited, deleted):
+        _write(str(thumbs / f"{key}.png"))
+    _write(str(thumbs / "in_progress.png.1.tmp"))
+
+    assert prune_thumbnails(str(thumbs), {kept}) == 2
+    assert sorted(os.listdir(thumbs)) == sorted([f"{kept}.png", "in_progress.png.1.tmp"])
+
+
+def test_prune_missing_dir(tmp_path):
+    assert prune_thumbnails(str(tmp_path / "absent"), set()) == 0
@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from tn_audio_backend import FakeAudioBackend, POLL_ENV
+from tn_audio_manager import AudioStatusSubscription
+
+SPEAKERS = "Fake Speakers"
+MIC = "Fake Microphone"
+
+
+class WatchingBackend(FakeAudioBackend):
+    """FakeAudioBackend, который запоминает включение/выключение системных уведомлений."""
+
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+        super().__init__(*args, **kwargs)
+
+    def _watch(self, device_name):
+        self.calls.append(("watch", device_name))
+
+    def _unwatch(self, device_name):
+        self.calls.append(("unwatch", device_name))
+
+    def _watch_sessions(self):
+        self.calls.append(("watch_sessions",))
+
+    def _unwatch_sessions(self):
+        self.calls.append(("unwatch_sessions",))
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.delenv(POLL_ENV, raising=False)
+    backend = WatchingBackend()
+    yield backend
+    backend.close()
+
+
+def test_subscription_receives_pushed_status(qapp, backend):
+    subscription = AudioStatusSubscription(backend, SPEAKERS)
+    received = []
+    subscription.status_changed.connect(received.append)
+
+    backend.simulate_change(SPEAKERS, volume=80)
+    backend.simulate_change(SPEAKERS, mute=True)
+    backend.simulate_change(MIC, volume=10)     # другое устройство
+
+    assert received == [{"mute": False, "volume": 80}, {"mute": True, "volume": 80}]
+    subscription.stop()
+
+
+def test_subscription_delivers_backend_thread_event_in_gui_thread(qapp, qwait, backend):
+    subscription = AudioStatusSubscription(backend, SPEAKERS)
+    received = []
+    subscription.status_changed.connect(lambda status: received.append((status, threading.current_thread())))
+
+    worker = threading.Thread(target=backend.simulate_change, args=(SPEAKERS,), kwargs={"volume": 33})
+    worker.start()
+    worker.join()
+
+    assert qwait(1000, until=lambda: received)
+    assert received == [({"mute": False, "volume": 33}, threading.main_thread())]
+    subscription.stop()
+
+
+def test_subscription_skips_unchanged_status(qapp, backend):
+    subscription = AudioStatusSubscription(backend, SPEAKERS)
+    received = []
+    subscription.status_changed.connect(received.append)
+
+    backend._notify(SPEAKERS, {"mute": False, "volume": 50})   # статус на момент подписки
+    assert received == []
+    subscription.stop()
+
+
+def test_device_subscriptions_are_ref_counted(backend):
+    first = backend.subscribe(SPEAKERS, lambda status: None)
+    second = backend.subscribe(SPEAKERS, lambda status: None)
+    mic = backend.subscribe(MIC, lambda status: None)
+    assert backend.calls == [("watch", SPEAKERS), ("watch", MIC)]
+
+    backend.unsubscribe(first)
+    backend.unsubscribe(first)       # повторная отписка — без эффекта
+    assert backend.calls == [("watch", SPEAKERS), ("watch", MIC)]
+
+    backend.unsubscribe(second)
+    assert backend.calls[-1] == ("unwatch", SPEAKERS)
+
+    backend.close()
+    assert backend.calls[-1] == ("unwatch", MIC)
+    backend.unsubscribe(mic)         # после close() — без эффекта
+    assert backend.calls.count(("unwatch", MIC)) == 1
+
+
+def test_session_subscriptions_are_ref_counted(backend):
+    first = backend.subscribe_sessions(lambda event, session: None)
+    second = backend.subscribe_sessions(lambda event, session: None)
+    assert backend.calls == [("watch_sessions",)]
+
+    backend.unsubscribe_sessions(first)
+    assert backend.calls == [("watch_sessions",)]
+    backend.unsubscribe_sessions(second)
+    assert backend.calls == [("watch_sessions",), ("unwatch_sessions",)]
+
+
+def test_close_drops_all_subscribers(backend):
+    received = []
+    backend.subscribe(SPEAKERS, received.append)
+    backend.subscribe_devices(lambda: received.append("devices"))
+    backend.subscribe_sessions(lambda event, session: received.append(event))
+
+    backend.close()
+    backend.simulate_change(SPEAKERS, volume=90)
+    backend.add_device("New Speakers")
+    backend.add_session("player")
+
+    assert received == []
+    assert ("unwatch", SPEAKERS) in backend.calls
+    assert ("unwatch_sessions",) in backend.calls
+
+
+def test_poll_mode_uses_monitor_and_subscription_dedups_double_notification(qapp, qwait, monkeypatch):
+    monkeypatch.setenv(POLL_ENV, "1")
+    backend = WatchingBackend()
+    raw = []
+    token = backend.subscribe(SPEAKERS, raw.append)
+    subscription = AudioStatusSubscription(backend, SPEAKERS)
+    received = []
+    subscription.status_changed.connect(received.append)
+    try:
+        assert backend.calls == []      # опрос вместо системных уведомлений
+        assert backend._monitor.names() == {SPEAKERS}
+        # Первый тик опроса сообщает исходный статус
+        assert qwait(1000, until=lambda: len(raw) == 1)
+
+        # Изменение приходит дважды: событием бэкенда и следующим тиком опроса
+        backend.simulate_change(SPEAKERS, volume=70)
+        backend.poke()
+        assert qwait(1000, until=lambda: len(raw) == 3)
+        assert raw[1] == raw[2] == {"mute": False, "volume": 70}
+
+        qwait(50)
+        assert received == [{"mute": False, "volume": 70}]
+
+        subscription.stop()
+        backend.unsubscribe(token)
+        assert backend._monitor.names() == set()
+    finally:
+        backend.close()
@@ -0,0 +1,91 @@
+import sys
+
+import pytest
+
+from tn_audio_backend import FakeAudioBackend, AudioBackendError, BACKEND_ENV, create_audio_backend
+from tn_audio_manager import TnAudioManager
+
+SPEAKERS = "Fake Speakers"
+MIC = "Fake Microphone"
+
+
+def test_close_stops_listeners_and_releases_backend(qapp, monkeypatch):
+    backend = FakeAudioBackend()
+    manager = TnAudioManager(backend)
+    events = []
+    manager.start_sound_listening(SPEAKERS, lambda status: events.append(("sound", status)))
+    manager.start_mic_listening(MIC, lambda status: events.append(("mic", status)))
+    manager.start_device_watch(lambda: events.append("devices"))
+    assert manager.start_app_mixer(lambda changed, removed: events.append("apps"))
+
+    backend.simulate_change(SPEAKERS, volume=70)
+    assert events == [("sound", {"mute": False, "volume": 70})]
+    events.clear()
+
+    manager.close()
+
+    assert backend._subscribers == {}
+    assert backend._device_subscribers == {}
+    assert backend._session_subscribers == {}
+    backend.simulate_change(SPEAKERS, volume=20)
+    backend.simulate_change(MIC, mute=True)
+    backend.add_device("New Speakers")
+    backend.add_session("player")
+    qapp.processEvents()
+    assert events == []
+    assert manager.get_apps() == {}
+
+    # Бэкенд создается заново при следующем обращении
+    monkeypatch.setenv(BACKEND_ENV, "fake")
+    assert manager.backend is not backend
+    assert isinstance(manager.backend, FakeAudioBackend)
+    manager.close()
+
+
+def test_close_without_backend_is_noop():
+    manager = TnAudioManager()
+    manager.close()
+    assert manager._backend is None
+
+
+def test_levels_do_not_reopen_closed_backend(monkeypatch):
+    monkeypatch.setenv(BACKEND_ENV, "fake")
+    manager = TnAudioManager()
+    assert set(manager.get_levels([SPEAKERS, MIC])) == {SPEAKERS, MIC}
+
+    manager.close()
+    # Тик потока уровней, начатый до close(), не создает бэкенд заново
+    assert manager.get_levels([SPEAKERS, MIC]) == {}
+    assert manager._backend is None
+
+    assert manager.open()
+    assert set(manager.get_levels([SPEAKERS])) == {SPEAKERS}
+    manager.close()
+
+
+def test_unavailable_backend_is_not_faked_on_windows(monkeypatch):
+    monkeypatch.setattr(sys, "platform", "win32")
+    monkeypatch.setenv(BACKEND_ENV, "missing")
+    with pytest.raises(AudioBackendError):
+        create_audio_backend()
+
+    manager = TnAudioManager()
+    assert not manager.is_available()
+    assert not manager.set_mute_sound(SPEAKERS, True)
+    assert not manager.set_device_volume(SPEAKERS, 30)
+    assert not manager.start_sound_listening(SPEAKERS, lambda status: None)
+    assert manager.refresh_output_devices() == []
+    assert manager.get_levels([SPEAKERS]) == {}
+
+    # Явный выбор fake и возврат из фона — бэкенд создается заново
+    monkeypatch.setenv(BACKEND_ENV, "fake")
+    assert manager.open()
+    assert manager.set_mute_sound(SPEAKERS, True)
+    manager.close()
+
+
+def test_missing_backend_falls_back_to_fake_off_windows(monkeypatch):
+    monkeypatch.setattr(sys, "platform", "linux")
+    backend = create_audio_backend("missing")
+    assert isinstance(backend, FakeAudioBackend)
+    backend.close()
@@ -0,0 +1,105 @@
+import pytest
+
+from tn_audio_backend import FakeAudioBackend
+from tn_audio_mixer import TnAudioMixer, FLUSH_MS
+
+
+@pytest.fixture
+def backend():
+    backend = FakeAudioBackend()
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def mixer(qapp, backend):
+    mixer = TnAudioMixer(backend)
+    yield mixer
+    mixer.stop()
+
+
+def _record(mixer):
+    events = []
+    mixer.apps_changed.connect(lambda changed, removed: events.append((changed, removed)))
+    return events
+
+
+def test_sessions_of_one_process_are_one_app(backend, mixer):
+    first = backend.add_session("browser", pid=10, volume=30, mute=True)
+    second = backend.add_session("browser", pid=10, volume=80, mute=False)
+    backend.add_session("game", volume=55)
+    mixer.start()
+
+    assert mixer.apps() == {
+        "browser": {"volume": 80, "mute": False, "sessions": 2},
+        "game": {"volume": 55, "mute": False, "sessions": 1},
+    }
+
+    # mute приложения — только если заглушены все его сессии
+    backend.simulate_session_change(second, mute=True)
+    assert mixer.apps()["browser"] == {"volume": 80, "mute": True, "sessions": 2}
+
+    # Установка применяется ко всем сессиям приложения
+    assert mixer.set_app_volume("browser", 40)
+    assert mixer.set_app_mute("browser", False)
+    sessions = {session["id"]: session for session in backend.list_sessions()}
+    assert sessions[first]["volume"] == sessions[second]["volume"] == 40
+    assert not sessions[first]["mute"] and not sessions[second]["mute"]
+    assert mixer.apps()["browser"] == {"volume": 40, "mute": False, "sessions": 2}
+    assert mixer.apps()["game"]["volume"] == 55
+
+    assert not mixer.set_app_volume("absent", 10)
+
+
+def test_changes_within_flush_window_are_one_event(backend, mixer, qwait):
+    mixer.start()
+    events = _record(mixer)
+
+    session_id = backend.add_session("player", volume=10)
+    for volume in (20, 30, 40):
+        backend.simulate_session_change(session_id, volume=volume)
+    other = backend.add_session("chat", volume=70)
+    assert events == []
+
+    qwait(FLUSH_MS * 4)
+    assert events == [({
+        "chat": {"volume": 70, "mute": False, "sessions": 1},
+        "player": {"volume": 40, "mute": False, "sessions": 1},
+    }, [])]
+
+    # Изменение и откат в одном окне — сообщать не о чем
+    events.clear()
+    backend.simulate_session_change(session_id, volume=90)
+    backend.simulate_session_change(session_id, volume=40)
+    qwait(FLUSH_MS * 4)
+    assert events == []
+
+    backend.remove_session(other)
+    qwait(FLUSH_MS * 4)
+    assert events == [({}, ["chat"])]
+    assert list(mixer.apps()) == ["player"]
+
+
+def test_change_for_unknown_session_is_ignored(backend, mixer, qwait):
+    mixer.start()
+    events = _record(mixer)
+
+    backend._notify_sessions("changed", {"id": "ghost", "volume": 10})
+    backend._notify_sessions("removed", {"id": "ghost"})
+    qwait(FLUSH_MS * 4)
+
+    assert events == []
+    assert mixer.apps() == {}
+    assert mixer.stats["events"] == 2
+
+
+def test_stop_unsubscribes(backend, mixer, qwait):
+    mixer.start()
+    events = _record(mixer)
+    mixer.stop()
+
+    backend.add_session("player")
+    qwait(FLUSH_MS * 4)
+    assert events == []
+    assert backend._session_subscribers == {}
+    assert mixer.apps() == {}
@@ -0,0 +1,118 @@
+import threading
+import time
+import types
+
+import pytest
+
+import tn_audio_monitor
+from tn_audio_monitor import AudioPollMonitor, BACKOFF
+
+
+class Source:
+    """Статусы устройств для sample(): запоминает каждый батч."""
+
+    def __init__(self, **statuses):
+        self.statuses = statuses
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def sample(self, names):
+        with self.lock:
+            self.batches.append(list(names))
+            return {name: dict(self.statuses[name]) if name in self.statuses else None for name in names}
+
+
+def _wait(predicate, timeout=1.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_one_batch_per_tick_and_only_changed_devices():
+    source = Source(A={"mute": False, "volume": 10}, B={"mute": False, "volume": 20})
+    changes = []
+    monitor = AudioPollMonitor(source.sample, changes.append, fast=0.01, idle=0.02, boost=0.05)
+    try:
+        monitor.add("A")
+        monitor.add("B")
+        assert _wait(lambda: {name for event in changes for name in event} == {"A", "B"})
+        assert _wait(lambda: source.batches[-1] == ["A", "B"])
+
+        changes.clear()
+        source.statuses["B"] = {"mute": True, "volume": 20}
+        assert _wait(lambda: changes)
+        assert changes[0] == {"B": {"mute": True, "volume": 20}}
+        assert all(batch == ["A", "B"] for batch in source.batches[-3:])
+
+        monitor.remove("A")
+        source.batches.clear()
+        assert _wait(lambda: source.batches)
+        assert source.batches[-1] == ["B"]
+    finally:
+        monitor.stop()
+    assert monitor._thread is not None and not monitor._thread.is_alive()
+
+
+def test_missing_device_and_sample_error_do_not_notify():
+    source = Source(A={"mute": False, "volume": 10})
+    changes = []
+    monitor = AudioPollMonitor(source.sample, changes.append)
+    monitor._names.update({"A", "gone"})
+
+    monitor._tick(["A", "gone"])
+    assert changes == [{"A": {"mute": False, "volume": 10}}]
+
+    monitor._sample = lambda names: 1 / 0
+    monitor._tick(["A"])
+    assert changes == [{"A": {"mute": False, "volume": 10}}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Ручное время для интервалов монитора."""
+    now = [100.0]
+    monkeypatch.setattr(tn_audio_monitor, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_interval_backs_off_to_idle_and_poke_speeds_up(clock):
+    source = Source(A={"mute": False, "volume": 10})
+    monitor = AudioPollMonitor(source.sample, lambda changes: None, fast=0.1, idle=1.0, boost=3.0)
+    monitor._names.add("A")
+
+    monitor._tick(["A"])                 # исходный статус — изменение, быстрый опрос
+    assert monitor.interval == 0.1
+
+    clock[0] += 2.0
+    monitor._tick(["A"])                 # без изменений, но boost еще идет
+    assert monitor.interval == 0.1
+
+    clock[0] += 2.0
+    intervals = []
+    for _ in range(8):
+        monitor._tick(["A"])
+        intervals.append(monitor.interval)
+    assert intervals[0] == pytest.approx(0.1 * BACKOFF)
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == 1.0
+
+    monitor.poke()
+    assert monitor.interval == 0.1
+    clock[0] += 1.0
+    monitor._tick(["A"])
+    assert monitor.interval == 0.1       # boost после poke() длится 3 с
+    clock[0] += 3.0
+    monitor._tick(["A"])
+    assert monitor.interval == pytest.approx(0.1 * BACKOFF)
+
+
+def test_stopped_monitor_ignores_new_devices():
+    source = Source(A={"mute": False, "volume": 10})
+    monitor = AudioPollMonitor(source.sample, lambda changes: None)
+    monitor.stop()
+    monitor.add("A")
+    assert monitor.names() == set()
+    assert monitor._thread is None
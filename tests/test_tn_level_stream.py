@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+
+from src.binary_frame import pack_frame, unpack_frame
+from tn_audio_backend import FakeAudioBackend
+from tn_level_stream import (
+    LevelStreamer, LEVELS_COMMAND, LEVEL_CHANNELS, peak_to_level, pack_levels, unpack_levels,
+)
+
+SPEAKERS, MIC = "Fake Speakers", "Fake Microphone"
+
+
+def _wait(until, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not until():
+        if time.perf_counter() >= deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class Sink:
+    """send(client_id, payload) для LevelStreamer: собирает кадры, «отключенные» клиенты -> 0."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frames = []        # (client_id, levels, thread)
+        self.gone = set()
+
+    def send(self, client_id, payload):
+        if client_id in self.gone:
+            return 0
+        frame = pack_frame(LEVELS_COMMAND, None, payload)
+        message = unpack_frame(frame)
+        with self.lock:
+            self.frames.append((client_id, unpack_levels(message["binary"]), threading.current_thread()))
+        return len(frame)
+
+    def of(self, client_id):
+        with self.lock:
+            return [levels for sender, levels, _ in self.frames if sender == client_id]
+
+
+@pytest.fixture
+def backend():
+    backend = FakeAudioBackend()
+    yield backend
+    backend.close()
+
+
+def _sample(backend):
+    def sample():
+        levels = backend.get_levels([SPEAKERS, MIC])
+        return [levels[SPEAKERS][0], levels[SPEAKERS][1], max(levels[MIC])]
+    return sample
+
+
+def test_level_quantization():
+    assert peak_to_level(0) == 0
+    assert peak_to_level(None) == 0
+    assert peak_to_level(0.001) == 0            # -60 дБ
+    assert peak_to_level(1.0) == 255
+    assert peak_to_level(2.0) == 255
+    assert 120 < peak_to_level(0.03) < 135      # около -30 дБ — середина шкалы
+    assert unpack_levels(pack_levels([0, 300, -5])) == [0, 255, 0]
+    assert unpack_levels(b"\x01\x02") is None
+
+
+def test_fake_levels_stream_off_gui_thread(backend):
+    sink = Sink()
+    streamer = LevelStreamer(_sample(backend), sink.send, rate_hz=100, max_kbps=1000, cpu_share=1.0)
+    streamer.subscribe("a")
+    try:
+        assert _wait(lambda: len(sink.of("a")) >= 5)
+    finally:
+        streamer.stop()
+
+    frames = sink.frames
+    assert all(len(levels) == len(LEVEL_CHANNELS) for _, levels, _ in frames)
+    assert all(thread is not threading.main_thread() for _, _, thread in frames)
+    # Синтетические уровни меняются — кадры не повторяются подряд
+    levels = sink.of("a")
+    assert all(previous != current for previous, current in zip(levels, levels[1:]))
+
+    count = len(sink.frames)
+    time.sleep(0.1)
+    assert len(sink.frames) <= count + 1    # после stop — не больше тика, уже начатого
+    assert streamer.clients() == set()
+
+
+def test_unchanged_levels_are_not_resent(backend):
+    backend.set_mute(SPEAKERS, True)
+    backend.set_mute(MIC, True)
+    sink = Sink()
+    streamer = LevelStreamer(_sample(backend), sink.send, rate_hz=200, max_kbps=1000, cpu_share=1.0)
+    streamer.subscribe("a")
+    try:
+        assert _wait(lambda: len(sink.of("a")) == 1)
+        time.sleep(0.1)
+        assert sink.of("a") == [[0, 0, 0]]
+
+        # Новый подписчик получает текущие уровни сразу, даже без изменений
+        streamer.subscribe("b")
+        assert _wait(lambda: sink.of("b") == [[0, 0, 0]])
+    finally:
+        streamer.stop()
+
+
+def test_disconnected_client_is_dropped(backend):
+    sink = Sink()
+    streamer = LevelStreamer(_sample(backend), sink.send, rate_hz=100, max_kbps=1000, cpu_share=1.0)
+    streamer.subscribe("a")
+    streamer.subscribe("b")
+    try:
+        assert _wait(lambda: sink.of("a") and sink.of("b"))
+        sink.gone.add("b")
+        assert _wait(lambda: streamer.clients() == {"a"})
+        sink.gone.add("a")
+        assert _wait(lambda: not streamer.clients())
+    finally:
+        streamer.stop()
+
+
+def test_budgets_stretch_interval(backend):
+    streamer = LevelStreamer(_sample(backend), Sink().send, rate_hz=20, max_kbps=1, cpu_share=0.5)
+    assert streamer.interval() == pytest.approx(0.05)
+
+    # 2 клиента по 100-байтному кадру в 1 кбит/с -> 1.6 с между кадрами
+    streamer._clients = {"a", "b"}
+    streamer._frame_bytes = 100
+    assert streamer.interval() == pytest.approx(1.6)
+
+    # Тик стоит 1 с при доле 0.5 -> не чаще раза в 2 с
+    streamer._cost = 1.0
+    assert streamer.interval() == pytest.approx(2.0)
+
+    streamer.configure(rate_hz=0, max_kbps="x", cpu_share=5)
+    assert (streamer.rate_hz, streamer.max_kbps, streamer.cpu_share) == (20, 16, 1.0)